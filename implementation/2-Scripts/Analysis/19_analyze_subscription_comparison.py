@@ -2,20 +2,27 @@
 """
 Subscription Comparison Analysis
 Compares security posture, resources, and configurations across all subscriptions
+and appends each subscription's scores to the posture history (history/)
 """
 
 import csv
+import sys
 from pathlib import Path
-from collections import defaultdict
+from collections import Counter, defaultdict
 
-# Determine paths
+# Determine paths (SECAI_TRANSFORM_DIR / SECAI_ANALYSIS_DIR override the defaults)
 SCRIPT_DIR = Path(__file__).parent
 ROOT_DIR = SCRIPT_DIR.parent
-TRANSFORM_DIR = ROOT_DIR / "transformed"
-ANALYSIS_DIR = ROOT_DIR / "analysis"
+
+sys.path.insert(0, str(ROOT_DIR))
+from Common.paths import TRANSFORM_DIR, ANALYSIS_DIR, HISTORY_DIR
+from Common.warehouse import load_rows
+from Common.instrument import RunReport
+from Common.history import PostureHistory, snapshot_id
 
 # Create analysis directory
-ANALYSIS_DIR.mkdir(exist_ok=True)
+ANALYSIS_DIR.mkdir(parents=True, exist_ok=True)
+report = RunReport(Path(__file__).stem, ANALYSIS_DIR)
 
 print("=" * 70)
 print("SUBSCRIPTION COMPARISON ANALYSIS")
@@ -26,24 +33,17 @@ print()
 # Load All Data
 # ============================================================================
 
-def load_csv(filename):
-    """Helper to load CSV files"""
-    filepath = TRANSFORM_DIR / filename
-    if filepath.exists():
-        with open(filepath, 'r', encoding='utf-8-sig') as f:
-            return list(csv.DictReader(f))
-    return []
-
 print("Loading data...")
-secure_scores = load_csv("secure_scores.csv")
-assessments = load_csv("security_assessments.csv")
-resources = load_csv("resources.csv")
-resource_groups = load_csv("resource_groups.csv")
-role_assignments = load_csv("role_assignments.csv")
-storage_accounts = load_csv("storage_accounts.csv")
-key_vaults = load_csv("key_vaults.csv")
-vnets = load_csv("virtual_networks.csv")
-nsgs = load_csv("network_security_groups.csv")
+# load_rows reads transformed/evidence.db when present, otherwise the CSVs
+secure_scores = load_rows(TRANSFORM_DIR, "secure_scores", report=report)
+assessments = load_rows(TRANSFORM_DIR, "security_assessments", report=report)
+resources = load_rows(TRANSFORM_DIR, "resources", report=report)
+resource_groups = load_rows(TRANSFORM_DIR, "resource_groups", report=report)
+role_assignments = load_rows(TRANSFORM_DIR, "role_assignments", report=report)
+storage_accounts = load_rows(TRANSFORM_DIR, "storage_accounts", report=report)
+key_vaults = load_rows(TRANSFORM_DIR, "key_vaults", report=report)
+vnets = load_rows(TRANSFORM_DIR, "virtual_networks", report=report)
+nsgs = load_rows(TRANSFORM_DIR, "network_security_groups", report=report)
 
 print(f"  ✓ Loaded {len(secure_scores)} secure scores")
 print(f"  ✓ Loaded {len(assessments)} assessments")
@@ -56,15 +56,44 @@ print()
 
 print("Building subscription profiles...")
 
+def count_by_subscription(rows, column=None):
+    """
+    One pass over a table: row count per subscription and, when column is
+    given, row count per (subscription, column value).
+    """
+    totals = Counter()
+    by_value = Counter()
+    for row in rows:
+        sub_id = row['Subscription ID']
+        totals[sub_id] += 1
+        if column:
+            by_value[sub_id, row.get(column)] += 1
+    return totals, by_value
+
 # Get unique subscription IDs from scope
 sub_ids = set()
-for item in resources + role_assignments + secure_scores:
-    if item.get('Subscription ID'):
-        sub_ids.add(item['Subscription ID'])
+for table in (resources, role_assignments, secure_scores):
+    for item in table:
+        if item.get('Subscription ID'):
+            sub_ids.add(item['Subscription ID'])
 
 print(f"  Found {len(sub_ids)} unique subscriptions")
 print()
 
+# Partition every table by subscription in a single sweep each, so building
+# the profiles is linear in total rows rather than subscriptions x rows
+first_score = {}
+for s in secure_scores:
+    first_score.setdefault(s['Subscription ID'], s)
+assessment_counts, assessment_status = count_by_subscription(assessments, 'Status')
+resource_counts, _ = count_by_subscription(resources)
+rg_counts, _ = count_by_subscription(resource_groups)
+role_counts, role_names = count_by_subscription(role_assignments, 'Role Name')
+storage_counts, _ = count_by_subscription(storage_accounts)
+kv_counts, kv_soft_delete = count_by_subscription(key_vaults, 'Soft Delete')
+vnet_counts, _ = count_by_subscription(vnets)
+nsg_counts, _ = count_by_subscription(nsgs)
+
 # Build profile for each subscription
 subscription_profiles = []
 
@@ -74,50 +103,42 @@ for sub_id in sorted(sub_ids):
     }
     
     # Secure Score
-    sub_scores = [s for s in secure_scores if s['Subscription ID'] == sub_id]
-    if sub_scores:
-        profile['Secure Score %'] = float(sub_scores[0].get('Percentage', 0))
-        profile['Secure Score'] = f"{sub_scores[0].get('Current Score', 0)}/{sub_scores[0].get('Max Score', 0)}"
+    score = first_score.get(sub_id)
+    if score:
+        profile['Secure Score %'] = float(score.get('Percentage', 0))
+        profile['Secure Score'] = f"{score.get('Current Score', 0)}/{score.get('Max Score', 0)}"
     else:
         profile['Secure Score %'] = 0
         profile['Secure Score'] = 'N/A'
     
     # Security Assessments
-    sub_assessments = [a for a in assessments if a['Subscription ID'] == sub_id]
-    profile['Total Assessments'] = len(sub_assessments)
-    profile['Unhealthy'] = len([a for a in sub_assessments if a.get('Status') == 'Unhealthy'])
-    profile['Healthy'] = len([a for a in sub_assessments if a.get('Status') == 'Healthy'])
+    profile['Total Assessments'] = assessment_counts[sub_id]
+    profile['Unhealthy'] = assessment_status[sub_id, 'Unhealthy']
+    profile['Healthy'] = assessment_status[sub_id, 'Healthy']
     
     # Resources
-    sub_resources = [r for r in resources if r['Subscription ID'] == sub_id]
-    profile['Total Resources'] = len(sub_resources)
+    profile['Total Resources'] = resource_counts[sub_id]
     
     # Resource Groups
-    sub_rgs = [rg for rg in resource_groups if rg['Subscription ID'] == sub_id]
-    profile['Resource Groups'] = len(sub_rgs)
+    profile['Resource Groups'] = rg_counts[sub_id]
     
     # Role Assignments
-    sub_roles = [r for r in role_assignments if r['Subscription ID'] == sub_id]
-    profile['Role Assignments'] = len(sub_roles)
-    profile['Owners'] = len([r for r in sub_roles if r.get('Role Name') == 'Owner'])
-    profile['Contributors'] = len([r for r in sub_roles if r.get('Role Name') == 'Contributor'])
+    profile['Role Assignments'] = role_counts[sub_id]
+    profile['Owners'] = role_names[sub_id, 'Owner']
+    profile['Contributors'] = role_names[sub_id, 'Contributor']
     
     # Storage
-    sub_storage = [s for s in storage_accounts if s['Subscription ID'] == sub_id]
-    profile['Storage Accounts'] = len(sub_storage)
+    profile['Storage Accounts'] = storage_counts[sub_id]
     
     # Key Vaults
-    sub_kvs = [kv for kv in key_vaults if kv['Subscription ID'] == sub_id]
-    profile['Key Vaults'] = len(sub_kvs)
-    profile['KV Soft Delete'] = len([kv for kv in sub_kvs if kv.get('Soft Delete') == 'Yes'])
+    profile['Key Vaults'] = kv_counts[sub_id]
+    profile['KV Soft Delete'] = kv_soft_delete[sub_id, 'Yes']
     
     # VNets
-    sub_vnets = [v for v in vnets if v['Subscription ID'] == sub_id]
-    profile['VNets'] = len(sub_vnets)
+    profile['VNets'] = vnet_counts[sub_id]
     
     # NSGs
-    sub_nsgs = [n for n in nsgs if n['Subscription ID'] == sub_id]
-    profile['NSGs'] = len(sub_nsgs)
+    profile['NSGs'] = nsg_counts[sub_id]
     
     # Risk Score (simple calculation)
     risk_score = 0
@@ -162,6 +183,7 @@ with open(comparison_csv, 'w', newline='', encoding='utf-8-sig') as f:
     writer.writeheader()
     writer.writerows(subscription_profiles)
 
+report.add_output(comparison_csv, len(subscription_profiles))
 print(f"✓ Created subscription_comparison.csv")
 print()
 
@@ -173,9 +195,20 @@ if high_risk_subs:
         writer = csv.DictWriter(f, fieldnames=fieldnames)
         writer.writeheader()
         writer.writerows(high_risk_subs)
+    report.add_output(high_risk_csv, len(high_risk_subs))
     print(f"✓ Created high_risk_subscriptions.csv ({len(high_risk_subs)} subscriptions)")
     print()
 
+# Append this run to the posture history (once per transformed snapshot)
+history = PostureHistory(HISTORY_DIR)
+run_id, recorded = history.record_run(subscription_profiles, snapshot=snapshot_id(TRANSFORM_DIR))
+history.close()
+if recorded:
+    print(f"✓ Recorded run {run_id} in {history.path} ({len(subscription_profiles)} subscriptions)")
+else:
+    print(f"✓ Snapshot already in posture history (run {run_id})")
+print()
+
 # ============================================================================
 # Display Summary
 # ============================================================================
@@ -216,5 +249,6 @@ for i, sub in enumerate(best_subs, 1):
 
 print("=" * 70)
 print(f"Analysis complete! Reports saved to: {ANALYSIS_DIR}")
+print(f"Run report: {report.write()}")
 print("=" * 70)
 
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Resource-Level Risk Analysis
+Joins Defender for Cloud assessments to the resource inventory and reports the
+unhealthy findings per resource, with rollups per resource group and type
+"""
+
+import csv
+import sys
+from pathlib import Path
+from collections import Counter
+
+# Determine paths (SECAI_TRANSFORM_DIR / SECAI_ANALYSIS_DIR override the defaults)
+SCRIPT_DIR = Path(__file__).parent
+ROOT_DIR = SCRIPT_DIR.parent
+
+sys.path.insert(0, str(ROOT_DIR))
+from Common.paths import TRANSFORM_DIR, ANALYSIS_DIR
+from Common.warehouse import load_rows
+from Common.instrument import RunReport
+from Common.arm_ids import parse_arm_id, resource_key
+
+# Create analysis directory
+ANALYSIS_DIR.mkdir(parents=True, exist_ok=True)
+report = RunReport(Path(__file__).stem, ANALYSIS_DIR)
+
+# Finding names listed per resource (the count column has the full total)
+MAX_LISTED_FINDINGS = 5
+
+NOT_IN_INVENTORY = '(not in inventory)'
+
+print("=" * 70)
+print("RESOURCE-LEVEL RISK ANALYSIS")
+print("=" * 70)
+print()
+
+# ============================================================================
+# Load Data
+# ============================================================================
+
+print("Loading data...")
+assessments = load_rows(TRANSFORM_DIR, "security_assessments", report=report)
+resources = load_rows(TRANSFORM_DIR, "resources", report=report)
+
+print(f"  ✓ Loaded {len(assessments)} assessments")
+print(f"  ✓ Loaded {len(resources)} resources")
+print()
+
+# ============================================================================
+# Join Assessments to Resources
+# ============================================================================
+
+print("Joining assessments to resources...")
+
+# Build side: one hash entry per inventory resource
+inventory = {}
+for resource in resources:
+    key = resource_key(resource.get('Resource ID'))
+    if key:
+        inventory.setdefault(key, resource)
+
+# Probe side: stream the assessments once, keeping only per-resource counters
+findings = {}
+for assessment in assessments:
+    key = resource_key(assessment.get('Affected Resource'))
+    if not key:
+        continue
+    entry = findings.get(key)
+    if entry is None:
+        entry = findings[key] = {
+            'id': assessment.get('Affected Resource'),
+            'subscription': assessment.get('Subscription ID'),
+            'total': 0,
+            'unhealthy': 0,
+            'names': [],
+        }
+    entry['total'] += 1
+    if assessment.get('Status') == 'Unhealthy':
+        entry['unhealthy'] += 1
+        name = assessment.get('Assessment Name')
+        if name and len(entry['names']) < MAX_LISTED_FINDINGS and name not in entry['names']:
+            entry['names'].append(name)
+
+matched = sum(1 for key in findings if key in inventory)
+print(f"  {len(findings)} assessed resources, {matched} found in inventory")
+print()
+
+resource_rows = []
+for key, entry in findings.items():
+    if not entry['unhealthy']:
+        continue
+    resource = inventory.get(key)
+    if resource is not None:
+        row = {
+            'Subscription ID': resource.get('Subscription ID'),
+            'Resource Group': resource.get('Resource Group'),
+            'Resource Name': resource.get('Resource Name'),
+            'Resource Type': resource.get('Resource Type'),
+            'Location': resource.get('Location'),
+            'Tags': resource.get('Tags'),
+            'Resource ID': resource.get('Resource ID'),
+            'In Inventory': 'Yes',
+        }
+    else:
+        row = {
+            'Subscription ID': entry['subscription'],
+            'Resource Group': NOT_IN_INVENTORY,
+            'Resource Name': parse_arm_id(entry['id']).name,
+            'Resource Type': NOT_IN_INVENTORY,
+            'Location': '',
+            'Tags': '',
+            'Resource ID': entry['id'],
+            'In Inventory': 'No',
+        }
+    row['Unhealthy Findings'] = entry['unhealthy']
+    row['Total Assessments'] = entry['total']
+    row['Findings'] = '; '.join(entry['names'])
+    resource_rows.append(row)
+
+resource_rows.sort(key=lambda r: (-r['Unhealthy Findings'], r['Resource ID'].lower()))
+
+# ============================================================================
+# Rollups
+# ============================================================================
+
+group_resources = Counter()
+group_findings = Counter()
+type_resources = Counter()
+type_findings = Counter()
+for row in resource_rows:
+    group = (row['Subscription ID'], row['Resource Group'])
+    group_resources[group] += 1
+    group_findings[group] += row['Unhealthy Findings']
+    type_resources[row['Resource Type']] += 1
+    type_findings[row['Resource Type']] += row['Unhealthy Findings']
+
+group_rows = [
+    {'Subscription ID': sub_id, 'Resource Group': group, 'Resources At Risk': group_resources[sub_id, group],
+     'Unhealthy Findings': count}
+    for (sub_id, group), count in group_findings.most_common()
+]
+type_rows = [
+    {'Resource Type': resource_type, 'Resources At Risk': type_resources[resource_type],
+     'Unhealthy Findings': count}
+    for resource_type, count in type_findings.most_common()
+]
+
+# ============================================================================
+# Write Reports
+# ============================================================================
+
+def write_report(name, fieldnames, rows):
+    path = ANALYSIS_DIR / name
+    with open(path, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(rows)
+    report.add_output(path, len(rows))
+    print(f"✓ Created {name} ({len(rows)} rows)")
+
+
+if resource_rows:
+    write_report("resource_risks.csv",
+                 ['Subscription ID', 'Resource Group', 'Resource Name', 'Resource Type', 'Location',
+                  'Unhealthy Findings', 'Total Assessments', 'Findings', 'Tags', 'In Inventory', 'Resource ID'],
+                 resource_rows)
+    write_report("resource_group_risks.csv",
+                 ['Subscription ID', 'Resource Group', 'Resources At Risk', 'Unhealthy Findings'], group_rows)
+    write_report("resource_type_risks.csv",
+                 ['Resource Type', 'Resources At Risk', 'Unhealthy Findings'], type_rows)
+    print()
+else:
+    print("⚠ No unhealthy findings to report")
+    print()
+
+# ============================================================================
+# Display Summary
+# ============================================================================
+
+print("=" * 70)
+print("RESOURCES WITH THE MOST UNHEALTHY FINDINGS")
+print("=" * 70)
+print()
+
+for i, row in enumerate(resource_rows[:10], 1):
+    print(f"{i}. {row['Resource Name']} ({row['Resource Type']}) | Unhealthy: {row['Unhealthy Findings']}")
+    print(f"   Resource Group: {row['Resource Group']} | Location: {row['Location'] or 'n/a'}")
+    print()
+
+if type_rows:
+    print("By Resource Type:")
+    for row in type_rows[:10]:
+        print(f"  {row['Resource Type']}: {row['Unhealthy Findings']} findings on {row['Resources At Risk']} resources")
+    print()
+
+print("=" * 70)
+print(f"Analysis complete! Reports saved to: {ANALYSIS_DIR}")
+print(f"Run report: {report.write()}")
+print("=" * 70)
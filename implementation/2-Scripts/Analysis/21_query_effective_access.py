@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+RBAC Effective-Access Analysis
+Resolves role assignments through scope inheritance (management group ->
+subscription -> resource group -> resource) and answers effective-access queries
+
+Without arguments, writes effective_privileged_access.csv: every privileged
+assignment with the number of subscriptions it effectively reaches.
+
+Queries:
+  python 21_query_effective_access.py --scope <ARM ID> [--role Owner]
+      who effectively holds a role on a scope, and where it is inherited from
+  python 21_query_effective_access.py --principal <ID or name> [--scope <ARM ID>]
+      what a principal is assigned, or what it holds on one scope
+"""
+
+import argparse
+import csv
+import sys
+import time
+from pathlib import Path
+
+# Determine paths (SECAI_* env vars override the default data directories)
+SCRIPT_DIR = Path(__file__).parent
+ROOT_DIR = SCRIPT_DIR.parent
+
+sys.path.insert(0, str(ROOT_DIR))
+from Common.paths import OUT_DIR, TRANSFORM_DIR, ANALYSIS_DIR
+from Common.warehouse import load_rows
+from Common.instrument import RunReport
+from Common.rbac_index import RbacIndex, load_mg_memberships, load_mg_parents
+from Common.risk_rules import PRIVILEGED_ROLES
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument('--scope', action='append', default=[],
+                    help='ARM scope or resource ID to resolve (repeatable)')
+parser.add_argument('--principal', action='append', default=[],
+                    help='Principal object ID or name to look up (repeatable)')
+parser.add_argument('--role', default=None, help='Only report this role (e.g. Owner)')
+args = parser.parse_args()
+query_mode = bool(args.scope or args.principal)
+
+# Create analysis directory
+ANALYSIS_DIR.mkdir(parents=True, exist_ok=True)
+report = RunReport(Path(__file__).stem, ANALYSIS_DIR)
+
+print("=" * 70)
+print("RBAC EFFECTIVE ACCESS")
+print("=" * 70)
+print()
+
+# ============================================================================
+# Build Index
+# ============================================================================
+
+start = time.perf_counter()
+role_assignments = load_rows(TRANSFORM_DIR, "role_assignments", report=report)
+memberships = load_mg_memberships(OUT_DIR)
+mg_parents = load_mg_parents(OUT_DIR)
+index = RbacIndex(role_assignments, memberships, mg_parents)
+elapsed = time.perf_counter() - start
+
+print(f"Indexed {index.assignment_count} assignments ({len(role_assignments)} rows) "
+      f"on {len(index.by_scope)} scopes for {len(index.by_principal)} principals in {elapsed:.2f}s")
+print(f"Management group memberships: {len(memberships)} subscriptions mapped, "
+      f"{len(mg_parents)} management group parent links")
+for level, count in index.scope_levels().items():
+    if count:
+        print(f"  {level}: {count}")
+print()
+
+
+def describe(assignment):
+    name = assignment.get('Principal Name') or assignment.get('Principal ID')
+    return f"{name} ({assignment.get('Principal Type')}) - {assignment.get('Role Name')}"
+
+
+# ============================================================================
+# Queries
+# ============================================================================
+
+def query_scope(scope, principal=None):
+    start = time.perf_counter()
+    grants = index.effective_access(scope, role=args.role, principal=principal)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    print(f"Effective access on {scope}" + (f" [{args.role}]" if args.role else ""))
+    if not grants:
+        print("  (none)")
+    for grant in grants:
+        source = f"inherited from {grant.assignment.get('Scope')}" if grant.inherited else "assigned here"
+        print(f"  {describe(grant.assignment)} | {source}")
+    print(f"  {len(grants)} grants in {elapsed_ms:.2f} ms")
+    print()
+
+
+def query_principal(text):
+    principals = index.find_principals(text)
+    if not principals:
+        print(f"Principal {text}: no role assignments")
+        print()
+        return
+    for principal in principals:
+        if args.scope:
+            for scope in args.scope:
+                query_scope(scope, principal)
+            continue
+        start = time.perf_counter()
+        assignments = [a for a in index.principal_assignments(principal)
+                       if not args.role or (a.get('Role Name') or '').lower() == args.role.lower()]
+        subscriptions = set()
+        for assignment in assignments:
+            subscriptions |= index.covered_subscriptions(assignment.get('Scope'))
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        name = next((a.get('Principal Name') for a in index.principal_assignments(principal)
+                     if a.get('Principal Name')), '')
+        print(f"Principal {name} ({principal})" if name else f"Principal {principal}")
+        for assignment in assignments:
+            covered = len(index.covered_subscriptions(assignment.get('Scope')))
+            print(f"  {assignment.get('Role Name')} at {assignment.get('Scope Level')}: {assignment.get('Scope')}"
+                  f" | {covered} subscriptions")
+        print(f"  {len(assignments)} assignments reaching {len(subscriptions)} subscriptions in {elapsed_ms:.2f} ms")
+        print()
+
+
+if query_mode:
+    if args.principal:
+        for text in args.principal:
+            query_principal(text)
+    else:
+        for scope in args.scope:
+            query_scope(scope)
+    print("=" * 70)
+    print(f"Run report: {report.write()}")
+    print("=" * 70)
+    sys.exit(0)
+
+# ============================================================================
+# Privileged Access Report
+# ============================================================================
+
+privileged = {role.lower() for role in PRIVILEGED_ROLES}
+rows = []
+for scope, assignments in index.by_scope.items():
+    covered = None
+    for assignment in assignments:
+        if (assignment.get('Role Name') or '').lower() not in privileged:
+            continue
+        if covered is None:
+            covered = len(index.covered_subscriptions(scope))
+        rows.append({
+            'Principal Name': assignment.get('Principal Name'),
+            'Principal ID': assignment.get('Principal ID'),
+            'Principal Type': assignment.get('Principal Type'),
+            'Role Name': assignment.get('Role Name'),
+            'Scope Level': assignment.get('Scope Level'),
+            'Scope': assignment.get('Scope'),
+            'Subscriptions Covered': covered,
+            'Assignment ID': assignment.get('Assignment ID'),
+        })
+
+rows.sort(key=lambda r: (-r['Subscriptions Covered'], r['Role Name'] or '', r['Principal Name'] or ''))
+
+if rows:
+    output_path = ANALYSIS_DIR / "effective_privileged_access.csv"
+    with open(output_path, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+        writer.writeheader()
+        writer.writerows(rows)
+    report.add_output(output_path, len(rows))
+    print(f"✓ Created effective_privileged_access.csv ({len(rows)} rows)")
+    print()
+else:
+    print("⚠ No privileged role assignments found")
+    print()
+
+# Principals whose privileged access spans the most subscriptions
+reach = {}
+for row in rows:
+    key = (row['Principal ID'] or '').lower()
+    entry = reach.setdefault(key, [row['Principal Name'] or row['Principal ID'], row['Principal Type'], set()])
+    entry[2] |= index.covered_subscriptions(row['Scope'])
+
+print("=" * 70)
+print("BROADEST PRIVILEGED ACCESS")
+print("=" * 70)
+print()
+for i, (name, ptype, subscriptions) in enumerate(
+        sorted(reach.values(), key=lambda e: (-len(e[2]), e[0] or ''))[:10], 1):
+    print(f"{i}. {name} ({ptype}) | Privileged on {len(subscriptions)} subscriptions")
+print()
+
+print("=" * 70)
+print(f"Analysis complete! Reports saved to: {ANALYSIS_DIR}")
+print(f"Run report: {report.write()}")
+print("=" * 70)
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Network Exposure Analysis
+Finds NSGs whose effective inbound rules allow management ports (SSH, RDP,
+SQL Server) from the Internet
+"""
+
+import csv
+import sys
+from pathlib import Path
+from collections import Counter
+
+# Determine paths (SECAI_TRANSFORM_DIR / SECAI_ANALYSIS_DIR override the defaults)
+SCRIPT_DIR = Path(__file__).parent
+ROOT_DIR = SCRIPT_DIR.parent
+
+sys.path.insert(0, str(ROOT_DIR))
+from Common.paths import TRANSFORM_DIR, ANALYSIS_DIR
+from Common.warehouse import load_rows
+from Common.instrument import RunReport
+from Common.intervals import IntervalIndex, parse_port_ranges
+
+# Create analysis directory
+ANALYSIS_DIR.mkdir(parents=True, exist_ok=True)
+report = RunReport(Path(__file__).stem, ANALYSIS_DIR)
+
+MANAGEMENT_PORTS = {
+    22: 'SSH',
+    3389: 'RDP',
+    1433: 'SQL Server',
+}
+
+# Rule protocols that carry TCP traffic to the management ports
+TCP_PROTOCOLS = {'tcp', '*', 'any'}
+
+print("=" * 70)
+print("NETWORK EXPOSURE ANALYSIS")
+print("=" * 70)
+print()
+
+# ============================================================================
+# Load Data
+# ============================================================================
+
+print("Loading data...")
+nsg_rules = load_rows(TRANSFORM_DIR, "nsg_rules", report=report)
+print(f"  ✓ Loaded {len(nsg_rules)} NSG rules")
+print()
+
+# ============================================================================
+# Index Internet-Facing Inbound Rules
+# ============================================================================
+
+def priority(rule):
+    try:
+        return int(float(rule.get('Priority')))
+    except (TypeError, ValueError):
+        return 65536
+
+
+# Only inbound TCP rules whose source is the whole Internet decide whether
+# Internet traffic reaches a port; Deny rules are indexed too so a
+# higher-priority Deny masks a later Allow, as NSG evaluation does
+entries = []
+for rule in nsg_rules:
+    if rule.get('Direction') != 'Inbound' or rule.get('Internet Source') != 'Yes':
+        continue
+    if (rule.get('Protocol') or '').lower() not in TCP_PROTOCOLS:
+        continue
+    for low, high in parse_port_ranges((rule.get('Destination Ports') or '').split(',')):
+        entries.append((low, high, rule))
+
+index = IntervalIndex(entries)
+print(f"Indexed {len(index)} port ranges from Internet-facing inbound rules")
+print()
+
+# ============================================================================
+# Resolve Effective Access per NSG and Port
+# ============================================================================
+
+findings = []
+for port, service in MANAGEMENT_PORTS.items():
+    # First matching rule per NSG, by priority
+    deciding = {}
+    for rule in index.containing(port):
+        nsg = (rule.get('NSG ID') or '').lower()
+        current = deciding.get(nsg)
+        if current is None or priority(rule) < priority(current):
+            deciding[nsg] = rule
+    for rule in deciding.values():
+        if rule.get('Access') != 'Allow':
+            continue
+        findings.append({
+            'Subscription ID': rule.get('Subscription ID'),
+            'Resource Group': rule.get('Resource Group'),
+            'NSG Name': rule.get('NSG Name'),
+            'Port': port,
+            'Service': service,
+            'Rule Name': rule.get('Rule Name'),
+            'Priority': rule.get('Priority'),
+            'Protocol': rule.get('Protocol'),
+            'Source Prefixes': rule.get('Source Prefixes'),
+            'Destination Prefixes': rule.get('Destination Prefixes'),
+            'Destination Ports': rule.get('Destination Ports'),
+            'NSG ID': rule.get('NSG ID'),
+        })
+
+findings.sort(key=lambda r: (r['Subscription ID'] or '', (r['NSG ID'] or '').lower(), r['Port']))
+
+# ============================================================================
+# Write Report
+# ============================================================================
+
+if findings:
+    output_path = ANALYSIS_DIR / "nsg_internet_exposure.csv"
+    with open(output_path, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.DictWriter(f, fieldnames=list(findings[0].keys()))
+        writer.writeheader()
+        writer.writerows(findings)
+    report.add_output(output_path, len(findings))
+    print(f"✓ Created nsg_internet_exposure.csv ({len(findings)} rows)")
+    print()
+else:
+    print("✓ No NSG allows management ports from the Internet")
+    print()
+
+# ============================================================================
+# Display Summary
+# ============================================================================
+
+print("=" * 70)
+print("MANAGEMENT PORTS OPEN TO THE INTERNET")
+print("=" * 70)
+print()
+
+by_port = Counter(r['Port'] for r in findings)
+for port, service in MANAGEMENT_PORTS.items():
+    print(f"  {service} ({port}): {by_port[port]} NSGs")
+print()
+
+by_subscription = Counter(r['Subscription ID'] for r in findings)
+if by_subscription:
+    print("By Subscription:")
+    for sub_id, count in by_subscription.most_common(10):
+        print(f"  {sub_id}: {count} exposed ports")
+    print()
+
+print("=" * 70)
+print(f"Analysis complete! Reports saved to: {ANALYSIS_DIR}")
+print(f"Run report: {report.write()}")
+print("=" * 70)
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+VNet Address Overlap Analysis
+Finds VNets (and subnets) across all subscriptions whose address prefixes
+overlap, which blocks peering and hub-spoke connectivity between them
+"""
+
+import csv
+import sys
+from pathlib import Path
+from collections import Counter
+
+# Determine paths (SECAI_TRANSFORM_DIR / SECAI_ANALYSIS_DIR override the defaults)
+SCRIPT_DIR = Path(__file__).parent
+ROOT_DIR = SCRIPT_DIR.parent
+
+sys.path.insert(0, str(ROOT_DIR))
+from Common.paths import TRANSFORM_DIR, ANALYSIS_DIR
+from Common.warehouse import load_rows
+from Common.instrument import RunReport
+from Common.intervals import address_range, overlapping_pairs
+
+# Create analysis directory
+ANALYSIS_DIR.mkdir(parents=True, exist_ok=True)
+report = RunReport(Path(__file__).stem, ANALYSIS_DIR)
+
+print("=" * 70)
+print("VNET ADDRESS OVERLAP ANALYSIS")
+print("=" * 70)
+print()
+
+# ============================================================================
+# Load Data
+# ============================================================================
+
+print("Loading data...")
+prefixes = load_rows(TRANSFORM_DIR, "vnet_prefixes", report=report)
+print(f"  ✓ Loaded {len(prefixes)} VNet and subnet prefixes")
+print()
+
+# ============================================================================
+# Parse Prefixes into Address Ranges
+# ============================================================================
+
+# (level, IP version) -> [(first, last, prefix)], where each prefix is
+# (VNet key, subnet, address prefix, range size, row) so the sweep never goes
+# back to the row for the fields it compares
+groups = {}
+invalid = 0
+for row in prefixes:
+    span = address_range(row.get('Address Prefix'))
+    if span is None:
+        invalid += 1
+        continue
+    version, first, last = span
+    prefix = ((row.get('VNet ID') or '').lower(), row.get('Subnet Name') or '', row.get('Address Prefix'),
+              last - first, row)
+    groups.setdefault((row.get('Level'), version), []).append((first, last, prefix))
+
+if invalid:
+    print(f"  [WARN] {invalid} prefixes could not be parsed and were skipped")
+    print()
+
+# ============================================================================
+# Sweep for Overlapping Pairs
+# ============================================================================
+
+HEADERS = ['Level', 'Subscription A', 'VNet A', 'Subnet A', 'Prefix A', 'Subscription B', 'VNet B',
+           'Subnet B', 'Prefix B', 'Overlap', 'Same VNet', 'Same Subscription', 'VNet A ID', 'VNet B ID']
+
+overlaps = []
+for (level, version), entries in sorted(groups.items(), key=lambda g: (g[0][0] or '', g[0][1])):
+    subnet_level = level == 'Subnet'
+    for a, b in overlapping_pairs(entries):
+        same_vnet = a[0] == b[0]
+        # Address-space prefixes of one VNet, or a subnet against itself
+        if same_vnet and (not subnet_level or a[1] == b[1]):
+            continue
+        # CIDR blocks only overlap by nesting: the overlap is the narrower one
+        overlap = a[2] if a[3] <= b[3] else b[2]
+        if b[:3] < a[:3]:
+            a, b = b, a
+        row_a, row_b = a[4], b[4]
+        sub_a, sub_b = row_a.get('Subscription ID'), row_b.get('Subscription ID')
+        overlaps.append((
+            level, sub_a, row_a.get('VNet Name'), a[1], a[2], sub_b, row_b.get('VNet Name'), b[1], b[2], overlap,
+            'Yes' if same_vnet else 'No', 'Yes' if sub_a == sub_b else 'No',
+            row_a.get('VNet ID'), row_b.get('VNet ID'),
+        ))
+
+overlaps.sort(key=lambda r: (r[0], (r[12] or '').lower(), r[3], (r[13] or '').lower(), r[7]))
+
+# ============================================================================
+# Write Report
+# ============================================================================
+
+if overlaps:
+    output_path = ANALYSIS_DIR / "vnet_address_overlaps.csv"
+    with open(output_path, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADERS)
+        writer.writerows(overlaps)
+    report.add_output(output_path, len(overlaps))
+    print(f"✓ Created vnet_address_overlaps.csv ({len(overlaps)} rows)")
+    print()
+else:
+    print("✓ No overlapping VNet or subnet prefixes found")
+    print()
+
+# ============================================================================
+# Display Summary
+# ============================================================================
+
+print("=" * 70)
+print("OVERLAPPING ADDRESS SPACE")
+print("=" * 70)
+print()
+
+by_level = Counter(r[0] for r in overlaps)
+for level, count in sorted(by_level.items()):
+    print(f"  {level} overlaps: {count}")
+cross = sum(1 for r in overlaps if r[0] != 'Subnet' and r[11] == 'No')
+print(f"  Address space overlaps across subscriptions: {cross}")
+print()
+
+conflicts = Counter()
+names = {}
+for r in overlaps:
+    if r[0] == 'Subnet':
+        continue
+    for vnet_id, name, sub_id in ((r[12], r[2], r[1]), (r[13], r[6], r[5])):
+        key = (vnet_id or '').lower()
+        conflicts[key] += 1
+        names[key] = f"{name} ({sub_id})"
+if conflicts:
+    print("VNets with the most overlapping address space:")
+    for key, count in conflicts.most_common(10):
+        print(f"  {names[key]}: overlaps {count} other VNet prefixes")
+    print()
+
+print("=" * 70)
+print(f"Analysis complete! Reports saved to: {ANALYSIS_DIR}")
+print(f"Run report: {report.write()}")
+print("=" * 70)
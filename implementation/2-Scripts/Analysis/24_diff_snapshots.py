@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Snapshot Diff Analysis
+Compares this run's transformed/ tables with a previous run's and reports
+only what changed: added, removed and modified rows per table
+
+  python 24_diff_snapshots.py --previous <old transformed/ dir> [--current <dir>]
+
+Rows are matched on Resource ID, Assignment ID or Assessment ID (per table,
+see Table.key). Writes one <table>_changes.csv per changed table under
+analysis/changes/ and snapshot_delta_summary.csv with the counts per table.
+"""
+
+import argparse
+import csv
+import sys
+import time
+from pathlib import Path
+
+# Determine paths (SECAI_TRANSFORM_DIR / SECAI_ANALYSIS_DIR override the defaults)
+SCRIPT_DIR = Path(__file__).parent
+ROOT_DIR = SCRIPT_DIR.parent
+
+sys.path.insert(0, str(ROOT_DIR))
+from Common.paths import TRANSFORM_DIR, ANALYSIS_DIR
+from Common.instrument import RunReport
+from Common.snapshot_diff import diff_table
+from Common.tables import TABLES
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument('--previous', required=True, help="Previous run's transformed/ directory")
+parser.add_argument('--current', default=str(TRANSFORM_DIR),
+                    help='Current transformed/ directory (default: this run)')
+args = parser.parse_args()
+previous_dir, current_dir = Path(args.previous), Path(args.current)
+
+if not previous_dir.is_dir():
+    print(f"[ERROR] Previous snapshot not found: {previous_dir}")
+    sys.exit(1)
+
+# Create analysis directory
+ANALYSIS_DIR.mkdir(parents=True, exist_ok=True)
+CHANGES_DIR = ANALYSIS_DIR / "changes"
+CHANGES_DIR.mkdir(parents=True, exist_ok=True)
+# Change files from an earlier diff would otherwise outlive tables that no
+# longer differ or no longer exist in either snapshot
+for stale in CHANGES_DIR.glob('*_changes.csv'):
+    stale.unlink()
+report = RunReport(Path(__file__).stem, ANALYSIS_DIR)
+
+print("=" * 70)
+print("SNAPSHOT DIFF")
+print("=" * 70)
+print(f"Previous: {previous_dir}")
+print(f"Current:  {current_dir}")
+print()
+
+# ============================================================================
+# Diff Each Table
+# ============================================================================
+
+diffs = []
+for table in TABLES.values():
+    old_path, new_path = previous_dir / table.csv_name, current_dir / table.csv_name
+    if not old_path.exists() and not new_path.exists():
+        continue
+    changes_path = CHANGES_DIR / f"{table.name}_changes.csv"
+    start = time.perf_counter()
+    diff = diff_table(table, old_path, new_path, changes_path, work_dir=CHANGES_DIR)
+    elapsed = time.perf_counter() - start
+    diffs.append(diff)
+
+    note = f", {diff.partitions} partitions" if diff.partitions > 1 else ''
+    if not old_path.exists():
+        print(f"  [NEW] {table.csv_name} - {diff.new_rows} rows")
+    elif not new_path.exists():
+        print(f"  [GONE] {table.csv_name} - {diff.old_rows} rows")
+    else:
+        print(f"  [OK] {table.csv_name} - +{diff.added} -{diff.removed} ~{diff.modified} "
+              f"({diff.old_rows} -> {diff.new_rows} rows, {elapsed:.2f}s{note})")
+    for column in diff.columns_added:
+        print(f"       column added: {column}")
+    for column in diff.columns_removed:
+        print(f"       column removed: {column}")
+    if diff.changes:
+        report.add_output(changes_path, diff.changes)
+print()
+
+# ============================================================================
+# Write Delta Summary
+# ============================================================================
+
+summary = [{
+    'Table': d.name,
+    'Key Columns': ', '.join(d.key),
+    'Previous Rows': d.old_rows,
+    'Current Rows': d.new_rows,
+    'Added': d.added,
+    'Removed': d.removed,
+    'Modified': d.modified,
+    'Unchanged': d.unchanged,
+    'Columns Added': ', '.join(d.columns_added),
+    'Columns Removed': ', '.join(d.columns_removed),
+    'Most Changed Columns': ', '.join(f"{c} ({n})" for c, n in d.changed_columns.most_common(5)),
+} for d in diffs]
+
+if summary:
+    output_path = ANALYSIS_DIR / "snapshot_delta_summary.csv"
+    with open(output_path, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.DictWriter(f, fieldnames=list(summary[0].keys()))
+        writer.writeheader()
+        writer.writerows(summary)
+    report.add_output(output_path, len(summary))
+    print(f"✓ Created snapshot_delta_summary.csv ({len(summary)} tables)")
+    print()
+else:
+    print("⚠ No transformed tables found in either snapshot")
+    print()
+
+# ============================================================================
+# Display Summary
+# ============================================================================
+
+print("=" * 70)
+print("CHANGES SINCE PREVIOUS RUN")
+print("=" * 70)
+print()
+
+changed = [d for d in diffs if d.changes]
+print(f"  Tables compared: {len(diffs)}")
+print(f"  Tables changed: {len(changed)}")
+print(f"  Rows added: {sum(d.added for d in diffs)}")
+print(f"  Rows removed: {sum(d.removed for d in diffs)}")
+print(f"  Rows modified: {sum(d.modified for d in diffs)}")
+print()
+for d in sorted(changed, key=lambda d: -d.changes)[:10]:
+    print(f"  {d.name}: {d.changes} changes (+{d.added} -{d.removed} ~{d.modified})")
+if changed:
+    print()
+
+print("=" * 70)
+print(f"Analysis complete! Reports saved to: {ANALYSIS_DIR}")
+print(f"Run report: {report.write()}")
+print("=" * 70)
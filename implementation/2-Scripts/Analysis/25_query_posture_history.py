@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Posture History Queries
+Answers trend questions from the posture history that
+19_analyze_subscription_comparison.py appends to on every run (history/)
+
+Without arguments, lists the recorded runs and writes posture_regressions.csv:
+subscriptions whose secure score, risk score or unhealthy count got worse over
+the last 30 days.
+
+Queries:
+  python 25_query_posture_history.py --subscription <ID or ID prefix>
+      secure score, assessment health and risk score over time
+  python 25_query_posture_history.py --since 2024-05-01 [--top 20]
+      top regressions since a date (or --days N before the latest run)
+"""
+
+import argparse
+import csv
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Determine paths (SECAI_* env vars override the default data directories)
+SCRIPT_DIR = Path(__file__).parent
+ROOT_DIR = SCRIPT_DIR.parent
+
+sys.path.insert(0, str(ROOT_DIR))
+from Common.paths import ANALYSIS_DIR, HISTORY_DIR
+from Common.instrument import RunReport
+from Common.history import PostureHistory, history_path
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument('--subscription', action='append', default=[],
+                    help='Subscription ID (or ID prefix) to show the trend for (repeatable)')
+parser.add_argument('--since', default=None, help='Regression baseline date (YYYY-MM-DD)')
+parser.add_argument('--days', type=int, default=30,
+                    help='Regression baseline in days before the latest run when --since is not given (default 30)')
+parser.add_argument('--top', type=int, default=10, help='Regressions to print (default 10)')
+args = parser.parse_args()
+
+if not history_path(HISTORY_DIR).exists():
+    print(f"⚠ No posture history yet ({history_path(HISTORY_DIR)})")
+    print("  Run 19_analyze_subscription_comparison.py to record the first run")
+    sys.exit(0)
+
+# Create analysis directory
+ANALYSIS_DIR.mkdir(parents=True, exist_ok=True)
+report = RunReport(Path(__file__).stem, ANALYSIS_DIR)
+history = PostureHistory(HISTORY_DIR)
+
+print("=" * 70)
+print("POSTURE HISTORY")
+print("=" * 70)
+print()
+
+
+def fmt(value, suffix=''):
+    if value is None:
+        return 'N/A'
+    return f"{value:.1f}{suffix}" if isinstance(value, float) else f"{value}{suffix}"
+
+
+def change(value, suffix=''):
+    if value is None:
+        return 'N/A'
+    return f"{value:+.1f}{suffix}" if isinstance(value, float) else f"{value:+d}{suffix}"
+
+
+# ============================================================================
+# Subscription Trends
+# ============================================================================
+
+if args.subscription:
+    for text in args.subscription:
+        matches = history.find_subscriptions(text)
+        if not matches:
+            print(f"Subscription {text}: no history")
+            print()
+        for sub_id in matches:
+            start = time.perf_counter()
+            rows = history.trend(sub_id)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            print(f"Subscription {sub_id}")
+            print(f"  {'Run':<20} {'Score %':>8} {'Unhealthy':>10} {'Healthy':>8} {'Risk':>5}  Level")
+            for row in rows:
+                print(f"  {row['run_at']:<20} {fmt(row['secure_score_pct']):>8} {fmt(row['unhealthy']):>10} "
+                      f"{fmt(row['healthy']):>8} {fmt(row['risk_score']):>5}  {row['risk_level']}")
+            print(f"  {len(rows)} runs in {elapsed_ms:.2f} ms")
+            print()
+    history.close()
+    print("=" * 70)
+    print(f"Run report: {report.write()}")
+    print("=" * 70)
+    sys.exit(0)
+
+# ============================================================================
+# Recorded Runs
+# ============================================================================
+
+runs = history.runs()
+print(f"Recorded runs: {len(runs)}")
+for run in runs[-10:]:
+    print(f"  {run['run_id']}. {run['run_at']} | {run['subscriptions']} subscriptions")
+print()
+
+# ============================================================================
+# Regressions
+# ============================================================================
+
+latest = history.latest_run_at()
+if latest is None:
+    history.close()
+    print("⚠ No runs recorded yet")
+    print(f"Run report: {report.write()}")
+    sys.exit(0)
+if args.since:
+    since = args.since
+else:
+    since = (datetime.fromisoformat(latest) - timedelta(days=args.days)).strftime('%Y-%m-%dT%H:%M:%S')
+# A bare date covers the whole of that day
+if len(since) == 10:
+    since += 'T23:59:59'
+
+start = time.perf_counter()
+regressions = history.regressions(since)
+elapsed_ms = (time.perf_counter() - start) * 1000
+history.close()
+
+rows = [{
+    'Subscription ID': r['subscription_id'],
+    'Baseline Run': r['baseline_at'],
+    'Latest Run': r['latest_at'],
+    'Baseline Score %': r['baseline_score'],
+    'Latest Score %': r['latest_score'],
+    'Score Change': r['score_change'],
+    'Baseline Risk Score': r['baseline_risk'],
+    'Latest Risk Score': r['latest_risk'],
+    'Risk Change': r['risk_change'],
+    'Baseline Unhealthy': r['baseline_unhealthy'],
+    'Latest Unhealthy': r['latest_unhealthy'],
+    'Unhealthy Change': r['unhealthy_change'],
+    'Risk Level': r['risk_level'],
+} for r in regressions]
+
+output_path = ANALYSIS_DIR / "posture_regressions.csv"
+if rows:
+    with open(output_path, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+        writer.writeheader()
+        writer.writerows(rows)
+    report.add_output(output_path, len(rows))
+    print(f"✓ Created posture_regressions.csv ({len(rows)} subscriptions)")
+    print()
+elif output_path.exists():
+    output_path.unlink()
+
+print("=" * 70)
+print(f"TOP REGRESSIONS SINCE {since[:10]}")
+print("=" * 70)
+print()
+if not rows:
+    print("  No subscription regressed (or no run recorded on or before that date)")
+    print()
+for i, row in enumerate(rows[:args.top], 1):
+    print(f"{i}. {row['Subscription ID'][:8]}... | Score {fmt(row['Baseline Score %'], '%')} -> "
+          f"{fmt(row['Latest Score %'], '%')} ({change(row['Score Change'])})")
+    print(f"   Risk Score: {fmt(row['Baseline Risk Score'])} -> {fmt(row['Latest Risk Score'])} | "
+          f"Unhealthy: {fmt(row['Baseline Unhealthy'])} -> {fmt(row['Latest Unhealthy'])} | {row['Risk Level']}")
+    print()
+print(f"  {len(rows)} regressions in {elapsed_ms:.2f} ms")
+print()
+
+print("=" * 70)
+print(f"Analysis complete! Reports saved to: {ANALYSIS_DIR}")
+print(f"Run report: {report.write()}")
+print("=" * 70)
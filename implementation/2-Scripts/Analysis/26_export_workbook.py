@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Assessment Workbook Export
+Writes every transformed table into one .xlsx workbook laid out like
+4-Templates/excel_sheet_names.txt: Introduction, Summary, the question tabs,
+then one tab per security domain followed by that domain's evidence tables
+
+  python 26_export_workbook.py [--output <path.xlsx>]
+
+Rows are streamed from the transformed CSVs straight into the workbook (see
+Common/xlsx_writer.py), so memory stays flat on the largest tenants. A table
+longer than Excel's 1,048,576-row limit continues on '<table> (2)', ...
+"""
+
+import argparse
+import csv
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Determine paths (SECAI_TRANSFORM_DIR / SECAI_ANALYSIS_DIR override the defaults)
+SCRIPT_DIR = Path(__file__).parent
+ROOT_DIR = SCRIPT_DIR.parent
+
+sys.path.insert(0, str(ROOT_DIR))
+from Common.paths import TRANSFORM_DIR, ANALYSIS_DIR
+from Common.instrument import RunReport
+from Common.tables import TABLES
+from Common.xlsx_writer import XlsxWriter, STYLE_HEADER, MAX_ROWS
+
+TEMPLATE_PATH = ROOT_DIR.parent / "4-Templates" / "excel_sheet_names.txt"
+
+# Used when the template is not shipped alongside the scripts
+DEFAULT_SHEETS = [
+    'Introduction', 'Summary', 'Azure Landing Questions', 'Setup-Questions', 'Network security',
+    'Identity management', 'Privileged access', 'Data protection', 'Asset management',
+    'Logging and threat detection', 'Incident response', 'Posture and vulnerability manag',
+    'Endpoint security', 'Backup and recovery', 'DevOps security', 'Governance and strategy', 'Sources',
+]
+
+# Template domain tab -> the evidence tables placed after it (Common/tables.py names)
+DOMAIN_TABLES = {
+    'Network security': ['virtual_networks', 'vnet_prefixes', 'network_security_groups', 'nsg_rules',
+                         'azure_firewalls', 'private_endpoints'],
+    'Identity management': ['service_principals', 'applications', 'app_credentials'],
+    'Privileged access': ['role_assignments', 'privileged_service_principals'],
+    'Data protection': ['storage_accounts', 'key_vaults', 'sql_servers', 'sql_databases'],
+    'Asset management': ['resource_groups', 'resources'],
+    'Logging and threat detection': ['log_analytics_workspaces', 'diagnostic_settings'],
+    'Posture and vulnerability manag': ['secure_scores', 'security_assessments', 'defender_pricing'],
+    'Governance and strategy': ['policy_assignments'],
+}
+
+# Transform outputs outside the table catalog: name -> label
+EXTRA_TABLES = {
+    'privileged_service_principals': 'Privileged Service Principals',
+}
+
+
+def table_source(name):
+    """(sheet label, CSV name) for a table."""
+    if name in TABLES:
+        return TABLES[name].label, TABLES[name].csv_name
+    return EXTRA_TABLES[name], f"{name}.csv"
+
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument('--output', default=str(ANALYSIS_DIR / "security_assessment_workbook.xlsx"),
+                    help='Workbook to write (default: analysis/security_assessment_workbook.xlsx)')
+args = parser.parse_args()
+output_path = Path(args.output)
+
+# Create analysis directory
+ANALYSIS_DIR.mkdir(parents=True, exist_ok=True)
+output_path.parent.mkdir(parents=True, exist_ok=True)
+report = RunReport(Path(__file__).stem, ANALYSIS_DIR)
+
+print("=" * 70)
+print("ASSESSMENT WORKBOOK EXPORT")
+print("=" * 70)
+print()
+
+
+def template_sheets():
+    if TEMPLATE_PATH.exists():
+        names = [line.strip() for line in TEMPLATE_PATH.read_text(encoding='utf-8').splitlines() if line.strip()]
+        if names:
+            return names
+    return DEFAULT_SHEETS
+
+
+def csv_rows(path):
+    """(headers, row iterator) of a CSV, read lazily."""
+    f = open(path, newline='', encoding='utf-8-sig')
+    reader = csv.reader(f)
+    headers = next(reader, None) or []
+
+    def rows():
+        with f:
+            yield from reader
+    return headers, rows()
+
+
+# ============================================================================
+# Write Workbook
+# ============================================================================
+
+sheets = template_sheets()
+print(f"Template: {len(sheets)} tabs ({'4-Templates/excel_sheet_names.txt' if TEMPLATE_PATH.exists() else 'built-in'})")
+print(f"Writing {output_path}...")
+print()
+
+book = XlsxWriter(output_path, title='Azure Security Assessment')
+# Tabs are added in template order with each domain's tables right after it; the
+# domain, Introduction, Summary and Sources tabs are filled in once the counts are known
+tabs = {}        # template tab -> sheet index
+exported = []    # (domain, label, csv name, [(sheet, rows)])
+sources = []     # (csv name, bytes, modified)
+start = time.perf_counter()
+
+for name in sheets:
+    tabs[name] = book.add_sheet(name)
+    tables = DOMAIN_TABLES.get(name)
+    if tables is None:
+        continue
+    domain_exports = []
+    for label, csv_name in map(table_source, tables):
+        path = TRANSFORM_DIR / csv_name
+        if not path.exists():
+            continue
+        table_start = time.perf_counter()
+        headers, rows = csv_rows(path)
+        written = book.write_table(label, headers, rows)
+        elapsed = time.perf_counter() - table_start
+        total = sum(n for _, n in written)
+        report.add_input(csv_name, total, 'csv', elapsed)
+        stat = path.stat()
+        sources.append((csv_name, stat.st_size, datetime.fromtimestamp(stat.st_mtime).strftime('%Y-%m-%d %H:%M:%S')))
+        domain_exports.append((name, label, csv_name, written))
+        split = f" across {len(written)} sheets" if len(written) > 1 else ''
+        print(f"  ✓ {label}: {total} rows{split} ({elapsed:.2f}s)")
+    exported.extend(domain_exports)
+
+    # Domain tab: index of the evidence tables that follow it
+    with book.open_sheet(tabs[name], freeze_header=True, widths=[36, 40, 12, 40]) as sheet:
+        sheet.write_row(['Evidence Table', 'Sheets', 'Rows', 'Source CSV'], style=STYLE_HEADER)
+        for _, label, csv_name, written in domain_exports:
+            sheet.write_row([label, ', '.join(s for s, _ in written), sum(n for _, n in written), csv_name])
+        if not domain_exports:
+            sheet.write_row(['No evidence tables collected for this domain'])
+
+elapsed = time.perf_counter() - start
+total_rows = sum(n for *_, written in exported for _, n in written)
+
+if 'Introduction' in tabs:
+    with book.open_sheet(tabs['Introduction'], widths=[24, 80]) as sheet:
+        sheet.write_row(['Azure Security Assessment'], style=STYLE_HEADER)
+        sheet.write_row([])
+        sheet.write_row(['Generated', datetime.now().strftime('%Y-%m-%d %H:%M:%S')])
+        sheet.write_row(['Transformed Data', str(TRANSFORM_DIR)])
+        sheet.write_row(['Evidence Tables', len(exported)])
+        sheet.write_row(['Evidence Rows', total_rows])
+        sheet.write_row([])
+        sheet.write_row(['Each domain tab lists its evidence tables, which follow it in the workbook. '
+                         f'Tables longer than {MAX_ROWS - 1} rows continue on numbered sheets.'], numbers=False)
+
+if 'Summary' in tabs:
+    with book.open_sheet(tabs['Summary'], freeze_header=True, widths=[32, 36, 40, 12, 40]) as sheet:
+        sheet.write_row(['Domain', 'Evidence Table', 'Sheet', 'Rows', 'Source CSV'], style=STYLE_HEADER)
+        for domain, label, csv_name, written in exported:
+            for sheet_name, rows in written:
+                sheet.write_row([domain, label, sheet_name, rows, csv_name])
+
+if 'Sources' in tabs:
+    with book.open_sheet(tabs['Sources'], freeze_header=True, widths=[40, 14, 22]) as sheet:
+        sheet.write_row(['Source CSV', 'Bytes', 'Modified'], style=STYLE_HEADER)
+        for source in sources:
+            sheet.write_row(source)
+
+book.close()
+report.add_output(output_path, total_rows)
+
+print()
+print(f"✓ Created {output_path.name} ({len(book.sheets)} sheets, {total_rows} rows, "
+      f"{output_path.stat().st_size / 1024 / 1024:.1f} MB, {elapsed:.2f}s)")
+print()
+
+if not exported:
+    print("⚠ No transformed tables found - run the transformation scripts (11-17) first")
+    print()
+
+print("=" * 70)
+print(f"Analysis complete! Reports saved to: {ANALYSIS_DIR}")
+print(f"Run report: {report.write()}")
+print("=" * 70)
@@ -0,0 +1,518 @@
+#!/usr/bin/env python3
+"""
+Synthetic Tenant Generator
+Writes a realistic out/ directory (the files the collection scripts 01-09
+produce) for benchmarking and testing the Python scripts without customer data
+
+Resources are spread over subscriptions with a Zipf-like skew, so a few large
+subscriptions dominate the way they do in real tenants. Output is deterministic
+for a given --seed.
+
+Usage:
+  python generate_tenant.py --out ../bench/out --subscriptions 200 --resources 500
+  python generate_tenant.py --out ../bench/out --subscriptions 50 --skew 1.2 --duplicate-keys 0.05
+  python generate_tenant.py --out ../bench/out --compress gz
+"""
+
+import argparse
+import gzip
+import json
+import lzma
+import random
+import uuid
+import zlib
+from pathlib import Path
+
+# --compress choice -> text-mode opener for <name>.json.<ext>
+COMPRESSORS = {
+    'gz': lambda path: gzip.open(path, 'wt', encoding='utf-8-sig', compresslevel=6),
+    'xz': lambda path: lzma.open(path, 'wt', encoding='utf-8-sig', preset=1),
+}
+
+LOCATIONS = ['eastus', 'eastus2', 'westus2', 'westeurope', 'northeurope', 'uksouth',
+             'centralus', 'southeastasia', 'australiaeast', 'canadacentral']
+
+RESOURCE_TYPES = [
+    ('Microsoft.Compute/virtualMachines', 18),
+    ('Microsoft.Compute/disks', 16),
+    ('Microsoft.Network/networkInterfaces', 16),
+    ('Microsoft.Network/publicIPAddresses', 6),
+    ('Microsoft.Storage/storageAccounts', 8),
+    ('Microsoft.Web/sites', 7),
+    ('Microsoft.Web/serverFarms', 4),
+    ('Microsoft.KeyVault/vaults', 3),
+    ('Microsoft.Sql/servers', 2),
+    ('Microsoft.Sql/servers/databases', 4),
+    ('Microsoft.Insights/components', 4),
+    ('Microsoft.OperationalInsights/workspaces', 2),
+    ('Microsoft.ContainerRegistry/registries', 2),
+    ('Microsoft.ContainerService/managedClusters', 1),
+    ('Microsoft.Network/networkSecurityGroups', 4),
+    ('Microsoft.Network/virtualNetworks', 3),
+]
+
+ROLES = [
+    ('Reader', 30), ('Contributor', 22), ('Owner', 8), ('User Access Administrator', 3),
+    ('Storage Blob Data Reader', 8), ('Key Vault Secrets User', 6), ('Monitoring Reader', 8),
+    ('Security Reader', 5), ('Network Contributor', 5), ('Virtual Machine Contributor', 5),
+]
+
+ASSESSMENTS = [
+    'Machines should have vulnerability findings resolved',
+    'Storage accounts should restrict network access',
+    'MFA should be enabled on accounts with owner permissions on your subscription',
+    'Key vaults should have purge protection enabled',
+    'Management ports of virtual machines should be protected with just-in-time network access control',
+    'Diagnostic logs in Key Vault should be enabled',
+    'SQL servers should have an Azure Active Directory administrator provisioned',
+    'Internet-facing virtual machines should be protected with network security groups',
+    'System updates should be installed on your machines',
+    'Endpoint protection should be installed on your machines',
+]
+
+POLICIES = [
+    'Allowed locations', 'Require a tag on resources', 'Audit VMs that do not use managed disks',
+    'Azure Security Benchmark', 'Storage accounts should restrict network access',
+    'Key vaults should have soft delete enabled', 'Deploy Diagnostic Settings for Key Vault',
+    'Not allowed resource types', 'Configure Azure Defender for servers to be enabled',
+    'Secure transfer to storage accounts should be enabled',
+]
+
+DEFENDER_PLANS = ['VirtualMachines', 'SqlServers', 'AppServices', 'StorageAccounts',
+                  'SqlServerVirtualMachines', 'KeyVaults', 'Dns', 'Arm', 'OpenSourceRelationalDatabases',
+                  'Containers', 'CosmosDbs', 'CloudPosture']
+
+NSG_PORTS = ['22', '3389', '443', '80', '1433', '3306', '5985-5986', '8080', '1000-2000', '*']
+NSG_SOURCES = ['*', 'Internet', 'VirtualNetwork', '10.0.0.0/8', '192.168.0.0/16',
+               '203.0.113.0/24', 'AzureLoadBalancer', '0.0.0.0/0']
+
+
+class TenantGenerator:
+    """Builds one synthetic tenant; all randomness comes from a seeded RNG."""
+
+    def __init__(self, subscriptions, resources, skew, seed, duplicate_keys, indent, compress=None):
+        self.rng = random.Random(seed)
+        self.compress = compress
+        self.subscription_count = subscriptions
+        self.resources_per_sub = resources
+        self.skew = skew
+        self.duplicate_keys = duplicate_keys
+        self.indent = indent
+        self.subscriptions = [self.guid() for _ in range(subscriptions)]
+        self.management_groups = ['mg-root'] + [f"mg-{name}" for name in
+                                                ('platform', 'landingzones', 'corp', 'online', 'sandbox')]
+        # Tenant-wide principal pool: the same users/groups/SPs recur across subscriptions
+        principal_total = max(20, subscriptions * 8)
+        self.principals = [self.principal(i) for i in range(principal_total)]
+        self.principal_weights = [1 / (i + 1) ** 0.8 for i in range(principal_total)]
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+
+    def guid(self):
+        return str(uuid.UUID(int=self.rng.getrandbits(128), version=4))
+
+    def weighted(self, pairs):
+        return self.rng.choices([p[0] for p in pairs], weights=[p[1] for p in pairs])[0]
+
+    def principal(self, index):
+        ptype = self.weighted([('User', 50), ('Group', 25), ('ServicePrincipal', 25)])
+        name = {
+            'User': f"user{index}@contoso.com",
+            'Group': f"grp-{index}",
+            'ServicePrincipal': f"sp-automation-{index}",
+        }[ptype]
+        return {'id': self.guid(), 'type': ptype, 'name': name}
+
+    def subscription_sizes(self):
+        """Resources per subscription, Zipf-skewed around the requested mean."""
+        weights = [1 / (rank + 1) ** self.skew for rank in range(self.subscription_count)]
+        scale = self.resources_per_sub * self.subscription_count / sum(weights)
+        sizes = [max(1, int(w * scale)) for w in weights]
+        self.rng.shuffle(sizes)
+        return sizes
+
+    def write(self, path, items, wrap=None):
+        """
+        Write a JSON array (or {wrap: [...]}) element by element, with a BOM like
+        PowerShell; compressed to <path>.gz / .xz when compress is set.
+        """
+        indent = self.indent
+        if self.compress:
+            f = COMPRESSORS[self.compress](path.with_name(f"{path.name}.{self.compress}"))
+        else:
+            f = open(path, 'w', encoding='utf-8-sig')
+        with f:
+            f.write('{"%s": [' % wrap if wrap else '[')
+            first = True
+            for item in items:
+                text = item if isinstance(item, str) else json.dumps(item, indent=indent)
+                f.write(('\n' if first else ',\n') + text)
+                first = False
+            f.write('\n]}' if wrap else '\n]')
+
+    # ------------------------------------------------------------------
+    # Per-subscription evidence
+    # ------------------------------------------------------------------
+
+    def generate_subscription(self, out_dir, sub, size):
+        rng = self.rng
+        prefix = f"/subscriptions/{sub}"
+        rg_names = [f"rg-{self.rng.choice(['app', 'data', 'net', 'sec', 'shared', 'web'])}-{i:03d}"
+                    for i in range(max(1, size // 15))]
+        home = rng.choice(LOCATIONS)
+
+        def location():
+            return home if rng.random() < 0.7 else rng.choice(LOCATIONS)
+
+        self.write(out_dir / f"{sub}_rgs.json", ({
+            'id': f"{prefix}/resourceGroups/{rg}",
+            'location': location(),
+            'managedBy': None,
+            'name': rg,
+            'properties': {'provisioningState': 'Succeeded'},
+            'tags': {'env': rng.choice(['prod', 'dev', 'test'])} if rng.random() < 0.6 else None,
+            'type': 'Microsoft.Resources/resourceGroups',
+        } for rg in rg_names))
+
+        resource_ids = []
+        sql_servers = {}     # resource group -> SQL server names, parents for databases
+
+        def resources():
+            for i in range(size):
+                rtype = self.weighted(RESOURCE_TYPES)
+                rg = rng.choice(rg_names)
+                if rtype == 'Microsoft.Sql/servers/databases' and not sql_servers.get(rg):
+                    # A database needs a parent server in its resource group
+                    rtype = 'Microsoft.Sql/servers'
+                if rtype == 'Microsoft.Sql/servers/databases':
+                    # Child resources nest under their parent, as az resource list reports them
+                    server = rng.choice(sql_servers[rg])
+                    name = f"{server}/database{i:05d}"
+                    rid = f"{prefix}/resourceGroups/{rg}/providers/Microsoft.Sql/servers/{server}/databases/database{i:05d}"
+                else:
+                    name = f"{rtype.split('/')[-1][:8].lower()}{i:05d}"
+                    rid = f"{prefix}/resourceGroups/{rg}/providers/{rtype}/{name}"
+                    if rtype == 'Microsoft.Sql/servers':
+                        sql_servers.setdefault(rg, []).append(name)
+                resource_ids.append(rid)
+                yield {
+                    'id': rid, 'name': name, 'type': rtype, 'resourceGroup': rg, 'location': location(),
+                    'kind': rng.choice(['', '', 'StorageV2', 'app', 'linux']),
+                    'sku': {'name': rng.choice(['Standard', 'Premium_LRS', 'Standard_LRS', 'Basic'])}
+                    if rng.random() < 0.5 else None,
+                    'provisioningState': 'Succeeded' if rng.random() < 0.97 else 'Failed',
+                    'tags': {'owner': f"team{rng.randint(1, 40)}", 'costCenter': str(rng.randint(1000, 1100))}
+                    if rng.random() < 0.5 else None,
+                }
+        self.write(out_dir / f"{sub}_resources.json", resources())
+
+        self.write(out_dir / f"{sub}_secure_score.json", [{
+            'displayName': 'ASC score',
+            'current': round(rng.uniform(2, 50), 2),
+            'max': 58,
+            'weight': size,
+            'id': f"{prefix}/providers/Microsoft.Security/secureScores/ascScore",
+            'name': 'ascScore',
+            'type': 'Microsoft.Security/secureScores',
+        }])
+
+        self.write(out_dir / f"{sub}_security_assessments.json",
+                   (self.assessment(prefix, rid) for rid in self.sample(resource_ids, size // 2 + 5)))
+
+        self.write(out_dir / f"{sub}_role_assignments.json",
+                   (self.role_assignment(prefix, rg_names, resource_ids) for _ in range(size // 4 + 5)))
+
+        self.generate_network(out_dir, sub, prefix, rg_names, location, size)
+        self.generate_data_protection(out_dir, sub, prefix, rg_names, location, size)
+        self.generate_logging_and_policy(out_dir, sub, prefix, rg_names, location, size)
+
+    def sample(self, population, count):
+        return [self.rng.choice(population) for _ in range(count)] if population else []
+
+    def assessment(self, prefix, resource_id):
+        rng = self.rng
+        code = self.weighted([('Healthy', 45), ('Unhealthy', 40), ('NotApplicable', 15)])
+        name = rng.choice(ASSESSMENTS)
+        # Defender reports resource IDs in mixed case; joins must normalize
+        affected = resource_id.lower() if rng.random() < 0.3 else resource_id
+        item = {
+            'displayName': name,
+            'id': f"{affected}/providers/Microsoft.Security/assessments/{self.guid()}",
+            'name': self.guid(),
+            'status': {'code': code, 'cause': 'OffByPolicy' if code == 'NotApplicable' else '',
+                       'description': f"{name}. " * rng.randint(1, 4)},
+            'resourceDetails': {'Source': 'Azure', 'id': affected},
+            'type': 'Microsoft.Security/assessments',
+        }
+        if rng.random() < self.duplicate_keys:
+            # Re-collected record: a second "status" member that only partially repeats the first
+            text = json.dumps(item, indent=self.indent)
+            return text[:text.rstrip().rfind('}')] + ', "status": {"code": "%s", "description": ""}}' % code
+        return item
+
+    def role_assignment(self, prefix, rg_names, resource_ids):
+        rng = self.rng
+        principal = rng.choices(self.principals, weights=self.principal_weights)[0]
+        role = self.weighted(ROLES)
+        scope = self.weighted([
+            (prefix, 40),
+            (f"{prefix}/resourceGroups/{rng.choice(rg_names)}", 35),
+            (rng.choice(resource_ids) if resource_ids else prefix, 15),
+            (f"/providers/Microsoft.Management/managementGroups/{rng.choice(self.management_groups)}", 10),
+        ])
+        return {
+            'id': f"{prefix}/providers/Microsoft.Authorization/roleAssignments/{self.guid()}",
+            'name': self.guid(),
+            'principalId': principal['id'],
+            'principalName': principal['name'],
+            'principalType': principal['type'],
+            'roleDefinitionId': f"{prefix}/providers/Microsoft.Authorization/roleDefinitions/{zlib.crc32(role.encode()):08x}",
+            'roleDefinitionName': role,
+            'scope': scope,
+            'type': 'Microsoft.Authorization/roleAssignments',
+        }
+
+    def generate_network(self, out_dir, sub, prefix, rg_names, location, size):
+        rng = self.rng
+
+        def vnet(i):
+            rg = rng.choice(rg_names)
+            second = rng.randint(0, 255)
+            subnets = [{
+                'name': f"snet-{j}",
+                'addressPrefix': f"10.{second}.{j}.0/24",
+                'provisioningState': 'Succeeded',
+            } for j in range(rng.randint(1, 8))]
+            return {
+                'id': f"{prefix}/resourceGroups/{rg}/providers/Microsoft.Network/virtualNetworks/vnet-{i}",
+                'name': f"vnet-{i}", 'resourceGroup': rg, 'location': location(),
+                'addressSpace': {'addressPrefixes': [f"10.{second}.0.0/16"]},
+                'subnets': subnets, 'provisioningState': 'Succeeded',
+            }
+        self.write(out_dir / f"{sub}_vnets.json", (vnet(i) for i in range(size // 40 + 1)))
+
+        def rule(j, direction):
+            return {
+                'name': f"rule-{direction.lower()}-{j}",
+                'priority': 100 + j * 10,
+                'direction': direction,
+                'access': 'Allow' if rng.random() < 0.75 else 'Deny',
+                'protocol': rng.choice(['Tcp', 'Tcp', 'Udp', '*']),
+                'sourceAddressPrefix': rng.choice(NSG_SOURCES),
+                'sourcePortRange': '*',
+                'destinationAddressPrefix': '*',
+                'destinationPortRange': rng.choice(NSG_PORTS),
+                'provisioningState': 'Succeeded',
+            }
+
+        def nsg(i):
+            rg = rng.choice(rg_names)
+            return {
+                'id': f"{prefix}/resourceGroups/{rg}/providers/Microsoft.Network/networkSecurityGroups/nsg-{i}",
+                'name': f"nsg-{i}", 'resourceGroup': rg, 'location': location(),
+                'securityRules': [rule(j, rng.choice(['Inbound', 'Inbound', 'Outbound']))
+                                  for j in range(rng.randint(0, 12))],
+                'defaultSecurityRules': [
+                    {'name': 'AllowVnetInBound', 'priority': 65000, 'direction': 'Inbound', 'access': 'Allow',
+                     'protocol': '*', 'sourceAddressPrefix': 'VirtualNetwork', 'sourcePortRange': '*',
+                     'destinationAddressPrefix': 'VirtualNetwork', 'destinationPortRange': '*'},
+                    {'name': 'DenyAllInBound', 'priority': 65500, 'direction': 'Inbound', 'access': 'Deny',
+                     'protocol': '*', 'sourceAddressPrefix': '*', 'sourcePortRange': '*',
+                     'destinationAddressPrefix': '*', 'destinationPortRange': '*'},
+                ],
+                'provisioningState': 'Succeeded',
+            }
+        self.write(out_dir / f"{sub}_nsgs.json", (nsg(i) for i in range(size // 20 + 1)))
+
+        firewalls = [{
+            'id': f"{prefix}/resourceGroups/{rg_names[0]}/providers/Microsoft.Network/azureFirewalls/afw-hub",
+            'name': 'afw-hub', 'resourceGroup': rg_names[0], 'location': location(),
+            'sku': {'name': 'AZFW_VNet', 'tier': rng.choice(['Standard', 'Premium'])},
+            'provisioningState': 'Succeeded',
+        }] if rng.random() < 0.1 else []
+        self.write(out_dir / f"{sub}_az_firewalls.json", firewalls)
+
+        self.write(out_dir / f"{sub}_private_endpoints.json", ({
+            'id': f"{prefix}/resourceGroups/{rg}/providers/Microsoft.Network/privateEndpoints/pe-{i}",
+            'name': f"pe-{i}", 'resourceGroup': rg, 'location': location(),
+            'privateLinkServiceConnections': [{'name': f"plsc-{i}"}],
+            'provisioningState': 'Succeeded',
+        } for i, rg in enumerate(self.sample(rg_names, size // 30))))
+
+    def generate_data_protection(self, out_dir, sub, prefix, rg_names, location, size):
+        rng = self.rng
+
+        self.write(out_dir / f"{sub}_storage.json", ({
+            'id': f"{prefix}/resourceGroups/{rg}/providers/Microsoft.Storage/storageAccounts/st{sub[:6]}{i:04d}",
+            'name': f"st{sub[:6]}{i:04d}", 'resourceGroup': rg, 'location': location(),
+            'sku': rng.choice([{'name': 'Standard_LRS', 'tier': 'Standard'}, {'name': 'Standard_GRS', 'tier': 'Standard'},
+                               {'name': 'Premium_LRS', 'tier': 'Premium'}]),
+            'accessTier': rng.choice(['Hot', 'Cool']),
+            'enableHttpsTrafficOnly': rng.random() < 0.9,
+            'allowBlobPublicAccess': rng.choice([True, False, False, None]),
+            'encryption': {'keySource': rng.choice(['Microsoft.Storage', 'Microsoft.Storage', 'Microsoft.Keyvault'])},
+            'provisioningState': 'Succeeded',
+        } for i, rg in enumerate(self.sample(rg_names, size // 25 + 1))))
+
+        self.write(out_dir / f"{sub}_keyvaults.json", ({
+            'id': f"{prefix}/resourceGroups/{rg}/providers/Microsoft.KeyVault/vaults/kv-{sub[:6]}-{i}",
+            'name': f"kv-{sub[:6]}-{i}", 'resourceGroup': rg, 'location': location(),
+            'sku': {'name': rng.choice(['standard', 'premium'])},
+            'properties': {
+                'enableSoftDelete': rng.random() < 0.85,
+                'enablePurgeProtection': rng.random() < 0.4,
+                'publicNetworkAccess': rng.choice(['Enabled', 'Disabled']),
+                'enabledForDeployment': rng.random() < 0.2,
+                'enabledForDiskEncryption': rng.random() < 0.3,
+                'enabledForTemplateDeployment': rng.random() < 0.2,
+            },
+        } for i, rg in enumerate(self.sample(rg_names, size // 40 + 1))))
+
+        servers = [(rng.choice(rg_names), f"sql-{sub[:6]}-{i}") for i in range(size // 60)]
+        self.write(out_dir / f"{sub}_sql_servers.json", ({
+            'id': f"{prefix}/resourceGroups/{rg}/providers/Microsoft.Sql/servers/{name}",
+            'name': name, 'resourceGroup': rg, 'location': location(), 'version': '12.0',
+            'administratorLogin': 'sqladmin',
+            'publicNetworkAccess': rng.choice(['Enabled', 'Disabled']),
+            'minimalTlsVersion': rng.choice(['1.2', '1.2', '1.0', None]),
+            'state': 'Ready',
+        } for rg, name in servers))
+
+        self.write(out_dir / f"{sub}_sql_dbs.json", ({
+            'id': f"{prefix}/resourceGroups/{rg}/providers/Microsoft.Sql/servers/{name}/databases/db{j}",
+            'name': f"db{j}", 'resourceGroup': rg, 'location': location(),
+            'sku': rng.choice([{'name': 'S0', 'tier': 'Standard'}, {'name': 'GP_Gen5_2', 'tier': 'GeneralPurpose'},
+                               {'name': 'Basic', 'tier': 'Basic'}]),
+            'maxSizeBytes': rng.choice([2147483648, 268435456000, 34359738368]),
+            'status': 'Online', 'collation': 'SQL_Latin1_General_CP1_CI_AS',
+        } for rg, name in servers for j in range(rng.randint(1, 3))))
+
+    def generate_logging_and_policy(self, out_dir, sub, prefix, rg_names, location, size):
+        rng = self.rng
+
+        self.write(out_dir / f"{sub}_la_workspaces.json", ({
+            'id': f"{prefix}/resourceGroups/{rg}/providers/Microsoft.OperationalInsights/workspaces/law-{i}",
+            'name': f"law-{i}", 'resourceGroup': rg, 'location': location(),
+            'properties': {
+                'sku': {'name': rng.choice(['PerGB2018', 'PerGB2018', 'CapacityReservation'])},
+                'retentionInDays': rng.choice([30, 30, 90, 180, 365]),
+                'publicNetworkAccessForIngestion': rng.choice(['Enabled', 'Disabled']),
+                'provisioningState': 'Succeeded',
+            },
+        } for i, rg in enumerate(self.sample(rg_names, size // 100 + 1))))
+
+        self.write(out_dir / f"{sub}_subscription_diag.json", ({
+            'id': f"{prefix}/providers/microsoft.insights/diagnosticSettings/diag-{i}",
+            'name': f"diag-{i}",
+            'properties': {
+                'workspaceId': f"{prefix}/resourceGroups/{rg_names[0]}/providers/Microsoft.OperationalInsights/workspaces/law-0"
+                if rng.random() < 0.8 else None,
+                'storageAccountId': None,
+                'eventHubName': None,
+                'logs': [{'category': c, 'enabled': rng.random() < 0.8}
+                         for c in ('Administrative', 'Security', 'Policy', 'Alert')],
+                'metrics': [],
+            },
+        } for i in range(rng.randint(0, 2))), wrap='value')
+
+        self.write(out_dir / f"{sub}_policy_assignments.json", ({
+            'id': f"{prefix}/providers/Microsoft.Authorization/policyAssignments/{self.guid()[:24]}",
+            'name': self.guid()[:24],
+            'properties': {
+                'displayName': name,
+                'description': f"{name} (assigned by platform team)",
+                'enforcementMode': 'Default' if rng.random() < 0.8 else 'DoNotEnforce',
+                'policyDefinitionId': f"/providers/Microsoft.Authorization/policyDefinitions/{zlib.crc32(name.encode()):08x}",
+                'scope': rng.choice([prefix, f"{prefix}/resourceGroups/{rng.choice(rg_names)}",
+                                     f"/providers/Microsoft.Management/managementGroups/{rng.choice(self.management_groups)}"]),
+            },
+        } for name in rng.sample(POLICIES, rng.randint(3, len(POLICIES)))))
+
+        self.write(out_dir / f"{sub}_defender_pricing.json", ({
+            'id': f"{prefix}/providers/Microsoft.Security/pricings/{plan}",
+            'name': plan,
+            'properties': {'pricingTier': 'Standard' if rng.random() < 0.4 else 'Free'},
+        } for plan in DEFENDER_PLANS), wrap='value')
+
+    # ------------------------------------------------------------------
+    # Tenant-level evidence
+    # ------------------------------------------------------------------
+
+    def generate_tenant_files(self, out_dir):
+        rng = self.rng
+        mg_parents = {mg: ('mg-root' if mg in ('mg-platform', 'mg-landingzones', 'mg-sandbox') else 'mg-landingzones')
+                      for mg in self.management_groups[1:]}
+        # Like 01_scope_discovery.ps1: each subscription under its direct group, plus the parent links
+        memberships = [{'mg': rng.choice(self.management_groups[1:]), 'subscriptionId': sub}
+                       for sub in self.subscriptions]
+        self.write(out_dir / 'mg_sub_map.json', memberships)
+        self.write(out_dir / 'mg_hierarchy.json', ({'mg': mg, 'parent': parent} for mg, parent in mg_parents.items()))
+        self.write(out_dir / 'management_groups.json', ({
+            'id': f"/providers/Microsoft.Management/managementGroups/{mg}",
+            'name': mg, 'displayName': mg, 'type': 'Microsoft.Management/managementGroups',
+        } for mg in self.management_groups))
+        self.write(out_dir / 'subscriptions.json', ({
+            'id': sub, 'name': f"sub-{i:04d}", 'state': 'Enabled', 'tenantId': self.guid(),
+        } for i, sub in enumerate(self.subscriptions)))
+
+        def credentials(kind):
+            return [{
+                'keyId': self.guid(),
+                'displayName': f"{kind}-{j}",
+                'startDateTime': '2024-01-01T00:00:00Z',
+                'endDateTime': f"{rng.choice([2024, 2025, 2026, 2027, 2099])}-{rng.randint(1, 12):02d}-15T00:00:00Z",
+            } for j in range(rng.randint(0, 2))]
+
+        service_principals = [p for p in self.principals if p['type'] == 'ServicePrincipal']
+        apps = [(p, self.guid()) for p in service_principals]
+        self.write(out_dir / 'tenant_applications.json', ({
+            'id': self.guid(), 'appId': app_id, 'displayName': p['name'],
+            'signInAudience': 'AzureADMyOrg',
+            'passwordCredentials': credentials('secret'), 'keyCredentials': credentials('cert'),
+        } for p, app_id in apps))
+        self.write(out_dir / 'tenant_service_principals.json', ({
+            'id': p['id'], 'appId': app_id, 'displayName': p['name'],
+            'servicePrincipalType': 'Application', 'accountEnabled': rng.random() < 0.95,
+            'passwordCredentials': credentials('secret'), 'keyCredentials': credentials('cert'),
+        } for p, app_id in apps))
+
+    def generate(self, out_dir):
+        out_dir.mkdir(parents=True, exist_ok=True)
+        sizes = self.subscription_sizes()
+        for sub, size in zip(self.subscriptions, sizes):
+            self.generate_subscription(out_dir, sub, size)
+        self.generate_tenant_files(out_dir)
+        return sum(sizes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--out', required=True, help='Directory to write the synthetic out/ files to')
+    parser.add_argument('--subscriptions', type=int, default=20, help='Number of subscriptions (default 20)')
+    parser.add_argument('--resources', type=int, default=200,
+                        help='Mean resources per subscription (default 200)')
+    parser.add_argument('--skew', type=float, default=1.0,
+                        help='Zipf exponent for resources across subscriptions; 0 = uniform (default 1.0)')
+    parser.add_argument('--duplicate-keys', type=float, default=0.0,
+                        help='Fraction of security assessments written with duplicate keys (default 0)')
+    parser.add_argument('--indent', type=int, default=2,
+                        help='JSON indent like ConvertTo-Json output; 0 writes compact JSON (default 2)')
+    parser.add_argument('--compress', choices=sorted(COMPRESSORS),
+                        help='Write every file compressed (<name>.json.gz or .json.xz)')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed (default 42)')
+    args = parser.parse_args()
+
+    out_dir = Path(args.out)
+    generator = TenantGenerator(args.subscriptions, args.resources, args.skew, args.seed,
+                                args.duplicate_keys, args.indent or None, args.compress)
+    total = generator.generate(out_dir)
+    files = sum(1 for _ in out_dir.iterdir())
+    size_mb = sum(p.stat().st_size for p in out_dir.iterdir()) / (1024 * 1024)
+    print(f"✓ Generated {args.subscriptions} subscriptions, {total} resources")
+    print(f"  {files} files, {size_mb:.1f} MB in {out_dir}")
+
+
+if __name__ == '__main__':
+    main()
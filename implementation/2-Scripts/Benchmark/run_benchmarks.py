@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Benchmark Harness
+Runs each Python stage in run_pipeline.STAGES as its own process against a
+generated or existing out/ corpus and reports wall time, rows, rows/sec and peak RSS
+
+Every stage runs with SECAI_OUT_DIR / SECAI_TRANSFORM_DIR / SECAI_ANALYSIS_DIR
+(and SECAI_HISTORY_DIR) pointed at the work directory, so the repository's own
+out/ and posture history are never touched. The evidence counter (stage 10)
+runs with --no-cache so every repeat scans the corpus; pass --counter-cache
+to time the cached path instead.
+Compare against an earlier report with --baseline to catch slowdowns.
+
+Usage:
+  python run_benchmarks.py --subscriptions 200 --resources 500 --work-dir ../bench
+  python run_benchmarks.py --corpus D:/engagement/out --workers 0 --repeat 3
+  python run_benchmarks.py --work-dir ../bench --baseline ../bench/baseline.json --tolerance 20
+  python run_benchmarks.py --json-backend stdlib --report ../bench/stdlib.json
+  python run_benchmarks.py --json-backend orjson --baseline ../bench/stdlib.json
+"""
+
+import argparse
+import csv
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+ROOT_DIR = SCRIPT_DIR.parent
+
+sys.path.insert(0, str(ROOT_DIR))
+sys.path.insert(0, str(SCRIPT_DIR))
+from run_pipeline import STAGES
+from Common.json_backend import BACKEND_ENV, BACKENDS, resolve_backend
+from Common.tables import TABLES
+from generate_tenant import TenantGenerator
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# Transformed tables each analysis stage reads (its input rows)
+ANALYSIS_INPUTS = {
+    '18': ['secure_scores', 'security_assessments', 'key_vaults', 'sql_servers', 'role_assignments'],
+    '19': ['secure_scores', 'security_assessments', 'resources', 'resource_groups', 'role_assignments',
+           'storage_accounts', 'key_vaults', 'virtual_networks', 'network_security_groups'],
+    '20': ['security_assessments', 'resources'],
+    '21': ['role_assignments'],
+    '22': ['nsg_rules'],
+    '23': ['vnet_prefixes'],
+    '26': list(TABLES),
+}
+
+
+# ============================================================================
+# Process measurement
+# ============================================================================
+
+def _maxrss_mb(rusage):
+    # ru_maxrss is kilobytes on Linux and bytes on macOS
+    scale = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return rusage.ru_maxrss / scale
+
+
+def run_measured(argv, env, log_path):
+    """Run one process; returns (exit code, wall seconds, peak RSS in MB or None)."""
+    with open(log_path, 'w', encoding='utf-8') as log:
+        start = time.perf_counter()
+        proc = subprocess.Popen(argv, stdout=log, stderr=subprocess.STDOUT, env=env)
+        peak = None
+        if hasattr(os, 'wait4'):
+            _, status, rusage = os.wait4(proc.pid, 0)
+            wall = time.perf_counter() - start
+            proc.returncode = os.waitstatus_to_exitcode(status) if hasattr(os, 'waitstatus_to_exitcode') else status
+            peak = _maxrss_mb(rusage)
+        else:
+            # No wait4 (Windows): sample the working set if psutil is installed
+            sampler = psutil.Process(proc.pid) if psutil else None
+            while proc.poll() is None:
+                if sampler is not None:
+                    try:
+                        rss = sampler.memory_info().rss / (1024 * 1024)
+                        peak = rss if peak is None else max(peak, rss)
+                    except psutil.Error:
+                        pass
+                time.sleep(0.02)
+            wall = time.perf_counter() - start
+    return proc.returncode, wall, peak
+
+
+# ============================================================================
+# Row counting
+# ============================================================================
+
+def table_rows(transform_dir, name):
+    stats_path = transform_dir / f"{name}.stats.json"
+    if not stats_path.exists():
+        return 0
+    with open(stats_path, 'r', encoding='utf-8') as f:
+        return json.load(f).get('rows', 0)
+
+
+def stage_rows(stage, started, dirs):
+    """Rows a stage processed: evidence items (10), rows written (11-17), rows read (18-26)."""
+    if stage.key == '10':
+        counts_path = dirs['out'] / 'evidence_counts.csv'
+        if not counts_path.exists():
+            return 0
+        with open(counts_path, 'r', encoding='utf-8-sig', newline='') as f:
+            return sum(int(row.get('evidence_count') or 0) for row in csv.DictReader(f))
+    if stage.transform:
+        total = 0
+        for stats_path in dirs['transformed'].glob('*.stats.json'):
+            if stats_path.stat().st_mtime >= started:
+                with open(stats_path, 'r', encoding='utf-8') as f:
+                    total += json.load(f).get('rows', 0)
+        return total
+    return sum(table_rows(dirs['transformed'], name) for name in ANALYSIS_INPUTS.get(stage.key, ()))
+
+
+# ============================================================================
+# Main
+# ============================================================================
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--work-dir', default=str(ROOT_DIR / 'bench'),
+                        help='Where the corpus, outputs, logs and report go (default 2-Scripts/bench)')
+    parser.add_argument('--corpus', help='Use an existing out/ directory instead of generating one')
+    parser.add_argument('--subscriptions', type=int, default=20)
+    parser.add_argument('--resources', type=int, default=200, help='Mean resources per subscription')
+    parser.add_argument('--skew', type=float, default=1.0)
+    parser.add_argument('--duplicate-keys', type=float, default=0.02)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--compress', choices=['gz', 'xz'], help='Generate the corpus compressed')
+    parser.add_argument('--stages', default='', help='Comma-separated stage numbers (default: all)')
+    parser.add_argument('--workers', type=int, default=1, help='--workers passed to the transform stages')
+    parser.add_argument('--counter-cache', action='store_true',
+                        help="Let stage 10 reuse its count cache (default: --no-cache, so the scan is timed)")
+    parser.add_argument('--repeat', type=int, default=1, help='Runs per stage; the fastest is reported')
+    parser.add_argument('--json-backend', choices=BACKENDS, default='auto',
+                        help=f'JSON decoder for stages 10-17 ({BACKEND_ENV}; default auto = orjson if installed)')
+    parser.add_argument('--report', help='Report JSON path (default <work-dir>/benchmark_report.json)')
+    parser.add_argument('--baseline', help='Earlier report JSON to compare wall times against')
+    parser.add_argument('--tolerance', type=float, default=20.0,
+                        help='Allowed slowdown vs. baseline in percent before failing (default 20)')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    work_dir = Path(args.work_dir).resolve()
+    baseline = None
+    if args.baseline:
+        # Read up front: the new report may be written over the same file
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = {r['stage']: r for r in json.load(f).get('results', [])}
+    dirs = {
+        'out': Path(args.corpus).resolve() if args.corpus else work_dir / 'out',
+        'transformed': work_dir / 'transformed',
+        'analysis': work_dir / 'analysis',
+        'history': work_dir / 'history',
+        'logs': work_dir / 'logs',
+    }
+    for key in ('transformed', 'analysis', 'logs'):
+        dirs[key].mkdir(parents=True, exist_ok=True)
+
+    print("=" * 70)
+    print("SecAI Script Benchmark")
+    print("=" * 70)
+
+    corpus = {'path': str(dirs['out'])}
+    if not args.corpus:
+        print(f"Generating corpus: {args.subscriptions} subscriptions x ~{args.resources} resources "
+              f"(skew {args.skew}, seed {args.seed})...")
+        generator = TenantGenerator(args.subscriptions, args.resources, args.skew, args.seed,
+                                    args.duplicate_keys, 2, args.compress)
+        start = time.perf_counter()
+        corpus['resources'] = generator.generate(dirs['out'])
+        print(f"  ✓ Generated in {time.perf_counter() - start:.1f}s")
+        corpus.update(subscriptions=args.subscriptions, resources_per_sub=args.resources,
+                      skew=args.skew, duplicate_keys=args.duplicate_keys, seed=args.seed,
+                      compress=args.compress or '')
+    input_files = [p for p in dirs['out'].iterdir() if p.is_file()]
+    corpus['files'] = len(input_files)
+    corpus['megabytes'] = round(sum(p.stat().st_size for p in input_files) / (1024 * 1024), 1)
+    print(f"Corpus: {dirs['out']} ({corpus['files']} files, {corpus['megabytes']} MB)")
+    print()
+
+    env = dict(os.environ, SECAI_OUT_DIR=str(dirs['out']), SECAI_TRANSFORM_DIR=str(dirs['transformed']),
+               SECAI_ANALYSIS_DIR=str(dirs['analysis']), SECAI_HISTORY_DIR=str(dirs['history']),
+               PYTHONIOENCODING='utf-8')
+    env[BACKEND_ENV] = args.json_backend
+    json_backend = resolve_backend(args.json_backend)
+    print(f"JSON backend: {json_backend}")
+    print()
+    selected = {s.strip() for s in args.stages.split(',') if s.strip()}
+
+    results = []
+    for stage in STAGES:
+        if selected and stage.key not in selected:
+            continue
+        argv = [sys.executable, str(stage.script)]
+        if stage.transform:
+            argv += ['--workers', str(args.workers)]
+        if stage.key == '10' and not args.counter_cache:
+            argv.append('--no-cache')
+        best = None
+        for _ in range(max(1, args.repeat)):
+            started = time.time()
+            code, wall, peak = run_measured(argv, env, dirs['logs'] / f"{stage.script.stem}.log")
+            run = {'code': code, 'wall': wall, 'peak': peak, 'started': started}
+            if best is None or (code == 0 and wall < best['wall']):
+                best = run
+            if code != 0:
+                break
+        rows = stage_rows(stage, best['started'], dirs) if best['code'] == 0 else 0
+        result = {
+            'stage': stage.key,
+            'script': stage.script.name,
+            'ok': best['code'] == 0,
+            'wall_seconds': round(best['wall'], 3),
+            'rows': rows,
+            'rows_per_second': round(rows / best['wall'], 1) if best['wall'] > 0 else 0,
+            'peak_rss_mb': round(best['peak'], 1) if best['peak'] is not None else None,
+        }
+        results.append(result)
+        status = 'OK' if result['ok'] else f"FAILED (exit {best['code']}, see logs/)"
+        print(f"  [{status}] {stage.script.name} - {result['wall_seconds']:.2f}s")
+
+    print()
+    print(f"{'Stage':<6}{'Script':<44}{'Wall (s)':>10}{'Rows':>10}{'Rows/s':>12}{'Peak RSS (MB)':>15}")
+    print("-" * 97)
+    for r in results:
+        rss = f"{r['peak_rss_mb']:.1f}" if r['peak_rss_mb'] is not None else 'n/a'
+        print(f"{r['stage']:<6}{r['script']:<44}{r['wall_seconds']:>10.2f}{r['rows']:>10}"
+              f"{r['rows_per_second']:>12.0f}{rss:>15}")
+    print()
+
+    report = {
+        'generated_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'workers': args.workers,
+        'repeat': args.repeat,
+        'counter_cache': args.counter_cache,
+        'json_backend': json_backend,
+        'corpus': corpus,
+        'results': results,
+    }
+    report_path = Path(args.report) if args.report else work_dir / 'benchmark_report.json'
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"✓ Report written to {report_path}")
+
+    failed = [r for r in results if not r['ok']]
+    regressions = []
+    if baseline is not None:
+        print()
+        print(f"Compared with baseline {args.baseline} (tolerance {args.tolerance:.0f}%):")
+        for r in results:
+            base = baseline.get(r['stage'])
+            if not base or not base.get('wall_seconds'):
+                continue
+            change = (r['wall_seconds'] / base['wall_seconds'] - 1) * 100
+            slower = change > args.tolerance
+            if slower:
+                regressions.append(r)
+            print(f"  [{'SLOWER' if slower else 'OK'}] {r['script']}: {base['wall_seconds']:.2f}s -> "
+                  f"{r['wall_seconds']:.2f}s ({change:+.0f}%)")
+
+    print("=" * 70)
+    if failed or regressions:
+        print(f"Benchmark finished with {len(failed)} failed stage(s) and {len(regressions)} regression(s)")
+        print("=" * 70)
+        sys.exit(1)
+    print("Benchmark complete!")
+    print("=" * 70)
+
+
+if __name__ == '__main__':
+    main()
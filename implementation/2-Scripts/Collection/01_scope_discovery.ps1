@@ -163,7 +163,9 @@ else {
 Write-Host ""
 Write-Host "Mapping subscriptions to management groups..." -ForegroundColor Yellow
 $MapJsonPath = Join-Path $OutDir "mg_sub_map.json"
+$HierarchyJsonPath = Join-Path $OutDir "mg_hierarchy.json"
 $mappings = @()
+$hierarchy = @()
 
 # Only try mapping if we have management groups
 if ($mgData -and $mgData.Count -gt 0) {
@@ -174,16 +176,32 @@ if ($mgData -and $mgData.Count -gt 0) {
         Write-Host "  Checking MG: $mgName..." -ForegroundColor Gray
         
         try {
-            # Try to get subscriptions under this MG
-            $mgSubs = az account management-group show --name $mgName --expand --recurse --query "children[?type=='Microsoft.Management/managementGroups/subscriptions'].name" -o tsv 2>$null
+            # One expanded call gives this MG's parent, its direct subscriptions and its child MGs
+            $mgTreeOutput = az account management-group show --name $mgName --expand --recurse -o json 2>$null
             
-            if ($LASTEXITCODE -eq 0 -and $mgSubs) {
-                foreach ($sub in $mgSubs -split "`n") {
-                    $sub = $sub.Trim()
-                    if ([string]::IsNullOrWhiteSpace($sub)) { continue }
-                    $mappings += @{
+            if ($LASTEXITCODE -eq 0 -and $mgTreeOutput) {
+                $mgTreeLines = $mgTreeOutput | Where-Object { $_ -notmatch '^WARNING:' -and $_ -notmatch 'InsecureRequestWarning' -and $_ -notmatch 'urllib3' -and $_ -notmatch 'site-packages' -and $_.Trim() -ne '' }
+                $mgTree = ($mgTreeLines -join "`n") | ConvertFrom-Json
+                
+                if ($mgTree.details -and $mgTree.details.parent -and $mgTree.details.parent.name) {
+                    $hierarchy += @{
                         mg = $mgName
-                        subscriptionId = $sub
+                        parent = $mgTree.details.parent.name
+                    }
+                }
+                foreach ($child in @($mgTree.children)) {
+                    if (-not $child -or [string]::IsNullOrWhiteSpace($child.name)) { continue }
+                    if ($child.type -eq 'Microsoft.Management/managementGroups/subscriptions' -or $child.type -eq '/subscriptions') {
+                        $mappings += @{
+                            mg = $mgName
+                            subscriptionId = $child.name
+                        }
+                    }
+                    elseif ($child.type -eq 'Microsoft.Management/managementGroups') {
+                        $hierarchy += @{
+                            mg = $child.name
+                            parent = $mgName
+                        }
                     }
                 }
             }
@@ -235,6 +253,15 @@ if ($mappings.Count -eq 0 -and $mgData -and $mgData.Count -gt 0) {
 $mappings | ConvertTo-Json -Depth 10 | Set-Content -Path $MapJsonPath -Encoding UTF8
 Write-Host "  Total mapped: $($mappings.Count) subscription(s) to management groups" -ForegroundColor Green
 
+# Parent links let the RBAC analysis walk a subscription's management groups up to the tenant root
+if ($hierarchy.Count -gt 0) {
+    ConvertTo-Json -InputObject @($hierarchy) -Depth 10 | Set-Content -Path $HierarchyJsonPath -Encoding UTF8
+}
+else {
+    "[]" | Set-Content -Path $HierarchyJsonPath -Encoding UTF8
+}
+Write-Host "  Management group parent links: $($hierarchy.Count)" -ForegroundColor Green
+
 # Build consolidated scope file
 Write-Host ""
 Write-Host "Building consolidated scope file..." -ForegroundColor Yellow
@@ -329,6 +356,7 @@ try {
     Write-Host "  - $MgJsonPath" -ForegroundColor Gray
     Write-Host "  - $SubsJsonPath" -ForegroundColor Gray
     Write-Host "  - $MapJsonPath" -ForegroundColor Gray
+    Write-Host "  - $HierarchyJsonPath" -ForegroundColor Gray
     Write-Host "  - $ScopeJsonPath" -ForegroundColor Gray
     Write-Host ""
 }
@@ -1,28 +1,149 @@
-
 #!/usr/bin/env python3
-import json, os, csv, glob
-ROOT=os.path.dirname(os.path.dirname(__file__))
-OUT=os.path.join(ROOT,"out")
-rows=[]
-for path in sorted(glob.glob(os.path.join(OUT,"*.json"))):
-    name=os.path.basename(path)
+"""
+Evidence Counter
+Counts the evidence items in every out/*.json artifact (plain, .gz, .xz or
+.zst) and writes out/evidence_counts.csv (artifact, evidence_count, parse_error)
+
+A top-level array counts its elements, an Azure REST {"value": [...]} response
+counts the value array, and any other object counts its keys. Files are
+decoded by orjson when it is installed (Common.json_backend) and otherwise
+scanned without being decoded (Common.json_stream.ElementCounter), in
+parallel, and counts are cached by file size and mtime in
+out/.evidence_counts.cache.json so unchanged artifacts are not read again.
+Per-file timings and parse errors go in transformed/10_evidence_counter.run.json.
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+# Determine paths (SECAI_OUT_DIR overrides the default)
+SCRIPT_DIR = Path(__file__).parent
+ROOT_DIR = SCRIPT_DIR.parent
+
+sys.path.insert(0, str(ROOT_DIR))
+from Common.paths import OUT_DIR, TRANSFORM_DIR
+from Common.instrument import RunReport
+from Common.evidence_files import DECOMPRESSION_ERRORS, list_evidence
+from Common.json_backend import count_document
+
+COUNTS_CSV = 'evidence_counts.csv'
+CACHE_NAME = '.evidence_counts.cache.json'
+CACHE_VERSION = 1
+
+# Below this much uncached input a process pool costs more than it saves
+PARALLEL_MIN_BYTES = 32 * 1024 * 1024
+
+
+def count_artifact(path):
+    """
+    (evidence count, parse error or '', wall seconds, CPU seconds) for one
+    artifact; errors count as 0.
+    """
+    wall, cpu = time.perf_counter(), time.process_time()
+    try:
+        _, count = count_document(path)
+        error = ''
+    except DECOMPRESSION_ERRORS + (ValueError,) as e:
+        count, error = 0, str(e)
+    return count, error, time.perf_counter() - wall, time.process_time() - cpu
+
+
+def load_cache(cache_path):
     try:
-        with open(path) as f:
-            data=json.load(f)
-        if isinstance(data, list):
-            count=len(data)
-        elif isinstance(data, dict):
-            # Count top-level keys or items list if present
-            count=len(data)
-            if "value" in data and isinstance(data["value"], list):
-                count=len(data["value"])
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if cache.get('version') != CACHE_VERSION:
+        return {}
+    return cache.get('files', {})
+
+
+def save_cache(cache_path, entries):
+    tmp_path = cache_path.with_suffix('.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'version': CACHE_VERSION, 'files': entries}, f, indent=1)
+    os.replace(tmp_path, cache_path)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=0,
+                        help='Scan files in N worker processes (0 = one per CPU core, default)')
+    parser.add_argument('--no-cache', dest='cache', action='store_false',
+                        help='Rescan every artifact instead of reusing cached counts')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    report = RunReport(Path(__file__).stem, TRANSFORM_DIR)
+    workers = args.workers or os.cpu_count() or 1
+    cache_path = OUT_DIR / CACHE_NAME
+    cached = load_cache(cache_path) if args.cache else {}
+
+    # Dotfiles (this script's own cache) are not evidence
+    paths = [p for name, p in list_evidence(OUT_DIR) if name.endswith('.json') and not name.startswith('.')]
+    entries = {}
+    pending = []
+    for path in paths:
+        stat = path.stat()
+        entry = cached.get(path.name)
+        if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+            entries[path.name] = entry
         else:
-            count=0
-    except Exception:
-        count=0
-    rows.append({"artifact": name, "evidence_count": count})
-with open(os.path.join(OUT,"evidence_counts.csv"),"w",newline="") as f:
-    w=csv.DictWriter(f, fieldnames=["artifact","evidence_count"])
-    w.writeheader()
-    w.writerows(rows)
-print("Wrote", os.path.join(OUT,"evidence_counts.csv"))
+            entries[path.name] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+            pending.append(path)
+
+    pending_bytes = sum(entries[p.name]['size'] for p in pending)
+    if workers > 1 and len(pending) > 1 and pending_bytes >= PARALLEL_MIN_BYTES:
+        with ProcessPoolExecutor(max_workers=min(workers, len(pending))) as pool:
+            counted = list(pool.map(count_artifact, pending))
+    else:
+        counted = [count_artifact(path) for path in pending]
+    timings = {}
+    for path, (count, error, wall, cpu) in zip(pending, counted):
+        entries[path.name].update(count=count, error=error)
+        timings[path.name] = (wall, cpu)
+
+    rows = []
+    for path in paths:
+        entry = entries[path.name]
+        if entry['error']:
+            status = 'error'
+        elif not entry['count']:
+            status = 'empty'
+        else:
+            status = 'ok' if path.name in timings else 'cached'
+        wall, cpu = timings.get(path.name, (0.0, 0.0))
+        report.add_file(path.name, status, entry['size'], entry['count'], wall=wall, cpu=cpu,
+                        error=entry['error'] or None)
+        rows.append({'artifact': path.name, 'evidence_count': entry['count'], 'parse_error': entry['error']})
+        if entry['error']:
+            print(f"[WARN] Could not parse {path.name}: {entry['error']}")
+
+    counts_csv = OUT_DIR / COUNTS_CSV
+    with open(counts_csv, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=['artifact', 'evidence_count', 'parse_error'])
+        writer.writeheader()
+        writer.writerows(rows)
+    report.add_output(counts_csv, len(rows))
+    if args.cache and OUT_DIR.is_dir():
+        save_cache(cache_path, entries)
+
+    errors = sum(1 for row in rows if row['parse_error'])
+    total = sum(row['evidence_count'] for row in rows)
+    print(f"Counted {total} evidence items in {len(rows)} artifacts "
+          f"({len(rows) - len(pending)} cached, {errors} parse errors)")
+    print("Wrote", counts_csv)
+    print(f"Run report: {report.write()}")
+
+
+if __name__ == '__main__':
+    main()
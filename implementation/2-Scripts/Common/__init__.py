@@ -0,0 +1,3 @@
+"""
+Shared helpers for the SecAI Framework transformation and analysis scripts
+"""
@@ -0,0 +1,130 @@
+"""
+Azure Resource ID Parser
+Splits ARM IDs and scopes into subscription, resource group, provider
+namespace, resource type chain, name and scope level
+
+Parsing is memoized with a bounded LRU cache: the same scopes and resource IDs
+recur across millions of rows (every assignment at a subscription, every
+assessment on a resource), so each distinct ID is parsed once per process.
+"""
+
+from collections import namedtuple
+from functools import lru_cache
+
+# Distinct IDs kept parsed per process; older entries are evicted
+CACHE_SIZE = 1 << 16
+
+MANAGEMENT_NAMESPACE = 'microsoft.management'
+
+ROOT = 'Root'
+MANAGEMENT_GROUP = 'Management Group'
+SUBSCRIPTION = 'Subscription'
+RESOURCE_GROUP = 'Resource Group'
+RESOURCE = 'Resource'
+UNKNOWN = 'Unknown'
+
+
+class ArmId(namedtuple('ArmId', [
+        'key', 'subscription', 'resource_group', 'management_group',
+        'namespace', 'resource_type', 'name', 'parent', 'level'])):
+    """
+    A parsed ARM ID.
+
+    key:              canonical form for joins and lookups - lowercase, single
+                      slashes, no trailing slash
+    subscription:     subscription GUID, lowercase ('' when absent)
+    resource_group:   resource group name as written ('' when absent)
+    management_group: management group name ('' when absent)
+    namespace:        provider namespace of the resource, lowercase, e.g.
+                      'microsoft.network' ('' above resource level)
+    resource_type:    full type chain, lowercase, e.g.
+                      'microsoft.network/virtualnetworks/subnets'
+    name:             last name segment as written
+    parent:           key of the parent resource for child and extension
+                      resources, else ''
+    level:            Root, Management Group, Subscription, Resource Group,
+                      Resource or Unknown
+    """
+
+    __slots__ = ()
+
+
+_EMPTY = ArmId('', '', '', '', '', '', '', '', UNKNOWN)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse_arm_id(value):
+    """Parse an ARM ID or scope string; anything unparseable has level Unknown."""
+    if not value or not isinstance(value, str):
+        return _EMPTY
+    text = value.strip()
+    if text == '/':
+        return ArmId('/', '', '', '', '', '', '', '', ROOT)
+    segments = [s for s in text.split('/') if s]
+    if not segments or not text.startswith('/'):
+        return _EMPTY._replace(key=text.lower(), name=segments[-1] if segments else '')
+
+    lowered = [s.lower() for s in segments]
+    subscription = resource_group = management_group = ''
+    namespace = ''
+    types = []
+    name = ''
+    parent = ''
+    i = 0
+    count = len(segments)
+    while i + 1 < count:
+        keyword = lowered[i]
+        if keyword == 'subscriptions' and not namespace:
+            subscription = lowered[i + 1]
+            i += 2
+        elif keyword == 'resourcegroups' and not namespace:
+            resource_group = segments[i + 1]
+            i += 2
+        elif keyword == 'providers':
+            if types:
+                # Extension resource (e.g. an assessment on a NIC): its parent
+                # is the resource it hangs off
+                parent = '/' + '/'.join(lowered[:i])
+            namespace = lowered[i + 1]
+            types = []
+            i += 2
+            # Type/name pairs until the next nested provider
+            while i + 1 < count and lowered[i] != 'providers':
+                if types:
+                    parent = '/' + '/'.join(lowered[:i])
+                types.append(lowered[i])
+                name = segments[i + 1]
+                i += 2
+        else:
+            break
+    if i != count:
+        # Odd segment left over: not a well-formed ID
+        return _EMPTY._replace(key='/' + '/'.join(lowered), name=segments[-1])
+
+    if namespace == MANAGEMENT_NAMESPACE and types == ['managementgroups'] and not subscription:
+        management_group = name
+        level = MANAGEMENT_GROUP
+        namespace, types, name, parent = '', [], name, ''
+    elif types:
+        level = RESOURCE
+    elif resource_group:
+        level = RESOURCE_GROUP
+        name = resource_group
+    elif subscription:
+        level = SUBSCRIPTION
+        name = subscription
+    else:
+        level = UNKNOWN
+    resource_type = '/'.join([namespace] + types) if types else ''
+    return ArmId('/' + '/'.join(lowered), subscription, resource_group, management_group,
+                 namespace if types else '', resource_type, name, parent, level)
+
+
+def resource_key(value):
+    """Canonical join key for an ARM ID ('' for empty input)."""
+    return parse_arm_id(value).key
+
+
+def scope_level(value):
+    """Scope level of an ARM scope string (Unknown when empty or malformed)."""
+    return parse_arm_id(value).level
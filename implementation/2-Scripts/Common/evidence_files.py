@@ -0,0 +1,112 @@
+"""
+Compressed Evidence Files
+Opens out/ artifacts whether they are stored plain or compressed
+(<name>.json.gz, .json.xz or .json.zst), decompressing while they are read
+
+Readers go through open_evidence() and match files on their logical name, the
+file name without the compression extension, so a '_resources.json' suffix
+finds <sub>_resources.json.gz too. Decompression streams into the same
+chunked readers used for plain files; no file is ever inflated whole.
+
+gzip and xz are in the standard library. zstd needs compression.zstd
+(Python 3.14+) or the zstandard package; without either, .zst files fail
+to open with an error naming the missing module.
+"""
+
+import gzip
+import io
+import lzma
+
+try:
+    from compression import zstd as _zstd
+except ImportError:
+    _zstd = None
+
+try:
+    import zstandard as _zstandard
+except ImportError:
+    _zstandard = None
+
+# Recognised compression extensions, in order of preference
+COMPRESSED_SUFFIXES = ('.gz', '.xz', '.zst')
+
+# Raised for corrupt or truncated compressed files (besides ValueError from the JSON readers)
+DECOMPRESSION_ERRORS = (OSError, EOFError, lzma.LZMAError) + \
+    ((_zstd.ZstdError,) if _zstd is not None else ()) + \
+    ((_zstandard.ZstdError,) if _zstandard is not None else ())
+
+
+def _open_zstd(path):
+    if _zstd is not None:
+        return _zstd.open(path, 'rb')
+    if _zstandard is not None:
+        raw = open(path, 'rb')
+        return io.BufferedReader(_zstandard.ZstdDecompressor().stream_reader(raw, closefd=True))
+    raise OSError("reading .zst evidence needs Python 3.14+ or the zstandard package")
+
+
+_OPENERS = {
+    '.gz': lambda path: gzip.open(path, 'rb'),
+    '.xz': lambda path: lzma.open(path, 'rb'),
+    '.zst': _open_zstd,
+}
+
+
+def compression_of(name):
+    """'.gz' / '.xz' / '.zst' for a compressed file name, else ''."""
+    for suffix in COMPRESSED_SUFFIXES:
+        if name.endswith(suffix):
+            return suffix
+    return ''
+
+
+def logical_name(name):
+    """File name with any compression extension removed: 'a_rgs.json.gz' -> 'a_rgs.json'."""
+    suffix = compression_of(name)
+    return name[:-len(suffix)] if suffix else name
+
+
+def open_evidence(path, binary=False):
+    """
+    Open an evidence file for streaming reads: text decoded as UTF-8 with an
+    optional BOM, or bytes with binary set. Compressed files are decompressed
+    as they are read.
+    """
+    suffix = compression_of(str(path))
+    if not suffix:
+        return open(path, 'rb') if binary else open(path, 'r', encoding='utf-8-sig')
+    raw = _OPENERS[suffix](path)
+    return raw if binary else io.TextIOWrapper(raw, encoding='utf-8-sig')
+
+
+def list_evidence(out_dir):
+    """
+    [(logical name, path)] for the files in out_dir, sorted by logical name.
+    When a file exists both plain and compressed, the most recently written
+    one is used, the plain one on a tie.
+    """
+    chosen = {}
+    if out_dir.is_dir():
+        for path in out_dir.iterdir():
+            if not path.is_file():
+                continue
+            name = logical_name(path.name)
+            rank = (-path.stat().st_mtime_ns, _preference(path.name))
+            if name not in chosen or rank < chosen[name][0]:
+                chosen[name] = (rank, path)
+    return sorted((name, path) for name, (_, path) in chosen.items())
+
+
+def find_evidence(out_dir, name):
+    """Path of the plain or compressed file with this logical name (as list_evidence picks it), or None."""
+    found = []
+    for candidate in (name,) + tuple(name + suffix for suffix in COMPRESSED_SUFFIXES):
+        path = out_dir / candidate
+        if path.is_file():
+            found.append(((-path.stat().st_mtime_ns, _preference(candidate)), path))
+    return min(found)[1] if found else None
+
+
+def _preference(name):
+    suffix = compression_of(name)
+    return COMPRESSED_SUFFIXES.index(suffix) + 1 if suffix else 0
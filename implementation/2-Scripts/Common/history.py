@@ -0,0 +1,214 @@
+"""
+Posture History Store
+Appends each assessment run's per-subscription secure score, assessment
+health counts and risk score (19_analyze_subscription_comparison.py) to a
+local SQLite file, history/posture_history.db, that survives between runs
+
+Rows are never updated or deleted. They are keyed on (subscription, run), and
+run IDs increase with every recorded run, so "score over time for one
+subscription" is a single index range scan and "regressions since a date"
+compares two index seeks per subscription, without re-reading any earlier
+run's CSVs. Two runs recorded within the same second stay separate rows.
+
+  sqlite3 history/posture_history.db
+  SELECT run_at, secure_score_pct FROM subscription_history WHERE subscription_id = '...';
+"""
+
+import hashlib
+import sqlite3
+import time
+
+HISTORY_NAME = 'posture_history.db'
+
+# Transformed tables a run's figures come from; their size and mtime identify the snapshot
+SNAPSHOT_FILES = ('secure_scores.csv', 'security_assessments.csv')
+
+SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS runs (
+        run_id INTEGER PRIMARY KEY,
+        run_at TEXT NOT NULL,
+        snapshot TEXT UNIQUE,
+        subscriptions INTEGER NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS subscription_history (
+        subscription_id TEXT NOT NULL,
+        run_at TEXT NOT NULL,
+        run_id INTEGER NOT NULL REFERENCES runs (run_id),
+        secure_score_pct REAL,
+        current_score REAL,
+        max_score REAL,
+        total_assessments INTEGER,
+        unhealthy INTEGER,
+        healthy INTEGER,
+        risk_score INTEGER,
+        risk_level TEXT,
+        PRIMARY KEY (subscription_id, run_id)
+    ) WITHOUT ROWID""",
+    "CREATE INDEX IF NOT EXISTS ix_subscription_history_run_at ON subscription_history (run_at)",
+)
+
+# PRAGMA user_version of the current schema; 0 is the original (subscription_id, run_at) key
+SCHEMA_VERSION = 1
+
+COLUMNS = ('subscription_id', 'run_at', 'run_id', 'secure_score_pct', 'current_score', 'max_score',
+           'total_assessments', 'unhealthy', 'healthy', 'risk_score', 'risk_level')
+
+
+def history_path(history_dir):
+    return history_dir / HISTORY_NAME
+
+
+def snapshot_id(transform_dir):
+    """Fingerprint of the transformed tables a run read (None when there are none)."""
+    digest = hashlib.blake2b(digest_size=12)
+    found = False
+    for name in SNAPSHOT_FILES:
+        path = transform_dir / name
+        if path.exists():
+            stat = path.stat()
+            digest.update(f"{name}|{stat.st_size}|{stat.st_mtime_ns}|".encode())
+            found = True
+    return digest.hexdigest() if found else None
+
+
+def _number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _split_score(value):
+    """'12.5/40' -> (12.5, 40.0); 'N/A' -> (None, None)."""
+    current, _, maximum = str(value or '').partition('/')
+    return _number(current), _number(maximum)
+
+
+class PostureHistory:
+    """Append-only run history in history_dir/posture_history.db."""
+
+    def __init__(self, history_dir):
+        history_dir.mkdir(parents=True, exist_ok=True)
+        self.path = history_path(history_dir)
+        self.conn = sqlite3.connect(str(self.path), timeout=60)
+        self.conn.row_factory = sqlite3.Row
+        with self.conn:
+            if self.conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+                self._migrate()
+            for statement in SCHEMA:
+                self.conn.execute(statement)
+            self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def _migrate(self):
+        """Re-key a history written before SCHEMA_VERSION 1 on (subscription_id, run_id)."""
+        exists = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'subscription_history'").fetchone()
+        if exists is None:
+            return
+        self.conn.execute("DROP INDEX IF EXISTS ix_subscription_history_run_at")
+        self.conn.execute("ALTER TABLE subscription_history RENAME TO subscription_history_v0")
+        for statement in SCHEMA:
+            self.conn.execute(statement)
+        self.conn.execute(f"INSERT INTO subscription_history ({', '.join(COLUMNS)}) "
+                          f"SELECT {', '.join(COLUMNS)} FROM subscription_history_v0")
+        self.conn.execute("DROP TABLE subscription_history_v0")
+
+    def close(self):
+        self.conn.close()
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+
+    def record_run(self, profiles, snapshot=None, run_at=None):
+        """
+        Append one run from subscription_comparison profiles.
+
+        Returns (run_id, True) for a new run, or (run_id, False) when the
+        snapshot was already recorded (the same transformed tables analysed
+        again), in which case nothing is written.
+        """
+        if snapshot is not None:
+            existing = self.conn.execute("SELECT run_id FROM runs WHERE snapshot = ?", (snapshot,)).fetchone()
+            if existing is not None:
+                return existing['run_id'], False
+        run_at = run_at or time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime())
+        with self.conn:
+            cursor = self.conn.execute("INSERT INTO runs (run_at, snapshot, subscriptions) VALUES (?, ?, ?)",
+                                       (run_at, snapshot, len(profiles)))
+            run_id = cursor.lastrowid
+            rows = []
+            for p in profiles:
+                current, maximum = _split_score(p.get('Secure Score'))
+                rows.append((p['Subscription ID'], run_at, run_id,
+                             _number(p.get('Secure Score %')) if current is not None else None,
+                             current, maximum, p.get('Total Assessments'), p.get('Unhealthy'),
+                             p.get('Healthy'), p.get('Risk Score'), p.get('Risk Level')))
+            self.conn.executemany(
+                f"INSERT INTO subscription_history VALUES ({', '.join('?' * len(COLUMNS))})", rows)
+        return run_id, True
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def runs(self):
+        """Recorded runs, oldest first."""
+        return [dict(r) for r in self.conn.execute("SELECT * FROM runs ORDER BY run_at, run_id")]
+
+    def latest_run_at(self):
+        row = self.conn.execute("SELECT MAX(run_at) AS run_at FROM runs").fetchone()
+        return row['run_at'] if row else None
+
+    def trend(self, subscription_id):
+        """One subscription's rows over time, oldest first."""
+        return [dict(r) for r in self.conn.execute(
+            "SELECT * FROM subscription_history WHERE subscription_id = ? ORDER BY run_id",
+            (subscription_id,))]
+
+    def find_subscriptions(self, text):
+        """Subscription IDs equal to text or starting with it (case-insensitive)."""
+        text = (text or '').strip().lower()
+        return [r['subscription_id'] for r in self.conn.execute(
+            "SELECT DISTINCT subscription_id FROM subscription_history "
+            "WHERE lower(subscription_id) = ? OR lower(subscription_id) LIKE ? ORDER BY 1",
+            (text, text.replace('%', '') + '%'))]
+
+    def regressions(self, since, limit=None):
+        """
+        Subscriptions whose posture got worse between their last run on or
+        before since (an ISO date/time) and their latest run: secure score
+        down, risk score up or more unhealthy assessments. Worst score drop
+        first.
+        """
+        sql = """
+            WITH latest AS (
+                SELECT subscription_id, MAX(run_id) AS run_id FROM subscription_history
+                GROUP BY subscription_id
+            ), baseline AS (
+                SELECT subscription_id, MAX(run_id) AS run_id FROM subscription_history
+                WHERE run_at <= ? GROUP BY subscription_id
+            )
+            SELECT n.subscription_id,
+                   o.run_at AS baseline_at, n.run_at AS latest_at,
+                   o.secure_score_pct AS baseline_score, n.secure_score_pct AS latest_score,
+                   n.secure_score_pct - o.secure_score_pct AS score_change,
+                   o.risk_score AS baseline_risk, n.risk_score AS latest_risk,
+                   n.risk_score - o.risk_score AS risk_change,
+                   o.unhealthy AS baseline_unhealthy, n.unhealthy AS latest_unhealthy,
+                   n.unhealthy - o.unhealthy AS unhealthy_change,
+                   n.risk_level AS risk_level
+            FROM latest
+            JOIN baseline USING (subscription_id)
+            JOIN subscription_history n ON n.subscription_id = latest.subscription_id AND n.run_id = latest.run_id
+            JOIN subscription_history o ON o.subscription_id = baseline.subscription_id AND o.run_id = baseline.run_id
+            WHERE latest.run_id > baseline.run_id
+              AND (n.secure_score_pct < o.secure_score_pct OR n.risk_score > o.risk_score
+                   OR n.unhealthy > o.unhealthy)
+            ORDER BY COALESCE(n.secure_score_pct - o.secure_score_pct, 0), risk_change DESC, unhealthy_change DESC
+        """
+        params = [since]
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [dict(r) for r in self.conn.execute(sql, params)]
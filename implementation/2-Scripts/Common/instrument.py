@@ -0,0 +1,184 @@
+"""
+Stage Instrumentation
+Records wall time, CPU time, bytes read, rows, parse failures and peak memory
+for one script run - per input file, per table and for the stage as a whole -
+and writes them as a JSON run report next to the stage's outputs
+
+Reports land in transformed/<script>.run.json (scripts 10-17) and
+analysis/<script>.run.json (scripts 18-26). Peak memory is the high-water
+mark of the whole process (and of finished worker processes), so under
+run_pipeline.py it covers every stage run so far.
+"""
+
+import json
+import sys
+import time
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+REPORT_SUFFIX = '.run.json'
+PROFILE_DIR = 'profiles'
+
+
+def _rusage(who):
+    usage = resource.getrusage(who)
+    # ru_maxrss is kilobytes on Linux and bytes on macOS
+    scale = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return usage.ru_utime + usage.ru_stime, usage.ru_maxrss / scale
+
+
+def peak_memory_mb():
+    """(own peak RSS, worker processes' peak RSS) in MB; None where unavailable."""
+    if resource is not None:
+        own = _rusage(resource.RUSAGE_SELF)[1]
+        children = _rusage(resource.RUSAGE_CHILDREN)[1]
+        return round(own, 1), round(children, 1) if children else None
+    if psutil is not None:
+        info = psutil.Process().memory_info()
+        # peak_wset is the Windows high-water mark; elsewhere only current RSS is known
+        return round(getattr(info, 'peak_wset', info.rss) / (1024 * 1024), 1), None
+    return None, None
+
+
+def _worker_cpu():
+    return _rusage(resource.RUSAGE_CHILDREN)[0] if resource is not None else 0.0
+
+
+class RunReport:
+    """Metrics for one stage run; call write() when the stage is done."""
+
+    def __init__(self, stage, report_dir):
+        self.stage = stage
+        self.report_dir = Path(report_dir)
+        self.started_at = time.strftime('%Y-%m-%dT%H:%M:%S')
+        self.files = []
+        self.tables = {}
+        self.inputs = []
+        self.outputs = []
+        self.profiles = []
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+        self._worker_cpu = _worker_cpu()
+
+    def add_file(self, name, status, bytes_read, items=0, rows=None, wall=0.0, cpu=0.0,
+                 duplicates=0, error=None):
+        """One input file: status is ok, cached, empty, warn or error."""
+        self.files.append({
+            'file': name,
+            'status': status,
+            'bytes': bytes_read,
+            'items': items,
+            'rows': rows or {},
+            'wall_seconds': round(wall, 4),
+            'cpu_seconds': round(cpu, 4),
+            'duplicates': duplicates,
+            'error': error,
+        })
+
+    def table(self, name):
+        """Mutable metrics dict for an output table."""
+        return self.tables.setdefault(name, {
+            'rows': 0, 'files': 0, 'parsed': 0, 'cached': 0, 'skipped': 0, 'failed': 0,
+            'bytes_read': 0, 'parse_wall_seconds': 0.0, 'parse_cpu_seconds': 0.0,
+            'write_seconds': 0.0, 'load_seconds': 0.0,
+        })
+
+    def add_input(self, name, rows, source, seconds):
+        """A table read by an analysis stage and where it came from (memory, warehouse, csv)."""
+        self.inputs.append({'table': name, 'rows': rows, 'source': source,
+                            'seconds': round(seconds, 4)})
+
+    def add_output(self, path, rows):
+        path = Path(path)
+        self.outputs.append({'file': path.name, 'rows': rows,
+                             'bytes': path.stat().st_size if path.exists() else 0})
+
+    def slowest_files(self, count):
+        """Names of the slowest freshly parsed files, slowest first."""
+        parsed = [f for f in self.files if f['status'] != 'cached']
+        parsed.sort(key=lambda f: f['wall_seconds'], reverse=True)
+        return [f['file'] for f in parsed[:count]]
+
+    def profile(self, label, func, top=20):
+        """
+        Run func() again under cProfile and tracemalloc. The raw profile is
+        saved to <report dir>/profiles/<label>.prof (open with pstats or
+        snakeviz); the top functions and allocation sites go in the report.
+        """
+        import cProfile
+        import pstats
+        import tracemalloc
+
+        profile_dir = self.report_dir / PROFILE_DIR
+        profile_dir.mkdir(parents=True, exist_ok=True)
+        profiler = cProfile.Profile()
+        tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            # Hold on to the result so the snapshot shows what it keeps alive
+            result = profiler.runcall(func)
+        finally:
+            wall = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            snapshot = tracemalloc.take_snapshot()
+            tracemalloc.stop()
+        del result
+        prof_path = profile_dir / f"{label}.prof"
+        profiler.dump_stats(str(prof_path))
+
+        stats = pstats.Stats(profiler).stats
+        ranked = sorted(stats.items(), key=lambda kv: kv[1][3], reverse=True)[:top]
+        self.profiles.append({
+            'label': label,
+            'profile': str(prof_path.relative_to(self.report_dir)),
+            'wall_seconds': round(wall, 4),
+            'traced_peak_mb': round(peak / (1024 * 1024), 2),
+            'top_functions': [
+                {'function': f"{Path(filename).name}:{line}({func_name})",
+                 'calls': calls, 'own_seconds': round(own, 4), 'cumulative_seconds': round(cumulative, 4)}
+                for (filename, line, func_name), (_, calls, own, cumulative, _) in ranked
+            ],
+            'top_allocations': [
+                {'site': str(stat.traceback), 'kb': round(stat.size / 1024, 1), 'blocks': stat.count}
+                for stat in snapshot.statistics('lineno')[:top]
+            ],
+        })
+        return prof_path
+
+    def write(self):
+        """Write <report dir>/<stage>.run.json and return its path."""
+        own_peak, worker_peak = peak_memory_mb()
+        worker_cpu = _worker_cpu() - self._worker_cpu
+        files = self.files
+        payload = {
+            'stage': self.stage,
+            'started_at': self.started_at,
+            'wall_seconds': round(time.perf_counter() - self._wall, 3),
+            'cpu_seconds': round(time.process_time() - self._cpu, 3),
+            'worker_cpu_seconds': round(worker_cpu, 3),
+            'peak_rss_mb': own_peak,
+            'worker_peak_rss_mb': worker_peak if worker_cpu else None,
+            'files': len(files),
+            'bytes_read': sum(f['bytes'] for f in files),
+            'parse_failures': sum(1 for f in files if f['status'] in ('warn', 'error')),
+            'rows': sum(t['rows'] for t in self.tables.values()) or sum(o['rows'] for o in self.outputs),
+            'tables': self.tables,
+            'inputs': self.inputs,
+            'outputs': self.outputs,
+            'file_details': sorted(files, key=lambda f: f['wall_seconds'], reverse=True),
+            'profiles': self.profiles,
+        }
+        self.report_dir.mkdir(parents=True, exist_ok=True)
+        path = self.report_dir / f"{self.stage}{REPORT_SUFFIX}"
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, indent=2, default=str)
+        return path
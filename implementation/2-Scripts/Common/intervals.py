@@ -0,0 +1,182 @@
+"""
+Port Ranges, Address Prefixes and Interval Index
+Normalizes NSG rule port ranges and address prefixes into integer intervals
+and indexes intervals so "which rules cover port 3389" is one tree descent
+over all rules instead of a scan of every rule in every NSG; overlapping
+pairs in a set of intervals (e.g. VNet CIDRs) come from one sort-and-sweep
+"""
+
+import heapq
+import ipaddress
+
+PORT_MIN = 0
+PORT_MAX = 65535
+
+ANY = '*'
+
+# Source values that stand for the whole Internet
+INTERNET_TAGS = {'*', 'any', 'internet'}
+
+
+# ============================================================================
+# Port ranges
+# ============================================================================
+
+def parse_port_ranges(values):
+    """
+    Merged, sorted (low, high) port intervals for port range strings such as
+    '22', '1000-2000', '*' or 'Any'. Values that are not ports are skipped.
+    """
+    ranges = []
+    for value in values:
+        text = str(value).strip() if value is not None else ''
+        if not text:
+            continue
+        if text.lower() in ('*', 'any'):
+            return [(PORT_MIN, PORT_MAX)]
+        low, _, high = text.partition('-')
+        try:
+            low = int(low)
+            high = int(high) if high else low
+        except ValueError:
+            continue
+        if low > high:
+            low, high = high, low
+        ranges.append((max(low, PORT_MIN), min(high, PORT_MAX)))
+    ranges.sort()
+    merged = []
+    for low, high in ranges:
+        if merged and low <= merged[-1][1] + 1:
+            if high > merged[-1][1]:
+                merged[-1] = (merged[-1][0], high)
+        else:
+            merged.append((low, high))
+    return merged
+
+
+def format_port_ranges(ranges):
+    """Canonical text for port intervals: '*' for all ports, else '22, 1000-2000'."""
+    if ranges == [(PORT_MIN, PORT_MAX)]:
+        return ANY
+    return ', '.join(str(low) if low == high else f"{low}-{high}" for low, high in ranges)
+
+
+# ============================================================================
+# Address prefixes
+# ============================================================================
+
+def address_range(prefix):
+    """
+    (version, first, last) address integers for an IP address or CIDR prefix,
+    or None for service tags (VirtualNetwork, AzureLoadBalancer, ...).
+    """
+    text = (prefix or '').strip()
+    if text in ('', '*'):
+        return None
+    try:
+        network = ipaddress.ip_network(text, strict=False)
+    except ValueError:
+        return None
+    return network.version, int(network.network_address), int(network.broadcast_address)
+
+
+def is_internet_source(prefixes):
+    """True when any prefix admits traffic from anywhere on the Internet."""
+    for prefix in prefixes:
+        text = (prefix or '').strip()
+        if text.lower() in INTERNET_TAGS:
+            return True
+        span = address_range(text)
+        if span is not None:
+            version, first, last = span
+            if first == 0 and last == (1 << (32 if version == 4 else 128)) - 1:
+                return True
+    return False
+
+
+# ============================================================================
+# Interval index
+# ============================================================================
+
+class IntervalIndex:
+    """
+    Static index over closed intervals (low, high, value).
+
+    Intervals are sorted by their low end and laid out as an implicit balanced
+    tree in which every node knows the highest end below it, so a stabbing or
+    overlap query visits O(log n + matches) nodes.
+    """
+
+    def __init__(self, entries):
+        entries = sorted(entries, key=lambda e: (e[0], e[1]))
+        self.lows = [e[0] for e in entries]
+        self.highs = [e[1] for e in entries]
+        self.values = [e[2] for e in entries]
+        self.max_high = list(self.highs)
+        self._build(0, len(entries))
+
+    def __len__(self):
+        return len(self.values)
+
+    def _build(self, start, end):
+        # Iterative post-order fill of max_high for the subtree [start, end)
+        stack = [(start, end, False)]
+        while stack:
+            start, end, ready = stack.pop()
+            if start >= end:
+                continue
+            mid = (start + end) // 2
+            if not ready:
+                stack.append((start, end, True))
+                stack.append((start, mid, False))
+                stack.append((mid + 1, end, False))
+                continue
+            best = self.highs[mid]
+            if start < mid:
+                best = max(best, self.max_high[(start + mid) // 2])
+            if mid + 1 < end:
+                best = max(best, self.max_high[(mid + 1 + end) // 2])
+            self.max_high[mid] = best
+
+    def overlapping(self, low, high):
+        """Values of all intervals overlapping [low, high], in low-end order."""
+        hits = []
+        stack = [(0, len(self.values))]
+        while stack:
+            start, end = stack.pop()
+            if start >= end:
+                continue
+            mid = (start + end) // 2
+            if self.max_high[mid] < low:
+                continue
+            stack.append((start, mid))
+            # Everything right of mid starts at or after lows[mid]
+            if self.lows[mid] <= high:
+                if self.highs[mid] >= low:
+                    hits.append(mid)
+                stack.append((mid + 1, end))
+        hits.sort()
+        return [self.values[i] for i in hits]
+
+    def containing(self, point):
+        """Values of all intervals containing point."""
+        return self.overlapping(point, point)
+
+
+def overlapping_pairs(entries):
+    """
+    Yield (value, value) for every pair of overlapping closed intervals among
+    entries (low, high, value).
+
+    Intervals are swept in order of their low end while a heap keeps the ones
+    still open, so the cost is O(n log n) plus one step per pair reported
+    rather than a comparison of every pair.
+    """
+    entries = sorted(entries, key=lambda e: (e[0], e[1]))
+    active = []   # heap of (high, position, value)
+    for position, (low, high, value) in enumerate(entries):
+        while active and active[0][0] < low:
+            heapq.heappop(active)
+        for _, _, other in active:
+            yield other, value
+        heapq.heappush(active, (high, position, value))
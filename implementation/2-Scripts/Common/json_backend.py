@@ -0,0 +1,208 @@
+"""
+JSON Backend
+Chooses how evidence files are decoded: orjson over a memory-mapped file when
+orjson is installed, the incremental stdlib reader (Common/json_stream.py)
+otherwise
+
+  SECAI_JSON_BACKEND=auto     orjson if installed, else stdlib (default)
+  SECAI_JSON_BACKEND=orjson   orjson (stdlib, with a warning, if not installed)
+  SECAI_JSON_BACKEND=stdlib   always the stdlib reader, e.g. to compare backends
+
+With orjson, a plain file up to WHOLE_FILE_MAX_BYTES is mapped into memory
+and decoded straight from the mapping: the UTF-8 BOM PowerShell writes is
+skipped by slicing the memoryview, so the file is never copied or decoded to
+str first. Larger and compressed files, and tables that need the tolerant
+decoder (duplicate keys, raw control characters, concatenated documents),
+keep the chunked stdlib reader so memory stays bounded. A file orjson
+rejects is read again with the stdlib reader, so errors and partial results
+are the same whichever backend ran; count_document() reports orjson's error
+as is. One difference remains: orjson returns integers wider than 64 bits as
+floats (no evidence column carries one).
+"""
+
+import gc
+import mmap
+import os
+
+from Common.evidence_files import compression_of, open_evidence
+from Common.json_stream import JsonArrayStream, count_elements
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+BACKEND_ENV = 'SECAI_JSON_BACKEND'
+BACKENDS = ('auto', 'orjson', 'stdlib')
+
+# Decoded objects take ~5-6x the file size; bigger files are streamed instead
+WHOLE_FILE_MAX_BYTES = 32 * 1024 * 1024
+
+_BOM = b'\xef\xbb\xbf'
+_WHITESPACE = b' \t\n\r'
+
+
+def resolve_backend(name=None):
+    """'orjson' or 'stdlib' for a requested backend (default: $SECAI_JSON_BACKEND)."""
+    name = (name or os.environ.get(BACKEND_ENV) or 'auto').strip().lower()
+    if name not in BACKENDS:
+        raise ValueError(f"{BACKEND_ENV} must be one of {', '.join(BACKENDS)}, not {name!r}")
+    if name == 'stdlib':
+        return 'stdlib'
+    if orjson is None:
+        if name == 'orjson':
+            print(f"⚠ {BACKEND_ENV}=orjson but orjson is not installed; using the stdlib json module")
+        return 'stdlib'
+    return 'orjson'
+
+
+BACKEND = resolve_backend()
+
+
+class MappedFile:
+    """Read-only memory map of a file, exposed as a memoryview without its BOM."""
+
+    def __init__(self, path):
+        self.file = open(path, 'rb')
+        self.map = None
+        self.data = memoryview(b'')
+        if os.fstat(self.file.fileno()).st_size:
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+            view = memoryview(self.map)
+            self.data = view[3:] if view[:3] == _BOM else view
+
+    def close(self):
+        # Views must be released before the map can close
+        self.data.release()
+        if self.map is not None:
+            self.map.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def _whole_file(path, backend):
+    """True when path is decoded in one go rather than streamed."""
+    return (backend == 'orjson' and not compression_of(str(path))
+            and os.path.getsize(path) <= WHOLE_FILE_MAX_BYTES)
+
+
+def _decode_mapped(path):
+    """(document, empty) for a plain file decoded by orjson from a memory map."""
+    with MappedFile(path) as mapped:
+        try:
+            return orjson.loads(mapped.data), False
+        except orjson.JSONDecodeError:
+            # Whitespace only is an empty file, not a parse error
+            if bytes(mapped.data).strip(_WHITESPACE):
+                raise
+            return None, True
+
+
+class DocumentStream:
+    """
+    JsonArrayStream's interface over an already decoded document: iterating
+    yields the same elements and sets the same ``shape`` and ``count``.
+    """
+
+    def __init__(self, document, empty=False, unwrap_key='value', yield_object=False):
+        self.document = document
+        self.empty = empty
+        self.unwrap_key = unwrap_key
+        self.yield_object = yield_object
+        self.shape = None
+        self.count = 0
+        self.documents = 0 if empty else 1
+
+    def __iter__(self):
+        document = self.document
+        if self.empty:
+            self.shape = 'empty'
+            return
+        if isinstance(document, list):
+            self.shape = 'array'
+            items = document
+        elif isinstance(document, dict):
+            items = document.get(self.unwrap_key)
+            if isinstance(items, list):
+                self.shape = 'wrapped'
+            else:
+                self.shape = 'object'
+                items = [document] if self.yield_object and document else []
+        else:
+            self.shape = 'scalar'
+            items = []
+        for item in items:
+            self.count += 1
+            yield item
+
+
+class EvidenceReader:
+    """
+    Context manager yielding an iterable stream of a file's elements (see
+    JsonArrayStream for shapes and options), decoded by the active backend.
+    """
+
+    def __init__(self, path, yield_object=False, decoder=None, multi_document=False, backend=None):
+        self.path = path
+        self.yield_object = yield_object
+        self.decoder = decoder
+        self.multi_document = multi_document
+        self.backend = backend or BACKEND
+        self.file = None
+        self.gc_paused = False
+
+    def __enter__(self):
+        if self.decoder is None and not self.multi_document and _whole_file(self.path, self.backend):
+            # A decoded document is acyclic and lives only until the reader
+            # closes, but it is big enough to push the cyclic collector into
+            # repeated full collections of everything else in memory
+            self.gc_paused = gc.isenabled()
+            gc.disable()
+            try:
+                document, empty = _decode_mapped(self.path)
+                return DocumentStream(document, empty, yield_object=self.yield_object)
+            except ValueError:
+                # Re-read with the stdlib reader for its error and partial rows
+                self._resume_gc()
+        self.file = open_evidence(self.path)
+        return JsonArrayStream(self.file, yield_object=self.yield_object, decoder=self.decoder,
+                               multi_document=self.multi_document)
+
+    def _resume_gc(self):
+        if self.gc_paused:
+            gc.enable()
+            self.gc_paused = False
+
+    def __exit__(self, *exc):
+        self._resume_gc()
+        if self.file is not None:
+            self.file.close()
+        return False
+
+
+def count_document(path, backend=None):
+    """
+    (shape, count) for an evidence file, with count_elements() semantics:
+    array elements, wrapped value elements, or an object's members.
+    A file orjson rejects raises its JSONDecodeError (a ValueError).
+    """
+    if _whole_file(path, backend or BACKEND):
+        document, empty = _decode_mapped(path)
+        if empty:
+            return 'empty', 0
+        if isinstance(document, list):
+            return 'array', len(document)
+        if isinstance(document, dict):
+            value = document.get('value')
+            if isinstance(value, list):
+                return 'wrapped', len(value)
+            # Repeated keys count once in a dict; the scanner counts every member
+            return count_elements(path)
+        return 'scalar', 0
+    return count_elements(path)
@@ -0,0 +1,590 @@
+"""
+Incremental JSON Array Reader
+Yields the elements of a top-level JSON array one at a time, reading the file
+in fixed-size chunks so large evidence files are never held in memory whole
+"""
+
+import io
+import json
+import re
+import string
+
+from Common.evidence_files import open_evidence
+
+# Characters JSON allows between tokens
+WHITESPACE = ' \t\n\r'
+
+# Characters that can continue a number the decoder stopped short of (e.g. "12." or "1e")
+NUMBER_TAIL = '0123456789.eE+-'
+
+# Default read size; a single element larger than this simply grows the buffer
+CHUNK_SIZE = 1024 * 1024
+
+
+class JsonArrayStream:
+    """
+    Iterate the elements of a JSON document read from a text file object.
+
+    Supported document shapes (recorded in ``shape`` after iteration):
+      'array'   - top-level array, every element is yielded
+      'wrapped' - top-level object whose ``unwrap_key`` member is an array
+                  (Azure REST style ``{"value": [...]}``), its elements are yielded
+      'object'  - any other top-level object; yielded as a single element only
+                  when ``yield_object`` is set
+      'scalar'  - a bare string/number/literal, nothing is yielded
+      'empty'   - whitespace only, nothing is yielded
+
+    With ``multi_document`` set, documents concatenated back to back (as left
+    behind by re-run collection commands) are read in turn and their elements
+    yielded as one sequence.
+
+    Peak memory is bounded by the largest single element plus one chunk.
+    """
+
+    def __init__(self, fp, chunk_size=CHUNK_SIZE, unwrap_key='value', yield_object=False,
+                 decoder=None, multi_document=False):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.unwrap_key = unwrap_key
+        self.yield_object = yield_object
+        self.decoder = decoder or json.JSONDecoder()
+        self.multi_document = multi_document
+        self.shape = None
+        self.count = 0
+        self.documents = 0
+        self._buf = ''
+        self._pos = 0
+        self._eof = False
+
+    # ------------------------------------------------------------------
+    # Buffer management
+    # ------------------------------------------------------------------
+
+    def _fill(self, size=None):
+        """Drop consumed text and append the next chunk. Returns False at EOF."""
+        if self._eof:
+            return False
+        chunk = self.fp.read(size or self.chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buf = self._buf[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def _peek(self):
+        """Skip whitespace and return the next character ('' at end of input)."""
+        while True:
+            buf = self._buf
+            pos = self._pos
+            end = len(buf)
+            while pos < end and buf[pos] in WHITESPACE:
+                pos += 1
+            self._pos = pos
+            if pos < end:
+                return buf[pos]
+            if not self._fill():
+                return ''
+
+    def _expect(self, char):
+        if self._peek() != char:
+            raise json.JSONDecodeError(f"Expecting '{char}'", self._buf, self._pos)
+        self._pos += 1
+
+    def _decode(self):
+        """Decode the value starting at the current position."""
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                # Most likely the value runs past the buffer; read more and retry.
+                # The read grows with the pending text so huge elements stay linear.
+                if not self._fill(max(self.chunk_size, len(self._buf) - self._pos)):
+                    raise
+                continue
+            # A top-level number cut at the buffer edge may continue in the next chunk
+            if not self._eof and (end == len(self._buf) or self._buf[end] in NUMBER_TAIL):
+                if self._fill(max(self.chunk_size, len(self._buf) - self._pos)):
+                    continue
+            self._pos = end
+            return value
+
+    # ------------------------------------------------------------------
+    # Iteration
+    # ------------------------------------------------------------------
+
+    def _iter_elements(self):
+        """Yield elements of the array whose '[' has just been consumed."""
+        if self._peek() == ']':
+            self._pos += 1
+            return
+        while True:
+            self._peek()
+            value = self._decode()
+            self.count += 1
+            yield value
+            char = self._peek()
+            self._pos += 1
+            if char == ']':
+                return
+            if char != ',':
+                raise json.JSONDecodeError("Expecting ',' delimiter", self._buf, self._pos - 1)
+
+    def _iter_object(self):
+        """Walk the members of the object whose '{' has just been consumed."""
+        members = []
+        wrapped = False
+        if self._peek() == '}':
+            self._pos += 1
+        else:
+            while True:
+                self._peek()
+                key = self._decode()
+                self._expect(':')
+                if key == self.unwrap_key and not wrapped and self._peek() == '[':
+                    self._pos += 1
+                    wrapped = True
+                    self._set_shape('wrapped')
+                    yield from self._iter_elements()
+                else:
+                    self._peek()
+                    value = self._decode()
+                    if not wrapped:
+                        members.append((key, value))
+                char = self._peek()
+                self._pos += 1
+                if char == '}':
+                    break
+                if char != ',':
+                    raise json.JSONDecodeError("Expecting ',' delimiter", self._buf, self._pos - 1)
+
+        if not wrapped:
+            self._set_shape('object')
+            if self.yield_object and members:
+                hook = self.decoder.object_pairs_hook
+                self.count += 1
+                yield hook(members) if hook else dict(members)
+
+    def _set_shape(self, shape):
+        # With multi_document the first document decides the reported shape
+        if self.shape is None:
+            self.shape = shape
+
+    def __iter__(self):
+        while True:
+            char = self._peek()
+            if char == '':
+                self._set_shape('empty')
+                return
+            if char == '[':
+                self._pos += 1
+                self._set_shape('array')
+                yield from self._iter_elements()
+            elif char == '{':
+                self._pos += 1
+                yield from self._iter_object()
+            else:
+                self._set_shape('scalar')
+                self._decode()
+            self.documents += 1
+            if not self.multi_document:
+                return
+
+
+class DuplicateKeyCounter:
+    """
+    object_pairs_hook that resolves repeated keys instead of losing them.
+
+    When a key repeats, two objects are merged (later members win), and a
+    null/empty repeat never overwrites an earlier value; otherwise the later
+    value wins as with the stdlib decoder. ``count`` tracks how many repeats
+    were resolved.
+    """
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, pairs):
+        obj = dict(pairs)
+        if len(obj) == len(pairs):
+            return obj
+        obj = {}
+        for key, value in pairs:
+            if key in obj:
+                self.count += 1
+                value = _merge_duplicate(obj[key], value)
+            obj[key] = value
+        return obj
+
+
+def _merge_duplicate(first, second):
+    if isinstance(first, dict) and isinstance(second, dict):
+        merged = dict(first)
+        for key, value in second.items():
+            merged[key] = _merge_duplicate(merged[key], value) if key in merged else value
+        return merged
+    if second is None or second == '':
+        return first
+    return second
+
+
+def tolerant_decoder(counter):
+    """
+    Decoder for evidence files that the stdlib rejects: duplicate keys are
+    resolved through ``counter`` and raw control characters inside strings
+    (multi-line descriptions) are accepted.
+    """
+    return json.JSONDecoder(object_pairs_hook=counter, strict=False)
+
+
+# ============================================================================
+# Counting without decoding
+# ============================================================================
+
+_BOM = b'\xef\xbb\xbf'
+_WHITESPACE_BYTES = WHITESPACE.encode()
+
+# Stand-ins for a blanked string and for the unwrap key; neither is valid JSON
+# outside a string, so they cannot be confused with a scalar token
+_STRING = b'$'
+_KEY_STRING = b'%'
+
+# A balanced innermost object/array, once strings are blanked out. Only an
+# object whose members are string:value pairs and an array without a colon
+# fold; anything else is left for the walk to find and reject
+_INNER_GROUP = re.compile(rb'\{(?:[$%]:[^\[\]{},:]+(?:,[$%]:[^\[\]{},:]+)*)?\}|\[[^\[\]{}:]*\]')
+# Deleting these from a segment leaves its separators
+_NON_SEPARATORS = bytes(b for b in range(256) if b not in b',:')
+
+
+def _class_table(default, classes):
+    """bytes.translate table mapping the bytes of each key to its class byte, all others to default."""
+    table = bytearray(default * 256)
+    for chars, cls in classes.items():
+        for char in chars:
+            table[char] = cls[0]
+    return bytes(table)
+
+
+# Token classes once strings are blanked and whitespace dropped: s(tring),
+# o(pen), c(lose), k (comma or colon) and w for scalar characters, so that
+# adjacent w's are one token ('12', 'true', '1e-5')
+_TOKEN_CLASSES = _class_table(b'w', {_STRING + _KEY_STRING: b's', b'[{': b'o', b']}': b'c', b',:': b'k'})
+# Class pairs for two values with no comma between them, and for a comma or colon missing a value
+_MISSING_COMMA = (b'ss', b'so', b'sw', b'ws', b'wo', b'cs', b'co', b'cw')
+_MISSING_VALUE = (b'ok', b'kk', b'kc')
+# Characters of a number or literal, and the first bytes of a valid bare value
+_SCALAR_BYTES = (NUMBER_TAIL + string.ascii_letters + '_').encode()
+_SCALAR_OPENERS = frozenset(b'0123456789-tfn' + _STRING + _KEY_STRING)
+# Before whitespace is dropped: scalar characters, whitespace and the rest
+_SPACING_CLASSES = _class_table(b'x', {_WHITESPACE_BYTES: b' ', _SCALAR_BYTES: b'w'})
+_SPACED_SCALARS = re.compile(rb'w +w')
+_BRACKET = re.compile(rb'([\[\]{}])')
+_CLOSES = {ord(']'): ord('['), ord('}'): ord('{')}
+
+
+class ElementCounter:
+    """
+    Count the elements of a JSON document without building any objects.
+
+    Reads a binary file object in chunks; in each chunk strings are replaced
+    by a placeholder and whitespace dropped with a few whole-chunk bytes calls,
+    balanced nested objects and arrays are collapsed to one placeholder, and
+    only the handful of brackets that remain are walked in Python. Counts
+    follow the JsonArrayStream shapes: elements of a top-level array, of the
+    unwrap_key array of a wrapped object, or the members of any other object.
+
+    Brackets, strings, commas and document boundaries are checked; scalar
+    tokens are not, so this is a structural check rather than a full JSON
+    validation. Malformed input raises ValueError.
+    """
+
+    def __init__(self, fp, chunk_size=CHUNK_SIZE, unwrap_key='value'):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.key = unwrap_key.encode()
+        self._key_marker = _KEY_STRING + b':'
+        self.shape = None
+        self.count = 0
+        self._stack = []
+        self._members = []       # per open bracket: [colon due next, has members] for an object, None for an array
+        self._target = 0         # depth whose commas (array) or colons (object) are counted
+        self._commas = 0
+        self._colons = 0
+        self._nonempty = False
+        self._searching = False  # object whose unwrap_key array has not been seen yet
+        self._member = b''       # tail of the current top-level member while searching
+        self._done = False
+        self._open_scalar = False  # bare number/literal document that may continue in the next chunk
+        self._spaced_edge = b''  # last token byte of the previous chunk, plus ' ' if whitespace followed it
+        self._edge = b''         # last byte of the previous chunk once whitespace is dropped
+
+    def run(self):
+        """Scan the whole file; returns (shape, count)."""
+        carry = b''
+        first = True
+        while True:
+            chunk = self.fp.read(max(self.chunk_size, len(carry), len(_BOM)))
+            eof = not chunk
+            if first:
+                chunk = chunk[3:] if chunk.startswith(_BOM) else chunk
+                first = False
+            data = carry + chunk
+            # Same-length stand-ins for escapes leave only real quotes, so the
+            # split alternates outside / inside a string
+            if b'\\' in data:
+                unescaped = data.replace(b'\\\\', b'__').replace(b'\\"', b'__')
+            else:
+                unescaped = data
+            parts = unescaped.split(b'"')
+            carry = b''
+            if len(parts) % 2 == 0:
+                # The data ends inside a string: keep it for the next chunk
+                if eof:
+                    raise ValueError('Unterminated string at end of file')
+                carry = data[len(data) - len(parts.pop()) - 1:]
+            blanked = self._check_spacing(self._blank_strings(parts))
+            self._feed(self._check_separators(blanked.translate(None, _WHITESPACE_BYTES)))
+            if eof:
+                break
+        return self._finish()
+
+    def _blank_strings(self, parts):
+        """Join the text outside strings, each string reduced to _STRING (_KEY_STRING for the unwrap key)."""
+        strings = parts[1::2]
+        if (self.shape is None or self._searching) and self.key in strings:
+            marked = [_KEY_STRING if string == self.key else _STRING for string in strings]
+            return b''.join(part for pair in zip(parts[::2], marked + [b'']) for part in pair)
+        return _STRING.join(parts[::2])
+
+    def _check_spacing(self, blanked):
+        """Reject scalars separated only by whitespace, which dropping it would merge."""
+        classes = self._spaced_edge + blanked.translate(_SPACING_CLASSES)
+        if _SPACED_SCALARS.search(classes):
+            raise ValueError("Expected ',' between values")
+        end = len(classes)
+        while end and classes[end - 1] == 32:
+            end -= 1
+        self._spaced_edge = classes[end - 1:end] + (b' ' if end < len(classes) else b'')
+        return blanked
+
+    def _check_separators(self, part):
+        """Reject a missing comma between values, or a comma/colon without a value."""
+        classes = self._edge + part.translate(_TOKEN_CLASSES)
+        if any(pair in classes for pair in _MISSING_COMMA):
+            raise ValueError("Expected ',' between values")
+        if any(pair in classes for pair in _MISSING_VALUE):
+            raise ValueError("Expected a value before or after ',' or ':'")
+        self._edge = classes[-1:]
+        return part
+
+    def _finish(self):
+        if self.shape is None:
+            self.shape = 'empty'
+        elif self.shape != 'scalar' and not self._done:
+            raise ValueError('Unexpected end of file (unclosed bracket)')
+        return self.shape, self.count
+
+    def _feed(self, part):
+        if not part:
+            return
+        if self.shape is None:
+            opener = part[0]
+            if opener == ord('['):
+                self.shape = 'array'
+            elif opener == ord('{'):
+                self.shape = 'object'
+                self._searching = True
+            elif opener in _SCALAR_OPENERS:
+                # Bare string/number/literal: nothing to count, but nothing may follow it
+                self.shape = 'scalar'
+                self._done = True
+                self._open_scalar = opener not in _STRING + _KEY_STRING
+            else:
+                raise ValueError(f"Unexpected {chr(opener)!r} at the start of the document")
+            if self.shape != 'scalar':
+                self._stack.append(opener)
+                self._members.append([True, False] if opener == ord('{') else None)
+                self._target = 1
+            part = part[1:]
+        if self.shape == 'scalar':
+            # Whitespace is gone, so only the rest of the number/literal can follow
+            if part and (not self._open_scalar or part.translate(None, _SCALAR_BYTES)):
+                raise ValueError('Extra data after the JSON document')
+            return
+        if self._done:
+            raise ValueError('Extra data after the JSON document')
+
+        if not self._searching:
+            # Nothing left to find at this level, so fold away every group that
+            # opens and closes within the chunk; the counted container's own
+            # opener is in an earlier chunk (or was consumed above) and survives
+            while True:
+                reduced = _INNER_GROUP.sub(_STRING, part)
+                if len(reduced) == len(part):
+                    break
+                part = reduced
+        self._walk(_BRACKET.split(part))
+
+    def _walk(self, pieces):
+        stack = self._stack
+        for i, piece in enumerate(pieces):
+            if i % 2 == 0:
+                if piece:
+                    if self._done:
+                        raise ValueError('Extra data after the JSON document')
+                    if stack and stack[-1] == ord('['):
+                        if b':' in piece:
+                            raise ValueError("Unexpected ':' in an array")
+                    elif stack:
+                        self._object_segment(piece)
+                    self._segment(piece, len(stack))
+                continue
+            char = piece[0]
+            if self._done:
+                raise ValueError('Extra data after the JSON document')
+            depth = len(stack)
+            if char in _CLOSES:
+                if not stack or stack[-1] != _CLOSES[char]:
+                    raise ValueError(f"Unexpected '{chr(char)}'")
+                stack.pop()
+                members = self._members.pop()
+                if members is not None and members[0] and members[1]:
+                    raise ValueError("Expected ':' after an object key")
+                if depth == self._target:
+                    self._close_target()
+                if not stack:
+                    self._done = True
+                continue
+            if depth == self._target:
+                self._nonempty = True
+            if self._searching and depth == 1 and char == ord('[') and self._member.endswith(self._key_marker):
+                # The unwrap_key array: count its elements instead of the members
+                self.shape = 'wrapped'
+                self._searching = False
+                self._target = 2
+                self._commas = 0
+                self._nonempty = False
+            self._member = b''
+            if stack and self._members[-1] is not None:
+                self._members[-1][1] = True
+            stack.append(char)
+            self._members.append([True, False] if char == ord('{') else None)
+
+    def _object_segment(self, piece):
+        """Check that an object's separators alternate ':' (after a key) and ',' (after a value)."""
+        members = self._members[-1]
+        members[1] = True
+        separators = piece.translate(None, _NON_SEPARATORS)
+        if separators:
+            expected = (b':,' if members[0] else b',:') * (len(separators) // 2 + 1)
+            if separators != expected[:len(separators)]:
+                raise ValueError("Expected ':' between an object's key and value and ',' between members")
+            if len(separators) % 2:
+                members[0] = not members[0]
+
+    def _segment(self, piece, depth):
+        if depth == self._target:
+            self._commas += piece.count(b',')
+            self._colons += piece.count(b':')
+            self._nonempty = True
+        if self._searching and depth == 1:
+            member = self._member + piece
+            self._member = member[member.rfind(b',') + 1:][-len(self._key_marker):]
+
+    def _close_target(self):
+        if self.shape == 'object':
+            self.count = self._colons
+        else:
+            self.count = self._commas + 1 if self._nonempty else 0
+        if self.shape == 'wrapped':
+            self._target = 0
+
+
+def count_elements(path, **kwargs):
+    """(shape, count) for a JSON file on disk, plain or compressed; see ElementCounter (BOM tolerant)."""
+    with open_evidence(path, binary=True) as f:
+        return ElementCounter(f, **kwargs).run()
+
+
+def iter_json_array(path, **kwargs):
+    """Yield top-level array elements from a JSON file on disk, plain or compressed (BOM tolerant)."""
+    with open_evidence(path) as f:
+        yield from JsonArrayStream(f, **kwargs)
+
+
+# ============================================================================
+# Self-check: python -m Common.json_stream
+# ============================================================================
+
+# Document -> (shape, count) ElementCounter must report, or ValueError (json.loads rejects it too)
+COUNTER_CASES = [
+    ('[1, 2]', ('array', 2)),
+    ('[]', ('array', 0)),
+    ('{"value": [{"a": [1, 2]}, {"b": {"c": "d"}}]}', ('wrapped', 2)),
+    ('{"x": "value", "value": [1]}', ('wrapped', 1)),
+    ('{"a": 1, "b": [1 ,2]}', ('object', 2)),
+    ('[1e-5, -2, 3.5E+2, true, false, null]', ('array', 6)),
+    ('["x\\"y", "z\\\\"]', ('array', 2)),
+    ('\ufeff  [ 1 ,\n 2 ]  ', ('array', 2)),
+    ('   ', ('empty', 0)),
+    ('12345', ('scalar', 0)),
+    ('"text"', ('scalar', 0)),
+    ('true', ('scalar', 0)),
+    # Separators
+    ('[1,2,]', ValueError),
+    ('[1 2]', ValueError),
+    ('[,]', ValueError),
+    ('[1,,2]', ValueError),
+    ('["a" "b"]', ValueError),
+    ('[{}{}]', ValueError),
+    ('{"a": 1,}', ValueError),
+    ('{"a"::1}', ValueError),
+    ('{"a" 1}', ValueError),
+    # Colons in arrays, at the top level and nested
+    ('[1:2]', ValueError),
+    ('[[1:2]]', ValueError),
+    ('{"a": [1, {"b": 2}, 3:4]}', ValueError),
+    ('{"value": [{"a": [1:2]}]}', ValueError),
+    # Object members that are not key:value pairs, at the top level and nested
+    ('{"a"}', ValueError),
+    ('{"a", "b"}', ValueError),
+    ('{"value": []: "other": 1}', ValueError),
+    ('[{"x": 1, "y"}]', ValueError),
+    ('{"value": [{"a": {"b", 1}}]}', ValueError),
+    ('{"a": {"b": [1, {"c": 2}]}, "d": {}}', ('object', 2)),
+    # Documents that do not start with a value, or have data after one
+    (',[{"id":1},{"id":2}]', ValueError),
+    (':1', ValueError),
+    ('}', ValueError),
+    ('1 2', ValueError),
+    ('1]', ValueError),
+    ('"a",1', ValueError),
+    ('[1] [2]', ValueError),
+    ('[1, 2', ValueError),
+]
+
+
+def _check_counter():
+    """Run COUNTER_CASES at several chunk sizes; returns the number of failures."""
+    failures = 0
+    for text, expected in COUNTER_CASES:
+        for chunk_size in (1, 3, CHUNK_SIZE):
+            try:
+                result = ElementCounter(io.BytesIO(text.encode()), chunk_size=chunk_size).run()
+            except ValueError as e:
+                result = ValueError
+                detail = str(e)
+            else:
+                detail = str(result)
+            if result != expected:
+                failures += 1
+                print(f"  ✗ {text!r} (chunk {chunk_size}): {detail}, expected {expected}")
+                break
+    return failures
+
+
+if __name__ == '__main__':
+    failed = _check_counter()
+    print(f"{'✓' if not failed else '✗'} ElementCounter: {len(COUNTER_CASES) - failed}/{len(COUNTER_CASES)} cases")
+    raise SystemExit(1 if failed else 0)
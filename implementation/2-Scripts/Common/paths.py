@@ -0,0 +1,25 @@
+"""
+Data Directory Resolution
+out/, transformed/ and analysis/ live under 2-Scripts by default; set
+SECAI_OUT_DIR, SECAI_TRANSFORM_DIR or SECAI_ANALYSIS_DIR to point a run at
+another corpus (e.g. a generated benchmark tenant) without moving files.
+history/ keeps the posture history across runs (SECAI_HISTORY_DIR). The
+scripts that write a directory create it, parents included, so an override
+may point at a path that does not exist yet
+"""
+
+import os
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+
+def data_dir(env_var, default_name):
+    value = os.environ.get(env_var)
+    return Path(value) if value else ROOT_DIR / default_name
+
+
+OUT_DIR = data_dir('SECAI_OUT_DIR', 'out')
+TRANSFORM_DIR = data_dir('SECAI_TRANSFORM_DIR', 'transformed')
+ANALYSIS_DIR = data_dir('SECAI_ANALYSIS_DIR', 'analysis')
+HISTORY_DIR = data_dir('SECAI_HISTORY_DIR', 'history')
@@ -0,0 +1,250 @@
+"""
+RBAC Effective-Access Index
+Indexes role_assignments (13_transform_rbac.py) by scope and by principal so
+effective-access questions are dictionary lookups instead of table scans
+
+An assignment applies to its own scope and everything below it:
+
+  / (root) -> management group -> subscription -> resource group -> resource
+           -> child resource
+
+So the principals holding a role on a scope are found by walking the scope's
+ancestors - a handful of lookups whatever the size of the tenant. Which
+subscriptions sit under which management groups comes from mg_sub_map.json
+(01_scope_discovery.ps1), which usually lists only a subscription's direct
+management group. The parent links in mg_hierarchy.json (and any parent or
+children details in management_groups.json) extend that chain up to the tenant
+root group, for subscription and management group scopes alike.
+"""
+
+import json
+from collections import namedtuple
+
+from Common.arm_ids import (parse_arm_id, resource_key, MANAGEMENT_GROUP, RESOURCE,
+                            RESOURCE_GROUP, ROOT, SUBSCRIPTION)
+from Common.evidence_files import find_evidence, open_evidence
+
+MG_MAP_NAME = 'mg_sub_map.json'
+MG_HIERARCHY_NAME = 'mg_hierarchy.json'
+MG_LIST_NAME = 'management_groups.json'
+
+MANAGEMENT_GROUP_PREFIX = '/providers/microsoft.management/managementgroups/'
+
+# One effective grant: the assignment row and the scope key it was made at
+# (the queried scope itself, or the ancestor it is inherited from)
+Grant = namedtuple('Grant', ['assignment', 'scope', 'inherited'])
+
+
+def _load_entries(out_dir, name):
+    """JSON list from out/<name>(.gz/.xz/.zst), [] if absent or unreadable."""
+    path = find_evidence(out_dir, name)
+    if path is None:
+        return []
+    try:
+        with open_evidence(path) as f:
+            entries = json.load(f)
+    except (OSError, ValueError):
+        return []
+    # ConvertTo-Json writes a lone item as an object rather than a list
+    if isinstance(entries, dict):
+        entries = [entries]
+    return [entry for entry in entries or () if isinstance(entry, dict)]
+
+
+def load_mg_memberships(out_dir):
+    """{subscription ID: [management group names]} from out/mg_sub_map.json(.gz) ({} if absent)."""
+    memberships = {}
+    for entry in _load_entries(out_dir, MG_MAP_NAME):
+        sub_id = str(entry.get('subscriptionId') or '').strip().lower()
+        mg = str(entry.get('mg') or '').strip()
+        if sub_id and mg:
+            groups = memberships.setdefault(sub_id, [])
+            if mg.lower() not in (g.lower() for g in groups):
+                groups.append(mg)
+    return memberships
+
+
+def load_mg_parents(out_dir):
+    """
+    {management group name: parent name} (lowercase) from out/mg_hierarchy.json,
+    plus any details.parent or nested children in out/management_groups.json.
+    """
+    parents = {}
+
+    def link(child, parent):
+        child = str(child or '').strip().lower()
+        parent = str(parent or '').strip().lower()
+        if child and parent and child != parent:
+            parents.setdefault(child, parent)
+
+    def walk(group):
+        details = group.get('details') or (group.get('properties') or {}).get('details') or {}
+        parent = details.get('parent') or {}
+        if isinstance(parent, dict):
+            link(group.get('name'), parent.get('name'))
+        children = group.get('children') or (group.get('properties') or {}).get('children') or ()
+        for child in children:
+            if isinstance(child, dict) and (child.get('type') or '').lower() == 'microsoft.management/managementgroups':
+                link(child.get('name'), group.get('name'))
+                walk(child)
+
+    for entry in _load_entries(out_dir, MG_HIERARCHY_NAME):
+        link(entry.get('mg'), entry.get('parent'))
+    for group in _load_entries(out_dir, MG_LIST_NAME):
+        walk(group)
+    return parents
+
+
+def management_group_key(name):
+    return MANAGEMENT_GROUP_PREFIX + name.lower()
+
+
+class RbacIndex:
+    """
+    Role assignments indexed by scope and principal.
+
+    assignments:    role_assignments rows (dicts or records)
+    mg_memberships: {subscription ID: [management group names]}
+    mg_parents:     {management group name: parent management group name}
+
+    Assignments collected from several subscriptions' files show up once per
+    file when made above subscription level; they are de-duplicated on
+    Assignment ID.
+    """
+
+    def __init__(self, assignments, mg_memberships=None, mg_parents=None):
+        self.by_scope = {}       # scope key -> [assignment]
+        self.by_principal = {}   # principal ID (lowercase) -> [assignment]
+        self.by_name = {}        # principal name (lowercase) -> {principal ID}
+        self.mg_parents = {management_group_key(child): management_group_key(parent)
+                           for child, parent in (mg_parents or {}).items()}
+        self.mg_subscriptions = {}   # management group key -> {subscription ID}, nested groups included
+        self.subscription_mgs = {}   # subscription ID -> [management group keys], nearest first
+        self.subscriptions = set()   # every subscription seen in the map or the assignments
+        self.assignment_count = 0
+
+        for sub_id, groups in (mg_memberships or {}).items():
+            sub_id = sub_id.lower()
+            keys = []
+            for mg in groups:
+                for key in self.management_group_chain(management_group_key(mg)):
+                    if key not in keys:
+                        keys.append(key)
+            # A map listing several levels keeps the deepest group first
+            keys.sort(key=lambda key: -len(self.management_group_chain(key)))
+            self.subscription_mgs[sub_id] = keys
+            self.subscriptions.add(sub_id)
+            for key in keys:
+                self.mg_subscriptions.setdefault(key, set()).add(sub_id)
+
+        seen = set()
+        for assignment in assignments:
+            sub_id = (assignment.get('Subscription ID') or '').lower()
+            if sub_id:
+                self.subscriptions.add(sub_id)
+            assignment_id = (assignment.get('Assignment ID') or '').lower()
+            if assignment_id:
+                if assignment_id in seen:
+                    continue
+                seen.add(assignment_id)
+            scope = resource_key(assignment.get('Scope'))
+            if not scope:
+                continue
+            self.by_scope.setdefault(scope, []).append(assignment)
+            principal = (assignment.get('Principal ID') or '').lower()
+            if principal:
+                self.by_principal.setdefault(principal, []).append(assignment)
+                name = (assignment.get('Principal Name') or '').lower()
+                if name:
+                    self.by_name.setdefault(name, set()).add(principal)
+            self.assignment_count += 1
+
+    # ------------------------------------------------------------------
+    # Scope hierarchy
+    # ------------------------------------------------------------------
+
+    def management_group_chain(self, key):
+        """A management group key followed by its parents' keys up to the root group."""
+        chain = []
+        while key and key not in chain:
+            chain.append(key)
+            key = self.mg_parents.get(key)
+        return chain
+
+    def ancestors(self, scope):
+        """Scope keys an assignment may be inherited from, nearest first (scope included)."""
+        parsed = parse_arm_id(scope)
+        chain = []
+        if parsed.level == RESOURCE:
+            key = parsed.key
+            while key:
+                chain.append(key)
+                key = parse_arm_id(key).parent
+        if parsed.resource_group and parsed.subscription:
+            chain.append(f"/subscriptions/{parsed.subscription}/resourcegroups/{parsed.resource_group.lower()}")
+        if parsed.subscription:
+            chain.append(f"/subscriptions/{parsed.subscription}")
+            chain.extend(self.subscription_mgs.get(parsed.subscription, ()))
+        elif parsed.level == MANAGEMENT_GROUP:
+            chain.extend(self.management_group_chain(parsed.key))
+        chain.append('/')
+        return chain
+
+    def covered_subscriptions(self, scope):
+        """Subscription IDs an assignment at scope reaches (all known ones for root)."""
+        parsed = parse_arm_id(scope)
+        if parsed.level == ROOT:
+            return set(self.subscriptions)
+        if parsed.level == MANAGEMENT_GROUP:
+            return set(self.mg_subscriptions.get(parsed.key, ()))
+        return {parsed.subscription} if parsed.subscription else set()
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def effective_access(self, scope, role=None, principal=None):
+        """
+        Grants in effect on scope, nearest scope first.
+
+        role and principal (ID, case-insensitive) narrow the result.
+        """
+        key = resource_key(scope)
+        role = role.lower() if role else None
+        principal = principal.lower() if principal else None
+        grants = []
+        for ancestor in self.ancestors(key):
+            for assignment in self.by_scope.get(ancestor, ()):
+                if role and (assignment.get('Role Name') or '').lower() != role:
+                    continue
+                if principal and (assignment.get('Principal ID') or '').lower() != principal:
+                    continue
+                grants.append(Grant(assignment, ancestor, ancestor != key))
+        return grants
+
+    def holders(self, scope, role=None):
+        """{principal ID: [grants]} for everyone with effective access to scope."""
+        principals = {}
+        for grant in self.effective_access(scope, role):
+            principal = (grant.assignment.get('Principal ID') or '').lower()
+            principals.setdefault(principal, []).append(grant)
+        return principals
+
+    def principal_assignments(self, principal):
+        """Assignments made directly to a principal (by ID, case-insensitive)."""
+        return list(self.by_principal.get((principal or '').lower(), ()))
+
+    def find_principals(self, text):
+        """Principal IDs whose ID or name matches text exactly (case-insensitive)."""
+        text = (text or '').strip().lower()
+        if text in self.by_principal:
+            return [text]
+        return sorted(self.by_name.get(text, ()))
+
+    def scope_levels(self):
+        """Assignment counts per scope level of the indexed scopes."""
+        levels = {level: 0 for level in (ROOT, MANAGEMENT_GROUP, SUBSCRIPTION, RESOURCE_GROUP, RESOURCE)}
+        for scope, assignments in self.by_scope.items():
+            level = parse_arm_id(scope).level
+            levels[level] = levels.get(level, 0) + len(assignments)
+        return levels
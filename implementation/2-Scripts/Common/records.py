@@ -0,0 +1,104 @@
+"""
+Compact Row Records
+Rows are stored as tuples in header order instead of one dict per row, and
+low-cardinality string columns are interned so every row shares one copy of
+each Subscription ID, Location, Resource Type, Role Name, ...
+
+A record still reads like the row dicts the scripts were written against:
+row['Role Name'], row.get('Location', ''), dict(row) and row.keys() all work.
+Iterating a record yields its values (it is a tuple), which is what csv.writer
+and sqlite3 want.
+"""
+
+import sys
+
+# Column headers whose values repeat across many rows; interned wherever rows
+# are built (transform engine, cache shards, warehouse/CSV loaders)
+CATEGORICAL_HEADERS = frozenset((
+    'Subscription ID', 'Resource Group', 'Location', 'Resource Type', 'Kind', 'SKU',
+    'SKU Name', 'SKU Tier', 'Access Tier', 'Provisioning State', 'State', 'Status',
+    'Cause', 'Role Name', 'Principal Type', 'Scope Level', 'Role Definition ID',
+    'Version', 'Public Network Access', 'Minimal TLS Version', 'Encryption Key Source',
+    'HTTPS Only', 'Allow Public Blob Access', 'Soft Delete', 'Purge Protection',
+    'Enabled For Deployment', 'Enabled For Disk Encryption', 'Enabled For Template',
+    'Enforcement Mode', 'Pricing Tier', 'Destination', 'Collation', 'Assessment Name',
+    'Policy Name', 'Policy Definition ID', 'Display Name', 'Score Name',
+    'NSG Name', 'Rule Type', 'Direction', 'Access', 'Protocol', 'Internet Source',
+    'VNet Name', 'Level', 'Service Principal Type', 'Account Enabled', 'Sign In Audience',
+    'Owner Type', 'Credential Type',
+))
+
+
+def intern_value(value):
+    return sys.intern(value) if type(value) is str else value
+
+
+class Record(tuple):
+    """Base class for per-header-list record types (see record_type)."""
+
+    __slots__ = ()
+    headers = ()
+    _index = {}
+    _categorical = ()
+
+    @classmethod
+    def make(cls, values):
+        """Build a record from values in header order, interning categorical columns."""
+        values = list(values)
+        for i in cls._categorical:
+            values[i] = intern_value(values[i])
+        return tuple.__new__(cls, values)
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return tuple.__getitem__(self, self._index[key])
+        return tuple.__getitem__(self, key)
+
+    def get(self, key, default=None):
+        index = self._index.get(key)
+        return default if index is None else tuple.__getitem__(self, index)
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def keys(self):
+        return self.headers
+
+    def values(self):
+        return tuple(self)
+
+    def items(self):
+        return zip(self.headers, self)
+
+    def as_dict(self):
+        return dict(zip(self.headers, self))
+
+    def __repr__(self):
+        return f"Record({self.as_dict()!r})"
+
+    def __reduce__(self):
+        # Record types are created at runtime; pickle by header list so rows
+        # can travel back from process-pool workers
+        return _restore, (self.headers, tuple(self))
+
+
+_TYPES = {}
+
+
+def record_type(headers):
+    """Record class for a header list (one class per distinct header tuple)."""
+    headers = tuple(headers)
+    cls = _TYPES.get(headers)
+    if cls is None:
+        cls = type('Record', (Record,), {
+            '__slots__': (),
+            'headers': headers,
+            '_index': {h: i for i, h in enumerate(headers)},
+            '_categorical': tuple(i for i, h in enumerate(headers) if h in CATEGORICAL_HEADERS),
+        })
+        _TYPES[headers] = cls
+    return cls
+
+
+def _restore(headers, values):
+    return record_type(headers).make(values)
@@ -0,0 +1,228 @@
+"""
+Declarative Risk Rule Engine
+Evaluates the RiskRule specs in Common/risk_rules.py over the transformed
+tables and reports, per rule, how many rows are affected and which ones
+
+Each table is read once no matter how many rules target it. Rule conditions
+are indexed rather than tried one by one: equality conditions become a dict
+lookup per column and numeric thresholds a bisect over the sorted limits, so
+a row only ever touches the rules it can actually match. Plain callables
+still work as conditions but are checked for every row.
+"""
+
+from bisect import bisect_left, bisect_right
+
+EQUALITY_OPS = ('eq', 'in')
+RANGE_OPS = ('lt', 'le', 'gt', 'ge')
+
+# Column identifying an affected row, where it is not 'Resource ID'
+ID_COLUMNS = {
+    'secure_scores': 'Subscription ID',
+    'security_assessments': 'Assessment ID',
+    'role_assignments': 'Assignment ID',
+}
+
+
+def _number(value):
+    if isinstance(value, (int, float)):
+        return value
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class Condition:
+    """One column test; build with equals/one_of/below/... rather than directly."""
+
+    __slots__ = ('column', 'op', 'value')
+
+    def __init__(self, column, op, value):
+        self.column = column
+        self.op = op
+        self.value = frozenset(value) if op == 'in' else value
+
+    def __call__(self, row):
+        value = row.get(self.column)
+        op = self.op
+        if op == 'eq':
+            return value == self.value
+        if op == 'in':
+            return value in self.value
+        if op == 'ne':
+            return value != self.value
+        number = _number(value)
+        if number is None:
+            return False
+        if op == 'lt':
+            return number < self.value
+        if op == 'le':
+            return number <= self.value
+        if op == 'gt':
+            return number > self.value
+        return number >= self.value
+
+
+def equals(column, value):
+    return Condition(column, 'eq', value)
+
+
+def one_of(column, values):
+    return Condition(column, 'in', values)
+
+
+def not_equals(column, value):
+    return Condition(column, 'ne', value)
+
+
+def below(column, limit):
+    return Condition(column, 'lt', limit)
+
+
+def at_most(column, limit):
+    return Condition(column, 'le', limit)
+
+
+def above(column, limit):
+    return Condition(column, 'gt', limit)
+
+
+def at_least(column, limit):
+    return Condition(column, 'ge', limit)
+
+
+class RiskRule:
+    """
+    One risk finding.
+
+    table:        transformed table the rule reads, e.g. 'key_vaults'
+    where:        conditions a row must all meet to be affected (Condition
+                  objects or any callable taking the row)
+    min_count:    affected rows needed before the risk is reported
+    description:  text with {count} (affected rows) and {total} (table rows)
+    id_column:    column naming an affected row (default from ID_COLUMNS)
+    The remaining fields are copied to top_security_risks.csv as-is.
+    """
+
+    def __init__(self, risk_id, table, where, category, severity, title, description, impact,
+                 compliance_impact, remediation, effort, priority, min_count=1, id_column=None):
+        self.risk_id = risk_id
+        self.table = table
+        self.where = tuple(where)
+        self.category = category
+        self.severity = severity
+        self.title = title
+        self.description = description
+        self.impact = impact
+        self.compliance_impact = compliance_impact
+        self.remediation = remediation
+        self.effort = effort
+        self.priority = priority
+        self.min_count = min_count
+        self.id_column = id_column or ID_COLUMNS.get(table, 'Resource ID')
+
+
+class RuleResult:
+    """Rows matched by one rule: (subscription ID, row ID) pairs."""
+
+    def __init__(self, rule, total):
+        self.rule = rule
+        self.total = total
+        self.affected = []
+
+    @property
+    def count(self):
+        return len(self.affected)
+
+    @property
+    def triggered(self):
+        return self.count >= self.rule.min_count
+
+    def as_risk(self):
+        """Row for top_security_risks.csv."""
+        rule = self.rule
+        return {
+            'Risk ID': rule.risk_id,
+            'Category': rule.category,
+            'Severity': rule.severity,
+            'Title': rule.title,
+            'Description': rule.description.format(count=self.count, total=self.total),
+            'Impact': rule.impact,
+            'Affected Count': self.count,
+            'Compliance Impact': rule.compliance_impact,
+            'Remediation': rule.remediation,
+            'Estimated Effort': rule.effort,
+            'Priority': rule.priority,
+        }
+
+
+class _TablePlan:
+    """Rule conditions for one table, indexed for a single pass over its rows."""
+
+    def __init__(self, results):
+        self.equality = {}   # column -> {value: [(result, other conditions)]}
+        self.ranges = {}     # (column, op) -> ([sorted limits], [(result, other conditions)])
+        self.scans = []      # [(result, conditions)] checked on every row
+        ranges = {}
+        for result in results:
+            where = result.rule.where
+            key = (next((c for c in where if isinstance(c, Condition) and c.op in EQUALITY_OPS), None)
+                   or next((c for c in where if isinstance(c, Condition) and c.op in RANGE_OPS), None))
+            if key is None:
+                self.scans.append((result, where))
+                continue
+            rest = tuple(c for c in where if c is not key)
+            if key.op in EQUALITY_OPS:
+                by_value = self.equality.setdefault(key.column, {})
+                for value in (key.value if key.op == 'in' else (key.value,)):
+                    by_value.setdefault(value, []).append((result, rest))
+            else:
+                ranges.setdefault((key.column, key.op), []).append((key.value, result, rest))
+        for index, entries in ranges.items():
+            entries.sort(key=lambda entry: entry[0])
+            self.ranges[index] = ([limit for limit, _, _ in entries],
+                                  [(result, rest) for _, result, rest in entries])
+
+    def candidates(self, row):
+        """(result, remaining conditions) for every rule whose index condition the row meets."""
+        for column, by_value in self.equality.items():
+            hits = by_value.get(row.get(column))
+            if hits:
+                yield from hits
+        for (column, op), (limits, entries) in self.ranges.items():
+            value = _number(row.get(column))
+            if value is None:
+                continue
+            if op == 'lt':
+                yield from entries[bisect_right(limits, value):]
+            elif op == 'le':
+                yield from entries[bisect_left(limits, value):]
+            elif op == 'gt':
+                yield from entries[:bisect_left(limits, value)]
+            else:
+                yield from entries[:bisect_right(limits, value)]
+        yield from self.scans
+
+
+def evaluate_rules(rules, tables):
+    """
+    Evaluate rules against tables ({table name: rows}) in one pass per table.
+
+    Returns a RuleResult per rule, in rule order. Rules whose table is not
+    given see an empty table.
+    """
+    results = [RuleResult(rule, len(tables.get(rule.table) or ())) for rule in rules]
+    by_table = {}
+    for result in results:
+        by_table.setdefault(result.rule.table, []).append(result)
+
+    for name, table_results in by_table.items():
+        plan = _TablePlan(table_results)
+        for row in tables.get(name) or ():
+            for result, conditions in plan.candidates(row):
+                for condition in conditions:
+                    if not condition(row):
+                        break
+                else:
+                    result.affected.append((row.get('Subscription ID'), row.get(result.rule.id_column)))
+    return results
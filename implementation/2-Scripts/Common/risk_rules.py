@@ -0,0 +1,103 @@
+"""
+Risk Rule Catalog
+Risk findings reported by 18_analyze_top_risks.py, one RiskRule each
+
+A rule names the transformed table it reads, the conditions an affected row
+meets, how many affected rows it takes to report the risk, and the text that
+goes into top_security_risks.csv. Adding a risk is just another entry here;
+the engine (Common/risk_engine.py) evaluates all rules for a table in a
+single pass.
+"""
+
+from Common.risk_engine import RiskRule, below, equals, one_of
+
+PRIVILEGED_ROLES = ['Owner', 'Contributor', 'User Access Administrator']
+
+
+RISK_RULES = [
+    RiskRule(
+        'RISK-001', 'key_vaults', [equals('Soft Delete', 'No')],
+        category='Data Protection',
+        severity='CRITICAL',
+        title='Key Vaults Without Soft Delete Protection',
+        description='{count} of {total} Key Vaults have soft delete disabled',
+        impact='Permanent loss of encryption keys, secrets, and certificates if accidentally deleted',
+        compliance_impact='HIGH',
+        remediation='Enable soft delete and purge protection on all Key Vaults via Azure Policy',
+        effort='1 week',
+        priority=1,
+    ),
+    RiskRule(
+        'RISK-002', 'sql_servers', [equals('Public Network Access', 'Enabled')],
+        category='Network Security',
+        severity='CRITICAL',
+        title='SQL Servers with Public Network Access Enabled',
+        description='{count} of {total} SQL servers are exposed to the internet',
+        impact='Database servers vulnerable to brute force attacks and unauthorized access attempts',
+        compliance_impact='HIGH',
+        remediation='Disable public access and implement Private Endpoints',
+        effort='2-3 weeks',
+        priority=2,
+    ),
+    RiskRule(
+        'RISK-003', 'secure_scores', [below('Percentage', 40)],
+        category='Security Posture',
+        severity='HIGH',
+        title='Subscriptions with Low Secure Score',
+        description='{count} of {total} subscriptions have Secure Score below 40%',
+        impact='Indicates significant security gaps and misconfigurations',
+        compliance_impact='MEDIUM',
+        remediation='Address Defender recommendations in low-scoring subscriptions',
+        effort='2-3 months',
+        priority=3,
+    ),
+    RiskRule(
+        'RISK-004', 'security_assessments', [equals('Status', 'Unhealthy')],
+        category='Security Compliance',
+        severity='HIGH',
+        title='Unhealthy Security Assessments',
+        description='{count} security findings marked as unhealthy by Defender for Cloud',
+        impact='Active security vulnerabilities and misconfigurations requiring remediation',
+        compliance_impact='HIGH',
+        remediation='Prioritize by severity and remediate systematically',
+        effort='Ongoing - 3-6 months',
+        priority=4,
+    ),
+    RiskRule(
+        'RISK-005', 'role_assignments', [equals('Role Name', 'Owner')],
+        min_count=101,
+        category='Identity & Access',
+        severity='HIGH',
+        title='Excessive Owner Role Assignments',
+        description='{count} Owner role assignments across environment',
+        impact='Over-privileged access increases risk of accidental or malicious changes',
+        compliance_impact='MEDIUM',
+        remediation='Review all Owner assignments, implement Just-In-Time (JIT) access via PIM',
+        effort='2-4 weeks',
+        priority=5,
+    ),
+    RiskRule(
+        'RISK-006', 'role_assignments', [equals('Principal Type', 'User'), one_of('Role Name', PRIVILEGED_ROLES)],
+        category='Identity & Access',
+        severity='MEDIUM',
+        title='Direct User Assignments with Privileged Access',
+        description='{count} direct user assignments with Owner/Contributor access',
+        impact='Direct assignments bypass group management and auditing',
+        compliance_impact='MEDIUM',
+        remediation='Migrate to group-based access management',
+        effort='2 weeks',
+        priority=6,
+    ),
+    RiskRule(
+        'RISK-007', 'secure_scores', [below('Percentage', 10)],
+        category='Security Posture',
+        severity='CRITICAL',
+        title='Subscriptions with Critical Secure Score',
+        description='{count} subscriptions have Secure Score below 10%',
+        impact='Extreme security risk - immediate attention required',
+        compliance_impact='CRITICAL',
+        remediation='Emergency security review and remediation',
+        effort='1-2 weeks',
+        priority=1,
+    ),
+]
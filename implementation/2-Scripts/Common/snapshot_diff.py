@@ -0,0 +1,279 @@
+"""
+Snapshot Diff
+Compares one table's CSV in two transformed/ snapshots (e.g. last month's run
+and this one) and streams its added, removed and modified rows to a change CSV
+
+Rows are matched on the table's key columns (Table.key) and compared by a hash
+of their values, so a row's content is only examined when its hash changed.
+Small tables are matched in memory. Larger ones are first split by key hash
+into partition files on disk - every row with a given key lands in the same
+partition of both snapshots - and matched one partition at a time. At most
+MAX_FANOUT partition files are open at once; a table needing more is split
+into MAX_FANOUT partitions first and each of those split again on further
+bits of the key hash. Time is linear in the table size (times the number of
+levels, two at most for any realistic table) and memory is bounded by
+PARTITION_BYTES whatever the size of the table.
+"""
+
+import csv
+import hashlib
+import pickle
+import shutil
+import sys
+import tempfile
+from collections import Counter
+from pathlib import Path
+
+# Old-snapshot CSV bytes matched in memory at once; larger tables are partitioned
+PARTITION_BYTES = 16 * 1024 * 1024
+
+# Entries buffered per partition before they are appended to its file
+PARTITION_BATCH = 1000
+
+# Partition files written at once, well under the usual open-file limits
+MAX_FANOUT = 256
+
+ID_COLUMNS = ('Resource ID', 'Assignment ID', 'Assessment ID')
+
+ADDED = 'Added'
+REMOVED = 'Removed'
+MODIFIED = 'Modified'
+
+SEPARATOR = '\x1f'
+
+# Change CSVs: change type, what changed and the previous values, then the row
+CHANGE_HEADERS = ['Change', 'Changed Columns', 'Previous Values']
+
+# Analysis-size fields (e.g. long descriptions) must not trip csv's 128 KB default
+csv.field_size_limit(min(sys.maxsize, 2 ** 31 - 1))
+
+
+def key_columns(table):
+    """Columns that identify a row of table across runs (Table.key or the default)."""
+    if table.key:
+        return list(table.key)
+    headers = table.headers
+    key = ['Subscription ID'] if 'Subscription ID' in headers else []
+    for column in ID_COLUMNS:
+        if column in headers:
+            return key + [column]
+    # No ID column: the whole row is its own key (rows are only added or removed)
+    return list(headers)
+
+
+def row_hash(values):
+    return hashlib.blake2b(SEPARATOR.join(values).encode('utf-8'), digest_size=16).digest()
+
+
+class TableDiff:
+    """Change counts for one table."""
+
+    def __init__(self, name, key):
+        self.name = name
+        self.key = key
+        self.old_rows = 0
+        self.new_rows = 0
+        self.added = 0
+        self.removed = 0
+        self.modified = 0
+        self.unchanged = 0
+        self.partitions = 0
+        self.columns_added = []
+        self.columns_removed = []
+        self.changed_columns = Counter()
+
+    @property
+    def changes(self):
+        return self.added + self.removed + self.modified
+
+
+def _read_csv(path):
+    """(headers, row iterator) for a CSV written by the transforms."""
+    f = open(path, 'r', newline='', encoding='utf-8-sig')
+    reader = csv.reader(f)
+    headers = next(reader, None) or []
+
+    def rows():
+        try:
+            yield from reader
+        finally:
+            f.close()
+    return headers, rows()
+
+
+class _Side:
+    """One snapshot of a table, read as (key, hash of the compared columns, row)."""
+
+    def __init__(self, path):
+        exists = path is not None and path.exists()
+        self.headers, self.rows = _read_csv(path) if exists else ([], iter(()))
+        self.size = path.stat().st_size if exists else 0
+        self.position = {h: i for i, h in enumerate(self.headers)}
+        self.key_index = self.compare_index = ()
+        self.count = 0
+
+    def select(self, key, columns):
+        self.key_index = [self.position.get(c) for c in key]
+        self.compare_index = [self.position.get(c) for c in columns]
+
+    def entries(self):
+        key_index, compare_index = self.key_index, self.compare_index
+        for row in self.rows:
+            self.count += 1
+            width = len(row)
+            key = SEPARATOR.join(row[i] if i is not None and i < width else '' for i in key_index)
+            compared = [row[i] if i is not None and i < width else '' for i in compare_index]
+            yield key, row_hash(compared), row
+
+
+def _partition(entries, count, directory, prefix, divisor=1):
+    """
+    Spread entries over count partition files by key hash (hash // divisor,
+    so each level of splitting uses different bits); returns their paths.
+    """
+    paths = [directory / f"{prefix}_{i}.bin" for i in range(count)]
+    files = [open(p, 'wb') for p in paths]
+    batches = [[] for _ in paths]
+    try:
+        for entry in entries:
+            i = hash(entry[0]) // divisor % count
+            batch = batches[i]
+            batch.append(entry)
+            if len(batch) >= PARTITION_BATCH:
+                pickle.dump(batch, files[i], pickle.HIGHEST_PROTOCOL)
+                batch.clear()
+        for f, batch in zip(files, batches):
+            if batch:
+                pickle.dump(batch, f, pickle.HIGHEST_PROTOCOL)
+    finally:
+        for f in files:
+            f.close()
+    return paths
+
+
+def _read_partition(path):
+    with open(path, 'rb') as f:
+        while True:
+            try:
+                batch = pickle.load(f)
+            except EOFError:
+                return
+            yield from batch
+
+
+def _partition_pairs(old_entries, new_entries, count, directory, prefix='p', divisor=1):
+    """
+    (old entries, new entries) for at least count partitions of both sides,
+    splitting at most MAX_FANOUT ways at a time and recursing for the rest.
+    """
+    fanout = min(count, MAX_FANOUT)
+    old_parts = _partition(old_entries, fanout, directory, f"{prefix}_old", divisor)
+    new_parts = _partition(new_entries, fanout, directory, f"{prefix}_new", divisor)
+    remaining = -(-count // fanout)
+    for i, (old_path, new_path) in enumerate(zip(old_parts, new_parts)):
+        if remaining == 1:
+            yield _read_partition(old_path), _read_partition(new_path)
+        else:
+            yield from _partition_pairs(_read_partition(old_path), _read_partition(new_path), remaining,
+                                        directory, f"{prefix}_{i}", divisor * fanout)
+        old_path.unlink()
+        new_path.unlink()
+
+
+def _occurrences(entries):
+    """Number repeated keys so duplicates within a snapshot are matched in order."""
+    seen = Counter()
+    for key, digest, row in entries:
+        n = seen[key]
+        seen[key] = n + 1
+        yield (key, n) if n else key, digest, row
+
+
+def _match(old_entries, new_entries, diff, emit, old_values, new_values, compared):
+    """
+    Match one partition: the old side is held in a dict and the new side
+    streamed against it. old_values / new_values project a raw row to the
+    output columns; compared lists (output position, header) of the columns
+    both snapshots share.
+    """
+    old = {}
+    for key, digest, row in _occurrences(old_entries):
+        old[key] = (digest, row)
+    for key, digest, row in _occurrences(new_entries):
+        previous = old.pop(key, None)
+        if previous is None:
+            diff.added += 1
+            emit(ADDED, '', '', new_values(row))
+        elif previous[0] == digest:
+            diff.unchanged += 1
+        else:
+            before, after = old_values(previous[1]), new_values(row)
+            changed = [(c, before[i]) for i, c in compared if before[i] != after[i]]
+            diff.changed_columns.update(c for c, _ in changed)
+            diff.modified += 1
+            emit(MODIFIED, ', '.join(c for c, _ in changed), '; '.join(f"{c}={v}" for c, v in changed), after)
+    for digest, row in old.values():
+        diff.removed += 1
+        emit(REMOVED, '', '', old_values(row))
+
+
+def diff_table(table, old_path, new_path, changes_path, work_dir=None, partition_bytes=PARTITION_BYTES):
+    """
+    Diff one table between two snapshots and stream its changes to changes_path.
+
+    old_path / new_path may be missing (the table is then entirely added or
+    removed). Columns present in only one snapshot are reported on the
+    TableDiff and left out of the comparison. The change CSV is only kept
+    when there are changes. Returns the TableDiff.
+    """
+    key = key_columns(table)
+    diff = TableDiff(table.name, key)
+    old, new = _Side(old_path), _Side(new_path)
+    old_headers, new_headers = old.headers, new.headers
+    if old_headers and new_headers:
+        diff.columns_added = [h for h in new_headers if h not in old_headers]
+        diff.columns_removed = [h for h in old_headers if h not in new_headers]
+        compared = [h for h in new_headers if h in old_headers]
+    else:
+        compared = new_headers or old_headers
+    # Change rows use the newest header list; a removed table keeps its own
+    headers = new_headers or old_headers
+    old.select(key, compared)
+    new.select(key, compared)
+    old_position, new_position = old.position, new.position
+
+    def project(row, position):
+        width = len(row)
+        return [row[position[h]] if h in position and position[h] < width else '' for h in headers]
+
+    shared = [(i, h) for i, h in enumerate(headers) if h in compared]
+
+    with open(changes_path, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f)
+        writer.writerow(CHANGE_HEADERS + headers)
+        write = writer.writerow
+
+        def emit(change, columns, previous, row):
+            write([change, columns, previous] + row)
+
+        count = max(1, -(-old.size // partition_bytes))
+        scratch = None
+        try:
+            if count == 1:
+                parts = [(old.entries(), new.entries())]
+            else:
+                scratch = Path(tempfile.mkdtemp(prefix=f"diff_{table.name}_", dir=work_dir))
+                parts = _partition_pairs(old.entries(), new.entries(), count, scratch)
+            for old_entries, new_entries in parts:
+                diff.partitions += 1
+                _match(old_entries, new_entries, diff, emit,
+                       lambda row: project(row, old_position), lambda row: project(row, new_position),
+                       shared)
+        finally:
+            if scratch is not None:
+                shutil.rmtree(scratch, ignore_errors=True)
+
+    diff.old_rows, diff.new_rows = old.count, new.count
+    if not diff.changes:
+        changes_path.unlink()
+    return diff
@@ -0,0 +1,160 @@
+"""
+Streaming Summary Statistics
+Accumulators that are fed each row as the transform engine produces it, so the
+summary sections need no extra passes over the row lists (and would work the
+same if rows were streamed straight to disk)
+
+A Table lists its accumulators in ``stats``; after run_tables() they are
+available as ``results[name].stats[<accumulator name>]`` and are written to
+transformed/<table>.stats.json next to the CSV.
+"""
+
+import json
+from abc import ABC, abstractmethod
+from collections import Counter
+
+
+class Accumulator(ABC):
+    """
+    Base class: watches one column, optionally only rows matching ``where``.
+
+    name defaults to the column header; give a different name when the same
+    column is accumulated twice (e.g. once for all rows, once filtered).
+    """
+
+    def __init__(self, column, name=None, where=None):
+        self.column = column
+        self.name = name or column
+        self.where = where
+
+    @abstractmethod
+    def reset(self):
+        """Clear the state before a run."""
+
+    @abstractmethod
+    def add(self, value):
+        """Take one row's value."""
+
+    @abstractmethod
+    def summary(self):
+        """JSON-serialisable result for the .stats.json file."""
+
+
+class Tally(Accumulator):
+    """Count of rows per distinct value (top-N via most_common)."""
+
+    def reset(self):
+        self.counts = Counter()
+        self.total = 0
+
+    def add(self, value):
+        self.counts[value] += 1
+        self.total += 1
+
+    def __getitem__(self, value):
+        return self.counts[value]
+
+    def most_common(self, n=None):
+        return self.counts.most_common(n)
+
+    @property
+    def distinct(self):
+        return len(self.counts)
+
+    def summary(self):
+        return {'total': self.total, 'distinct': self.distinct,
+                'counts': {str(k): v for k, v in self.counts.most_common()}}
+
+
+class Numeric(Accumulator):
+    """Count, total, min, max and mean of a numeric column (non-numbers are ignored)."""
+
+    def reset(self):
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def add(self, value):
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0
+
+    def summary(self):
+        return {'count': self.count, 'total': self.total, 'min': self.min,
+                'max': self.max, 'mean': self.mean}
+
+
+class Distinct(Accumulator):
+    """Exact number of distinct values (memory grows with the cardinality)."""
+
+    def reset(self):
+        self.values = set()
+
+    def add(self, value):
+        self.values.add(value)
+
+    def __len__(self):
+        return len(self.values)
+
+    def summary(self):
+        return {'distinct': len(self.values)}
+
+
+class TableStats:
+    """Fresh set of accumulators for one table run, keyed by accumulator name."""
+
+    def __init__(self, accumulators):
+        self.rows = 0
+        self.accumulators = {}
+        self._plain = []
+        self._filtered = []
+        for acc in accumulators:
+            # Specs live on the module-level Table, so each run gets its own copy
+            acc = type(acc)(acc.column, acc.name, acc.where)
+            acc.reset()
+            self.accumulators[acc.name] = acc
+            (self._filtered if acc.where else self._plain).append((acc.column, acc.add, acc.where))
+
+    def add(self, row):
+        self.rows += 1
+        for column, add, _ in self._plain:
+            add(row[column])
+        for column, add, where in self._filtered:
+            if where(row):
+                add(row[column])
+
+    def __getitem__(self, name):
+        return self.accumulators[name]
+
+    def summary(self):
+        return {name: acc.summary() for name, acc in self.accumulators.items()}
+
+
+def write_stats(result, transform_dir):
+    """Write a table's counters and accumulator summaries as JSON beside its CSV."""
+    table = result.table
+    stats_path = transform_dir / f"{table.name}.stats.json"
+    payload = {
+        'table': table.name,
+        'csv': table.csv_name,
+        'rows': result.stats.rows,
+        'files': result.files,
+        'parsed': result.parsed,
+        'skipped': result.skipped,
+        'failed': result.failed,
+        'duplicates': result.duplicates,
+        'columns': result.stats.summary(),
+    }
+    with open(stats_path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, indent=2, default=str)
+    return stats_path
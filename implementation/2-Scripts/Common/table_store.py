@@ -0,0 +1,33 @@
+"""
+In-Memory Table Store
+Lets run_pipeline.py hand transformed tables straight to the analysis stages
+in the same process instead of having them re-read the CSVs just written
+
+The store is off unless the pipeline runner enables it, so standalone script
+runs behave exactly as before.
+"""
+
+_enabled = False
+_tables = {}
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+    _tables.clear()
+
+
+def publish(name, rows):
+    """Make a table's rows available to later stages (no-op when disabled)."""
+    if _enabled:
+        _tables[name] = rows
+
+
+def get(name):
+    """Rows published for a table in this process, or None."""
+    return _tables.get(name) if _enabled else None
@@ -0,0 +1,601 @@
+"""
+Output Table Catalog
+Column specs for every CSV produced by the transformation scripts (11-17)
+
+Each Table names its input file suffix in out/ and the columns to extract from
+each JSON item. Adding a table here is all it takes for the engine to produce
+it; scripts select their tables by name.
+"""
+
+import json
+from datetime import date
+
+from Common.arm_ids import parse_arm_id, scope_level
+from Common.intervals import format_port_ranges, is_internet_source, parse_port_ranges
+from Common.stats import Distinct, Numeric, Tally
+from Common.transform_engine import Column, Table, SUBSCRIPTION
+
+
+# ============================================================================
+# Value helpers
+# ============================================================================
+
+def yes_no(value):
+    return 'Yes' if value else 'No'
+
+
+def json_or_empty(value):
+    return json.dumps(value) if value else ''
+
+
+def list_count(value):
+    return len(value) if isinstance(value, list) else 0
+
+
+def truncate_500(value):
+    return value[:500] if value else ''
+
+
+def _percentage(score):
+    current = score.get('current', 0)
+    maximum = score.get('max', 0)
+    return round((current / score.get('max', 1)) * 100, 2) if maximum > 0 else 0
+
+
+def _max_size_gb(db):
+    max_size = db.get('maxSizeBytes', 0)
+    return round(max_size / (1024**3), 2) if max_size else 0
+
+
+def _nsg_total_rules(nsg):
+    return list_count(nsg.get('securityRules', [])) + list_count(nsg.get('defaultSecurityRules', []))
+
+
+def _rule_values(rule, single, plural):
+    """A rule field given either as one value or as a list (e.g. sourceAddressPrefix/es)."""
+    values = []
+    value = rule.get(single)
+    if value:
+        values.append(value)
+    more = rule.get(plural)
+    if isinstance(more, list):
+        values.extend(v for v in more if v and v not in values)
+    return values
+
+
+def _asg_names(rule, key):
+    groups = rule.get(key)
+    if not isinstance(groups, list):
+        return []
+    return [f"ASG:{parse_arm_id(g.get('id')).name}" for g in groups if isinstance(g, dict) and g.get('id')]
+
+
+def _nsg_rules(nsg):
+    """One sub-item per custom and default rule of an NSG, with ports and prefixes normalized."""
+    for rule_type, key in (('Custom', 'securityRules'), ('Default', 'defaultSecurityRules')):
+        rules = nsg.get(key)
+        if not isinstance(rules, list):
+            continue
+        for rule in rules:
+            if not isinstance(rule, dict):
+                continue
+            # Resource Graph nests the rule fields under properties; the CLI flattens them
+            props = rule.get('properties')
+            if isinstance(props, dict):
+                rule = dict(props, name=rule.get('name'))
+            sources = _rule_values(rule, 'sourceAddressPrefix', 'sourceAddressPrefixes')
+            yield {
+                'nsg': nsg,
+                'rule': rule,
+                'type': rule_type,
+                'sources': ', '.join(sources + _asg_names(rule, 'sourceApplicationSecurityGroups')),
+                'source_ports': format_port_ranges(parse_port_ranges(
+                    _rule_values(rule, 'sourcePortRange', 'sourcePortRanges'))),
+                'destinations': ', '.join(
+                    _rule_values(rule, 'destinationAddressPrefix', 'destinationAddressPrefixes')
+                    + _asg_names(rule, 'destinationApplicationSecurityGroups')),
+                'destination_ports': format_port_ranges(parse_port_ranges(
+                    _rule_values(rule, 'destinationPortRange', 'destinationPortRanges'))),
+                'internet': is_internet_source(sources),
+            }
+
+
+def _vnet_prefixes(vnet):
+    """One sub-item per address-space prefix and per subnet prefix of a VNet."""
+    space = vnet.get('addressSpace')
+    prefixes = space.get('addressPrefixes') if isinstance(space, dict) else None
+    for prefix in prefixes if isinstance(prefixes, list) else ():
+        if prefix:
+            yield {'vnet': vnet, 'level': 'Address Space', 'subnet': '', 'prefix': prefix}
+    subnets = vnet.get('subnets')
+    for subnet in subnets if isinstance(subnets, list) else ():
+        if not isinstance(subnet, dict):
+            continue
+        props = subnet.get('properties')
+        fields = props if isinstance(props, dict) else subnet
+        for prefix in _rule_values(fields, 'addressPrefix', 'addressPrefixes'):
+            yield {'vnet': vnet, 'level': 'Subnet', 'subnet': subnet.get('name', ''), 'prefix': prefix}
+
+
+# Credentials this close to their end date are reported as Expiring
+EXPIRY_WARNING_DAYS = 30
+
+CREDENTIAL_KINDS = (('Password', 'passwordCredentials'), ('Certificate', 'keyCredentials'))
+
+
+def _end_date(credential):
+    """End date of a Graph (endDateTime) or AAD Graph (endDate) credential, or None."""
+    value = credential.get('endDateTime') or credential.get('endDate')
+    try:
+        return date.fromisoformat(str(value)[:10])
+    except (TypeError, ValueError):
+        return None
+
+
+def _owner_credentials(owner):
+    for kind, key in CREDENTIAL_KINDS:
+        for credential in owner.get(key) or ():
+            if isinstance(credential, dict):
+                yield kind, credential
+
+
+def _credentials(owner):
+    """Password and certificate credentials of an application or service principal."""
+    owner_type = 'Service Principal' if 'servicePrincipalType' in owner else 'Application'
+    for kind, credential in _owner_credentials(owner):
+        yield {'owner': owner, 'ownerType': owner_type, 'type': kind, 'credential': credential,
+               'end': _end_date(credential)}
+
+
+def _days_to_expiry(end):
+    return (end - date.today()).days if end is not None else ''
+
+
+def _credential_status(end):
+    if end is None:
+        return 'Unknown'
+    days = (end - date.today()).days
+    if days < 0:
+        return 'Expired'
+    return 'Expiring' if days <= EXPIRY_WARNING_DAYS else 'Valid'
+
+
+def _expired_credentials(owner):
+    today = date.today()
+    return sum(1 for _, c in _owner_credentials(owner) if (_end_date(c) or today) < today)
+
+
+def _next_expiry(owner):
+    """Earliest end date among the credentials that have not expired yet."""
+    today = date.today()
+    ends = [end for end in (_end_date(c) for _, c in _owner_credentials(owner)) if end and end >= today]
+    return min(ends).isoformat() if ends else ''
+
+
+def _is_positive(value):
+    return isinstance(value, (int, float)) and value > 0
+
+
+def _is_standard(plan):
+    return plan['Pricing Tier'] == 'Standard'
+
+
+def _policy_name(policy_def_id):
+    return parse_arm_id(policy_def_id).name
+
+
+def _enabled_count(setting, key):
+    props = setting.get('properties', {})
+    if not isinstance(props, dict):
+        return 0
+    entries = props.get(key, [])
+    return sum(1 for entry in entries if entry.get('enabled', False)) if isinstance(entries, list) else 0
+
+
+def _diag_destination(setting):
+    props = setting.get('properties', {})
+    if not isinstance(props, dict):
+        props = {}
+    destination = []
+    if props.get('workspaceId', ''):
+        destination.append('Log Analytics')
+    if props.get('storageAccountId', ''):
+        destination.append('Storage')
+    if props.get('eventHubName', ''):
+        destination.append('Event Hub')
+    return ', '.join(destination) if destination else 'None'
+
+
+# ============================================================================
+# 11 - Security
+# ============================================================================
+
+SECURE_SCORES = Table(
+    'secure_scores', 'secure_scores.csv', '_secure_score.json', [
+        Column('Subscription ID', SUBSCRIPTION),
+        Column('Score Name', 'displayName'),
+        Column('Current Score', 'current', 0),
+        Column('Max Score', 'max', 0),
+        Column('Percentage', _percentage),
+        Column('Resource ID', 'id'),
+    ],
+    label='Secure Scores', unit='scores', single_object=True,
+    stats=[Numeric('Current Score'), Numeric('Max Score'), Numeric('Percentage')])
+
+SECURITY_ASSESSMENTS = Table(
+    'security_assessments', 'security_assessments.csv', '_security_assessments.json', [
+        Column('Subscription ID', SUBSCRIPTION),
+        Column('Assessment Name', 'displayName'),
+        Column('Status', ('status.code', 'properties.status.code')),
+        Column('Cause', ('status.cause', 'properties.status.cause')),
+        Column('Description', ('status.description', 'properties.status.description'), convert=truncate_500),
+        Column('Affected Resource', ('properties.resourceDetails.id', 'resourceDetails.id')),
+        Column('Assessment ID', 'id'),
+    ],
+    label='Security Assessments', unit='assessments', tolerant=True,
+    stats=[Tally('Status')])
+
+# ============================================================================
+# 12 - Inventory
+# ============================================================================
+
+RESOURCE_GROUPS = Table(
+    'resource_groups', 'resource_groups.csv', '_rgs.json', [
+        Column('Subscription ID', SUBSCRIPTION),
+        Column('Resource Group Name', 'name'),
+        Column('Location', 'location'),
+        Column('Provisioning State', 'properties.provisioningState'),
+        Column('Resource ID', 'id'),
+        Column('Tags', 'tags', convert=json_or_empty),
+    ],
+    label='Resource Groups', unit='resource groups',
+    stats=[Tally('Location')])
+
+RESOURCES = Table(
+    'resources', 'resources.csv', '_resources.json', [
+        Column('Subscription ID', SUBSCRIPTION),
+        Column('Resource Name', 'name'),
+        Column('Resource Type', 'type'),
+        Column('Resource Group', 'resourceGroup'),
+        Column('Location', 'location'),
+        Column('SKU', 'sku.name'),
+        Column('Kind', 'kind'),
+        Column('Provisioning State', 'provisioningState'),
+        Column('Resource ID', 'id'),
+        Column('Tags', 'tags', convert=json_or_empty),
+    ],
+    label='Resources', unit='resources',
+    stats=[Tally('Resource Type'), Tally('Location'), Tally('Subscription ID')])
+
+# ============================================================================
+# 13 - RBAC
+# ============================================================================
+
+ROLE_ASSIGNMENTS = Table(
+    'role_assignments', 'role_assignments.csv', '_role_assignments.json', [
+        Column('Subscription ID', SUBSCRIPTION),
+        Column('Principal Name', 'principalName'),
+        Column('Principal ID', 'principalId'),
+        Column('Principal Type', 'principalType'),
+        Column('Role Name', 'roleDefinitionName'),
+        Column('Scope Level', 'scope', convert=scope_level),
+        Column('Scope', 'scope'),
+        Column('Role Definition ID', 'roleDefinitionId'),
+        Column('Assignment ID', 'id'),
+    ],
+    label='Role Assignments', unit='role assignments',
+    stats=[Tally('Role Name'), Tally('Principal Type'), Tally('Scope Level'),
+           Distinct('Principal ID')])
+
+
+# ============================================================================
+# 13 - Identity (tenant-level; streamed by stream_tables)
+# ============================================================================
+
+SERVICE_PRINCIPALS = Table(
+    'service_principals', 'service_principals.csv', 'tenant_service_principals.json', [
+        Column('Display Name', 'displayName'),
+        Column('Object ID', ('id', 'objectId')),
+        Column('App ID', 'appId'),
+        Column('Service Principal Type', 'servicePrincipalType'),
+        Column('Account Enabled', 'accountEnabled', default=True, convert=yes_no),
+        Column('App Owner Tenant ID', 'appOwnerOrganizationId'),
+        Column('Password Credentials', 'passwordCredentials', convert=list_count),
+        Column('Key Credentials', 'keyCredentials', convert=list_count),
+        Column('Expired Credentials', _expired_credentials),
+        Column('Next Credential Expiry', _next_expiry),
+    ],
+    label='Service Principals', unit='service principals',
+    stats=[Tally('Service Principal Type'), Tally('Account Enabled')],
+    key=('Object ID',))
+
+APPLICATIONS = Table(
+    'applications', 'applications.csv', 'tenant_applications.json', [
+        Column('Display Name', 'displayName'),
+        Column('Object ID', ('id', 'objectId')),
+        Column('App ID', 'appId'),
+        Column('Sign In Audience', 'signInAudience'),
+        Column('Created', 'createdDateTime'),
+        Column('Password Credentials', 'passwordCredentials', convert=list_count),
+        Column('Key Credentials', 'keyCredentials', convert=list_count),
+        Column('Expired Credentials', _expired_credentials),
+        Column('Next Credential Expiry', _next_expiry),
+    ],
+    label='Applications', unit='applications',
+    stats=[Tally('Sign In Audience')],
+    key=('Object ID',))
+
+APP_CREDENTIALS = Table(
+    'app_credentials', 'app_credentials.csv', ('tenant_applications.json', 'tenant_service_principals.json'), [
+        Column('Owner Type', 'ownerType'),
+        Column('Owner Name', 'owner.displayName'),
+        Column('Owner Object ID', ('owner.id', 'owner.objectId')),
+        Column('App ID', 'owner.appId'),
+        Column('Credential Type', 'type'),
+        Column('Credential Name', 'credential.displayName'),
+        Column('Key ID', 'credential.keyId'),
+        Column('Start Date', ('credential.startDateTime', 'credential.startDate')),
+        Column('End Date', ('credential.endDateTime', 'credential.endDate')),
+        Column('Days To Expiry', 'end', convert=_days_to_expiry),
+        Column('Status', 'end', convert=_credential_status),
+    ],
+    label='App Credentials', unit='credentials', expand=_credentials,
+    stats=[Tally('Owner Type'), Tally('Credential Type'), Tally('Status')],
+    key=('Owner Type', 'Owner Object ID', 'Key ID'))
+
+# ============================================================================
+# 14 - Network
+# ============================================================================
+
+VIRTUAL_NETWORKS = Table(
+    'virtual_networks', 'virtual_networks.csv', '_vnets.json', [
+        Column('Subscription ID', SUBSCRIPTION),
+        Column('VNet Name', 'name'),
+        Column('Resource Group', 'resourceGroup'),
+        Column('Location', 'location'),
+        Column('Address Prefixes', 'addressSpace.addressPrefixes', [], convert=', '.join),
+        Column('Subnet Count', 'subnets', [], convert=list_count),
+        Column('Provisioning State', 'provisioningState'),
+        Column('Resource ID', 'id'),
+    ],
+    label='Virtual Networks', unit='VNets',
+    stats=[Tally('Location'), Numeric('Subnet Count')])
+
+VNET_PREFIXES = Table(
+    'vnet_prefixes', 'vnet_prefixes.csv', '_vnets.json', [
+        Column('Subscription ID', SUBSCRIPTION),
+        Column('VNet Name', 'vnet.name'),
+        Column('Resource Group', 'vnet.resourceGroup'),
+        Column('Location', 'vnet.location'),
+        Column('Level', 'level'),
+        Column('Subnet Name', 'subnet'),
+        Column('Address Prefix', 'prefix'),
+        Column('VNet ID', 'vnet.id'),
+    ],
+    label='VNet Address Prefixes', unit='prefixes',
+    stats=[Tally('Level')],
+    expand=_vnet_prefixes,
+    key=('Subscription ID', 'VNet ID', 'Level', 'Subnet Name', 'Address Prefix'))
+
+NETWORK_SECURITY_GROUPS = Table(
+    'network_security_groups', 'network_security_groups.csv', '_nsgs.json', [
+        Column('Subscription ID', SUBSCRIPTION),
+        Column('NSG Name', 'name'),
+        Column('Resource Group', 'resourceGroup'),
+        Column('Location', 'location'),
+        Column('Custom Rules', 'securityRules', [], convert=list_count),
+        Column('Default Rules', 'defaultSecurityRules', [], convert=list_count),
+        Column('Total Rules', _nsg_total_rules),
+        Column('Provisioning State', 'provisioningState'),
+        Column('Resource ID', 'id'),
+    ],
+    label='Network Security Groups', unit='NSGs',
+    stats=[Numeric('Custom Rules'), Numeric('Total Rules')])
+
+NSG_RULES = Table(
+    'nsg_rules', 'nsg_rules.csv', '_nsgs.json', [
+        Column('Subscription ID', SUBSCRIPTION),
+        Column('NSG Name', 'nsg.name'),
+        Column('Resource Group', 'nsg.resourceGroup'),
+        Column('Location', 'nsg.location'),
+        Column('Rule Name', 'rule.name'),
+        Column('Rule Type', 'type'),
+        Column('Priority', 'rule.priority'),
+        Column('Direction', 'rule.direction'),
+        Column('Access', 'rule.access'),
+        Column('Protocol', 'rule.protocol'),
+        Column('Source Prefixes', 'sources'),
+        Column('Source Ports', 'source_ports'),
+        Column('Destination Prefixes', 'destinations'),
+        Column('Destination Ports', 'destination_ports'),
+        Column('Internet Source', 'internet', False, convert=yes_no),
+        Column('NSG ID', 'nsg.id'),
+    ],
+    label='NSG Rules', unit='rules',
+    stats=[Tally('Direction'), Tally('Access'), Tally('Internet Source')],
+    expand=_nsg_rules,
+    key=('Subscription ID', 'NSG ID', 'Rule Type', 'Rule Name'))
+
+AZURE_FIREWALLS = Table(
+    'azure_firewalls', 'azure_firewalls.csv', '_az_firewalls.json', [
+        Column('Subscription ID', SUBSCRIPTION),
+        Column('Firewall Name', 'name'),
+        Column('Resource Group', 'resourceGroup'),
+        Column('Location', 'location'),
+        Column('SKU Name', 'sku.name'),
+        Column('SKU Tier', 'sku.tier'),
+        Column('Provisioning State', 'provisioningState'),
+        Column('Resource ID', 'id'),
+    ],
+    label='Azure Firewalls', unit='Firewalls',
+    stats=[Tally('SKU Tier')])
+
+PRIVATE_ENDPOINTS = Table(
+    'private_endpoints', 'private_endpoints.csv', '_private_endpoints.json', [
+        Column('Subscription ID', SUBSCRIPTION),
+        Column('Private Endpoint Name', 'name'),
+        Column('Resource Group', 'resourceGroup'),
+        Column('Location', 'location'),
+        Column('Connection Count', 'privateLinkServiceConnections', [], convert=list_count),
+        Column('Provisioning State', 'provisioningState'),
+        Column('Resource ID', 'id'),
+    ],
+    label='Private Endpoints', unit='Private Endpoints',
+    stats=[Tally('Location')])
+
+# ============================================================================
+# 15 - Data Protection
+# ============================================================================
+
+STORAGE_ACCOUNTS = Table(
+    'storage_accounts', 'storage_accounts.csv', '_storage.json', [
+        Column('Subscription ID', SUBSCRIPTION),
+        Column('Storage Account Name', 'name'),
+        Column('Resource Group', 'resourceGroup'),
+        Column('Location', 'location'),
+        Column('SKU Name', 'sku.name'),
+        Column('SKU Tier', 'sku.tier'),
+        Column('Access Tier', 'accessTier'),
+        Column('HTTPS Only', 'enableHttpsTrafficOnly', False, convert=yes_no),
+        Column('Allow Public Blob Access', 'allowBlobPublicAccess', None,
+               convert=lambda v: str(v) if v is not None else 'Unknown'),
+        Column('Encryption Key Source', 'encryption.keySource'),
+        Column('Provisioning State', 'provisioningState'),
+        Column('Resource ID', 'id'),
+    ],
+    label='Storage Accounts', unit='storage accounts',
+    stats=[Tally('SKU Name'), Tally('HTTPS Only'), Tally('Allow Public Blob Access')])
+
+KEY_VAULTS = Table(
+    'key_vaults', 'key_vaults.csv', '_keyvaults.json', [
+        Column('Subscription ID', SUBSCRIPTION),
+        Column('Key Vault Name', 'name'),
+        Column('Resource Group', 'resourceGroup'),
+        Column('Location', 'location'),
+        Column('SKU', 'sku.name'),
+        Column('Soft Delete', 'properties.enableSoftDelete', False, convert=yes_no),
+        Column('Purge Protection', 'properties.enablePurgeProtection', False, convert=yes_no),
+        Column('Public Network Access', 'properties.publicNetworkAccess', 'Unknown'),
+        Column('Enabled For Deployment', 'properties.enabledForDeployment', False, convert=yes_no),
+        Column('Enabled For Disk Encryption', 'properties.enabledForDiskEncryption', False, convert=yes_no),
+        Column('Enabled For Template', 'properties.enabledForTemplateDeployment', False, convert=yes_no),
+        Column('Resource ID', 'id'),
+    ],
+    label='Key Vaults', unit='Key Vaults',
+    stats=[Tally('Soft Delete'), Tally('Purge Protection'), Tally('Public Network Access')])
+
+SQL_SERVERS = Table(
+    'sql_servers', 'sql_servers.csv', '_sql_servers.json', [
+        Column('Subscription ID', SUBSCRIPTION),
+        Column('SQL Server Name', 'name'),
+        Column('Resource Group', 'resourceGroup'),
+        Column('Location', 'location'),
+        Column('Version', 'version'),
+        Column('Admin Login', 'administratorLogin'),
+        Column('Public Network Access', 'publicNetworkAccess', 'Unknown'),
+        Column('Minimal TLS Version', 'minimalTlsVersion'),
+        Column('State', 'state'),
+        Column('Resource ID', 'id'),
+    ],
+    label='SQL Servers', unit='SQL servers',
+    stats=[Tally('Version'), Tally('Public Network Access'), Tally('Minimal TLS Version')])
+
+SQL_DATABASES = Table(
+    'sql_databases', 'sql_databases.csv', '_sql_dbs.json', [
+        Column('Subscription ID', SUBSCRIPTION),
+        Column('Database Name', 'name'),
+        Column('Resource Group', 'resourceGroup'),
+        Column('Location', 'location'),
+        Column('SKU Name', 'sku.name'),
+        Column('SKU Tier', 'sku.tier'),
+        Column('Max Size (GB)', _max_size_gb),
+        Column('Status', 'status'),
+        Column('Collation', 'collation'),
+        Column('Resource ID', 'id'),
+    ],
+    label='SQL Databases', unit='databases',
+    stats=[Tally('SKU Tier'), Numeric('Max Size (GB)')])
+
+# ============================================================================
+# 16 - Logging
+# ============================================================================
+
+LOG_ANALYTICS_WORKSPACES = Table(
+    'log_analytics_workspaces', 'log_analytics_workspaces.csv', '_la_workspaces.json', [
+        Column('Subscription ID', SUBSCRIPTION),
+        Column('Workspace Name', 'name'),
+        Column('Resource Group', 'resourceGroup'),
+        Column('Location', 'location'),
+        Column('SKU', 'properties.sku.name'),
+        Column('Retention Days', 'properties.retentionInDays', 0),
+        Column('Public Network Access', 'properties.publicNetworkAccessForIngestion', 'Unknown'),
+        Column('Provisioning State', 'properties.provisioningState'),
+        Column('Resource ID', 'id'),
+    ],
+    label='Log Analytics Workspaces', unit='workspaces',
+    stats=[Tally('SKU'), Tally('Location'),
+           Numeric('Retention Days', where=lambda w: _is_positive(w['Retention Days']))])
+
+DIAGNOSTIC_SETTINGS = Table(
+    'diagnostic_settings', 'diagnostic_settings.csv', '_subscription_diag.json', [
+        Column('Subscription ID', SUBSCRIPTION),
+        Column('Setting Name', 'name'),
+        Column('Destination', _diag_destination),
+        Column('Enabled Logs', lambda s: _enabled_count(s, 'logs')),
+        Column('Enabled Metrics', lambda s: _enabled_count(s, 'metrics')),
+        Column('Workspace ID', 'properties.workspaceId'),
+        Column('Storage Account ID', 'properties.storageAccountId'),
+        Column('Event Hub Name', 'properties.eventHubName'),
+        Column('Resource ID', 'id'),
+    ],
+    label='Diagnostic Settings', unit='settings',
+    stats=[Tally('Destination'), Distinct('Subscription ID')])
+
+# ============================================================================
+# 17 - Policies
+# ============================================================================
+
+POLICY_ASSIGNMENTS = Table(
+    'policy_assignments', 'policy_assignments.csv', '_policy_assignments.json', [
+        Column('Subscription ID', SUBSCRIPTION),
+        Column('Assignment Name', 'name'),
+        Column('Display Name', 'properties.displayName'),
+        Column('Policy Name', 'properties.policyDefinitionId', convert=_policy_name),
+        Column('Enforcement Mode', 'properties.enforcementMode', 'Default'),
+        Column('Scope Level', 'properties.scope', convert=scope_level),
+        Column('Scope', 'properties.scope'),
+        Column('Description', 'properties.description', convert=truncate_500),
+        Column('Policy Definition ID', 'properties.policyDefinitionId'),
+        Column('Resource ID', 'id'),
+    ],
+    label='Policy Assignments', unit='assignments',
+    stats=[Tally('Enforcement Mode'), Tally('Scope Level'),
+           Tally('Display Name', where=lambda p: p['Display Name'])])
+
+DEFENDER_PRICING = Table(
+    'defender_pricing', 'defender_pricing.csv', '_defender_pricing.json', [
+        Column('Subscription ID', SUBSCRIPTION),
+        Column('Resource Type', 'name'),
+        Column('Pricing Tier', 'properties.pricingTier', 'Free'),
+        Column('Resource ID', 'id'),
+    ],
+    label='Defender for Cloud Pricing', unit='pricing plans',
+    stats=[Tally('Pricing Tier'), Distinct('Subscription ID'),
+           Tally('Resource Type', name='Standard Resource Types', where=_is_standard),
+           Distinct('Subscription ID', name='Standard Subscriptions', where=_is_standard)])
+
+
+TABLES = {t.name: t for t in (
+    SECURE_SCORES, SECURITY_ASSESSMENTS,
+    RESOURCE_GROUPS, RESOURCES,
+    ROLE_ASSIGNMENTS, SERVICE_PRINCIPALS, APPLICATIONS, APP_CREDENTIALS,
+    VIRTUAL_NETWORKS, VNET_PREFIXES, NETWORK_SECURITY_GROUPS, NSG_RULES, AZURE_FIREWALLS, PRIVATE_ENDPOINTS,
+    STORAGE_ACCOUNTS, KEY_VAULTS, SQL_SERVERS, SQL_DATABASES,
+    LOG_ANALYTICS_WORKSPACES, DIAGNOSTIC_SETTINGS,
+    POLICY_ASSIGNMENTS, DEFENDER_PRICING,
+)}
+
+
+def get_tables(names):
+    """Resolve table names (or Table objects) against the catalog."""
+    return [TABLES[n] if isinstance(n, str) else n for n in names]
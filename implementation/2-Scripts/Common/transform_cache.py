@@ -0,0 +1,162 @@
+"""
+Incremental Transform Cache
+Remembers the rows extracted from each input file, keyed by a content hash,
+so re-runs only parse evidence files that actually changed
+
+Layout under transformed/.cache/:
+  manifest_<suffix>.json   one manifest per input suffix (so scripts never
+                           share a file): name -> hash, size, mtime, counts
+  shards/<file name>.json  extracted rows for that file, per table, stored as
+                           value lists in header order
+"""
+
+import hashlib
+import json
+import os
+
+# Bump to invalidate every cache entry after an engine change
+CACHE_VERSION = 1
+
+HASH_CHUNK = 1024 * 1024
+
+
+def file_digest(path):
+    """Content hash of an input file (BLAKE2b, read in 1 MB chunks)."""
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _code_signature(code):
+    consts = ','.join(_code_signature(c) if hasattr(c, 'co_code') else repr(c) for c in code.co_consts)
+    return f"{code.co_code.hex()}[{consts}]{','.join(code.co_names)}"
+
+
+def _describe(value):
+    """Stable description of a column source/convert for fingerprinting."""
+    code = getattr(value, '__code__', None)
+    if code is not None:
+        return f"{getattr(value, '__qualname__', '')}:{_code_signature(code)}"
+    if callable(value):
+        return getattr(value, '__qualname__', type(value).__name__)
+    return repr(value) if isinstance(value, (str, tuple, int, float, bool, type(None), list)) else type(value).__name__
+
+
+def table_fingerprint(table):
+    """Hash of a table spec; a changed column list or accessor invalidates shards."""
+    digest = hashlib.blake2b(digest_size=12)
+    digest.update(f"{CACHE_VERSION}|{table.name}|{table.single_object}|{table.tolerant}"
+                  f"|{_describe(table.expand)}".encode())
+    for col in table.columns:
+        digest.update(f"|{col.header}|{_describe(col.source)}|{col.default!r}|{_describe(col.convert)}".encode())
+    return digest.hexdigest()
+
+
+class TransformCache:
+    """Manifest + row shards for the input files of one suffix group."""
+
+    def __init__(self, cache_dir, suffix, tables):
+        self.cache_dir = cache_dir
+        self.shard_dir = cache_dir / 'shards'
+        self.tables = tables
+        self.fingerprint = '+'.join(table_fingerprint(t) for t in tables)
+        self.manifest_path = cache_dir / f"manifest{os.path.splitext(suffix)[0]}.json"
+        self.entries = {}
+        self.seen = set()
+        self.hits = 0
+        self.misses = 0
+        if self.manifest_path.exists():
+            try:
+                with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                    manifest = json.load(f)
+                if manifest.get('fingerprint') == self.fingerprint:
+                    self.entries = manifest.get('files', {})
+            except (OSError, ValueError):
+                self.entries = {}
+
+    def lookup(self, path):
+        """
+        Return (FileResult or None, stat info) for an input file.
+
+        Unchanged size and mtime is trusted outright; otherwise the content hash
+        decides, so a re-collected but byte-identical file is still a hit.
+        """
+        from Common.transform_engine import FileResult
+
+        self.seen.add(path.name)
+        stat = path.stat()
+        info = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'hash': None}
+        entry = self.entries.get(path.name)
+        if entry is not None:
+            if entry['size'] != info['size'] or entry['mtime_ns'] != info['mtime_ns']:
+                info['hash'] = file_digest(path)
+                if info['hash'] != entry['hash']:
+                    entry = None
+            else:
+                info['hash'] = entry['hash']
+        if entry is None:
+            self.misses += 1
+            return None, info
+
+        try:
+            with open(self.shard_dir / f"{path.name}.json", 'r', encoding='utf-8') as f:
+                shard = json.load(f)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None, info
+        if shard.get('hash') != info['hash']:
+            self.misses += 1
+            return None, info
+
+        result = FileResult(path.name, shard['sub_id'])
+        result.count = shard['count']
+        result.shape = shard['shape']
+        result.duplicates = shard['duplicates']
+        for table in self.tables:
+            make = table.record.make
+            result.rows[table.name] = [make(values) for values in shard['rows'][table.name]]
+        result.cached = True
+        # Refresh size/mtime so the next run can skip hashing this file
+        self.entries[path.name] = dict(entry, size=info['size'], mtime_ns=info['mtime_ns'])
+        self.hits += 1
+        return result, info
+
+    def store(self, path, info, file_result):
+        """Record a freshly parsed file (failed parses are never cached)."""
+        if file_result.error:
+            self.entries.pop(path.name, None)
+            return
+        if info['hash'] is None:
+            info['hash'] = file_digest(path)
+        self.shard_dir.mkdir(parents=True, exist_ok=True)
+        shard = {
+            'hash': info['hash'],
+            'sub_id': file_result.sub_id,
+            'count': file_result.count,
+            'shape': file_result.shape,
+            'duplicates': file_result.duplicates,
+            'rows': {
+                table.name: file_result.rows.get(table.name, [])
+                for table in self.tables
+            },
+        }
+        with open(self.shard_dir / f"{path.name}.json", 'w', encoding='utf-8') as f:
+            json.dump(shard, f, separators=(',', ':'))
+        self.entries[path.name] = info
+
+    def save(self):
+        """Write the manifest, dropping entries (and shards) for vanished files."""
+        for name in list(self.entries):
+            if name not in self.seen:
+                del self.entries[name]
+                try:
+                    os.remove(self.shard_dir / f"{name}.json")
+                except OSError:
+                    pass
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.manifest_path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'fingerprint': self.fingerprint, 'files': self.entries}, f, indent=1)
+        os.replace(tmp_path, self.manifest_path)
@@ -0,0 +1,654 @@
+"""
+Declarative Transform Engine
+Runs the column specs in Common/tables.py over the per-subscription JSON files
+in out/ and writes one CSV per table for Excel import
+
+Every table is a list of Column specs. The specs are compiled once into a
+single extractor function per table, the out/ directory is listed once, and
+each input file is parsed once no matter how many tables read from it.
+"""
+
+import argparse
+import csv
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from Common.evidence_files import find_evidence, list_evidence, logical_name
+from Common.json_backend import EvidenceReader
+from Common.json_stream import DuplicateKeyCounter, tolerant_decoder
+from Common.records import CATEGORICAL_HEADERS, intern_value, record_type
+from Common import table_store
+from Common.stats import TableStats, write_stats
+from Common.warehouse import WAREHOUSE_NAME, TableLoader, connect, load_table
+
+# Column source that resolves to the subscription ID taken from the filename
+SUBSCRIPTION = object()
+
+
+class Column:
+    """
+    One output column.
+
+    source:
+      - dotted path string, e.g. 'sku.name' (each parent must be a dict)
+      - tuple of dotted paths; the first one that is present wins
+      - callable taking the JSON item
+      - SUBSCRIPTION for the subscription ID of the input file
+    default: value used when the path is missing
+    convert: optional callable applied to the extracted (or default) value
+    """
+
+    __slots__ = ('header', 'source', 'default', 'convert')
+
+    def __init__(self, header, source, default='', convert=None):
+        self.header = header
+        self.source = source
+        self.default = default
+        self.convert = convert
+
+
+class Table:
+    """
+    Output table spec.
+
+    name:          catalog key, e.g. 'resources'
+    csv_name:      output file under transformed/
+    suffix:        input filename suffix, e.g. '_resources.json'; tenant-level
+                   tables read by stream_tables() name whole files instead, and
+                   may give a tuple of them
+    columns:       list of Column
+    label / unit:  wording for progress output ("Processing <label>...", "12 <unit>")
+    single_object: also accept a bare top-level object as one item
+    tolerant:      parse with the duplicate-key tolerant decoder (also accepts
+                   raw control characters and concatenated documents)
+    stats:         Common.stats accumulators fed every row as it is produced
+    expand:        optional callable turning each JSON item into zero or more
+                   sub-items (e.g. the rules of an NSG); the columns then read
+                   the sub-items and each one becomes a row
+    key:           columns identifying a row from one run to the next (snapshot
+                   diff); by default Subscription ID plus the table's Resource,
+                   Assignment or Assessment ID column
+    """
+
+    def __init__(self, name, csv_name, suffix, columns, label, unit,
+                 single_object=False, tolerant=False, stats=(), expand=None, key=()):
+        self.name = name
+        self.csv_name = csv_name
+        self.suffix = suffix
+        self.columns = columns
+        self.label = label
+        self.unit = unit
+        self.single_object = single_object
+        self.tolerant = tolerant
+        self.stats = stats
+        self.expand = expand
+        self.key = tuple(key)
+        self._extract = None
+
+    @property
+    def headers(self):
+        return [c.header for c in self.columns]
+
+    @property
+    def record(self):
+        """Compact record class for this table's rows (Common.records)."""
+        return record_type(self.headers)
+
+    @property
+    def extract(self):
+        """Compiled extractor: extract(item, sub_id) -> row record."""
+        if self._extract is None:
+            self._extract = compile_extractor(self.columns, self.record)
+        return self._extract
+
+
+class TableResult:
+    """Rows, file counters and streaming stats produced for one table."""
+
+    def __init__(self, table):
+        self.table = table
+        self.rows = []
+        self.stats = TableStats(table.stats)
+        self.files = 0
+        self.parsed = 0
+        self.skipped = 0
+        self.failed = 0
+        self.duplicates = 0
+        self.csv_path = None
+
+
+# ============================================================================
+# Accessor compilation
+# ============================================================================
+
+_MISSING = object()
+
+
+def compile_path(path):
+    """Return getter(item) for a dotted path, yielding _MISSING when absent."""
+    keys = path.split('.')
+    if len(keys) == 1:
+        key = keys[0]
+        return lambda item: item.get(key, _MISSING)
+    if len(keys) == 2:
+        outer, key = keys
+
+        def get2(item):
+            parent = item.get(outer)
+            return parent.get(key, _MISSING) if isinstance(parent, dict) else _MISSING
+        return get2
+
+    def get_n(item):
+        value = item
+        for key in keys:
+            if not isinstance(value, dict):
+                return _MISSING
+            value = value.get(key, _MISSING)
+            if value is _MISSING:
+                return _MISSING
+        return value
+    return get_n
+
+
+def _compile_alternatives(paths, default):
+    getters = [compile_path(p) for p in paths]
+
+    def get_first(item):
+        for getter in getters:
+            value = getter(item)
+            if value is not _MISSING:
+                return value
+        return default
+    return get_first
+
+
+def compile_extractor(columns, record=None):
+    """
+    Build extract(item, sub_id) returning the row for the given columns.
+
+    Plain top-level keys are inlined as item.get(key, default) and everything
+    else is bound as a local helper, so a row costs one function call and one
+    tuple display with no per-column interpretation. Categorical columns are
+    interned. Rows are instances of record (a Common.records type), or plain
+    dicts when no record type is given.
+    """
+    namespace = {'_intern': intern_value, '_new': tuple.__new__, '_record': record}
+    parts = []
+    for i, col in enumerate(columns):
+        source = col.source
+        if source is SUBSCRIPTION:
+            expr = 'sub_id'
+        elif callable(source):
+            namespace[f'_f{i}'] = source
+            expr = f'_f{i}(item)'
+        elif isinstance(source, str) and '.' not in source:
+            namespace[f'_d{i}'] = col.default
+            expr = f'item.get({source!r}, _d{i})'
+        else:
+            paths = (source,) if isinstance(source, str) else tuple(source)
+            namespace[f'_f{i}'] = _compile_alternatives(paths, col.default)
+            expr = f'_f{i}(item)'
+        if col.convert is not None:
+            namespace[f'_c{i}'] = col.convert
+            expr = f'_c{i}({expr})'
+        if col.header in CATEGORICAL_HEADERS:
+            expr = f'_intern({expr})'
+        parts.append(expr if record is not None else f'{col.header!r}: {expr}')
+
+    if record is not None:
+        body = '_new(_record, (' + ', '.join(parts) + ',))'
+    else:
+        body = '{' + ', '.join(parts) + '}'
+    source_code = 'def extract(item, sub_id):\n    return ' + body + '\n'
+    exec(compile(source_code, '<table extractor>', 'exec'), namespace)
+    return namespace['extract']
+
+
+# ============================================================================
+# File processing
+# ============================================================================
+
+class FileResult:
+    """Outcome of parsing one input file for every table reading it."""
+
+    def __init__(self, name, sub_id):
+        self.name = name
+        self.sub_id = sub_id
+        self.rows = {}
+        self.count = 0
+        self.shape = None
+        self.duplicates = 0
+        self.cached = False
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.error = None
+        self.error_kind = None
+
+
+def process_file(path, sub_id, tables):
+    """Parse one input file once and extract rows for all tables sharing it."""
+    result = FileResult(path.name, sub_id)
+    wall, cpu = time.perf_counter(), time.process_time()
+    extractors = [(t, t.extract, t.expand, []) for t in tables]
+    single_object = any(t.single_object for t in tables)
+    tolerant = any(t.tolerant for t in tables)
+    counter = DuplicateKeyCounter() if tolerant else None
+    try:
+        with EvidenceReader(path, yield_object=single_object,
+                            decoder=tolerant_decoder(counter) if tolerant else None,
+                            multi_document=tolerant) as stream:
+            for item in stream:
+                for _, extract, expand, rows in extractors:
+                    if expand is None:
+                        rows.append(extract(item, sub_id))
+                    else:
+                        rows.extend([extract(sub_item, sub_id) for sub_item in expand(item)])
+        result.count = stream.count
+        result.shape = stream.shape
+        result.duplicates = counter.count if counter else 0
+        for table, _, _, rows in extractors:
+            if stream.shape == 'object' and not table.single_object:
+                rows = []
+            result.rows[table.name] = rows
+    except json.JSONDecodeError as e:
+        result.error, result.error_kind = str(e), 'WARN'
+        result.rows = {}
+    except Exception as e:
+        result.error, result.error_kind = str(e), 'ERROR'
+        result.rows = {}
+    result.wall = time.perf_counter() - wall
+    result.cpu = time.process_time() - cpu
+    return result
+
+
+def discover(out_dir, tables):
+    """
+    List out_dir once and map each table suffix to its input files, sorted by
+    name. Suffixes match compressed files too (see Common/evidence_files.py).
+    """
+    suffixes = sorted({t.suffix for t in tables}, key=len, reverse=True)
+    found = {s: [] for s in suffixes}
+    for name, path in list_evidence(out_dir):
+        for suffix in suffixes:
+            if name.endswith(suffix):
+                found[suffix].append(path)
+                break
+    return found
+
+
+def write_csv(result, transform_dir):
+    """Write a table's rows to its CSV under transformed/."""
+    table = result.table
+    csv_path = transform_dir / table.csv_name
+    with open(csv_path, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f)
+        writer.writerow(table.headers)
+        # Records iterate their values in header order
+        writer.writerows(result.rows)
+    result.csv_path = csv_path
+    return csv_path
+
+
+def _process_job(job):
+    """Process-pool entry point; tables travel by name so the specs never need pickling."""
+    from Common.tables import get_tables
+    path, sub_id, names = job
+    return process_file(Path(path), sub_id, get_tables(names))
+
+
+def iter_file_results(jobs, workers=1, caches=None):
+    """
+    Yield a FileResult for each (path, sub_id, tables) job, in job order.
+
+    With workers > 1 the jobs are fanned out to a process pool; results are
+    still consumed in submission order so output is deterministic. When
+    caches ({suffix: TransformCache}) are given, unchanged files are served
+    from their cached shard and only the rest are parsed.
+    """
+    cached = {}
+    pending = []
+    for index, (path, sub_id, group) in enumerate(jobs):
+        if caches is not None:
+            cache = caches[group[0].suffix]
+            start = time.perf_counter()
+            hit, info = cache.lookup(path)
+            if hit is not None:
+                hit.wall = time.perf_counter() - start
+                cached[index] = hit
+                continue
+            pending.append((index, path, sub_id, group, cache, info))
+        else:
+            pending.append((index, path, sub_id, group, None, None))
+
+    if workers <= 1 or len(pending) <= 1:
+        parsed = (process_file(path, sub_id, group) for _, path, sub_id, group, _, _ in pending)
+        pool = None
+    else:
+        payload = [(str(path), sub_id, [t.name for t in group]) for _, path, sub_id, group, _, _ in pending]
+        pool = ProcessPoolExecutor(max_workers=min(workers, len(pending)))
+        parsed = pool.map(_process_job, payload)
+
+    try:
+        next_pending = iter(zip(pending, parsed))
+        for index in range(len(jobs)):
+            if index in cached:
+                yield cached.pop(index)
+                continue
+            (_, path, _, _, cache, info), file_result = next(next_pending)
+            if cache is not None:
+                cache.store(path, info, file_result)
+            yield file_result
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+
+def resolve_workers(workers):
+    """Map the --workers option to a process count (0 means one per CPU core)."""
+    if not workers:
+        return os.cpu_count() or 1
+    return max(1, workers)
+
+
+def parse_transform_args(description=None):
+    """Command-line options shared by the transformation scripts."""
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Parse input files in N worker processes (0 = one per CPU core, default 1)')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Reuse rows cached in transformed/.cache for input files whose content is unchanged')
+    parser.add_argument('--no-warehouse', dest='warehouse', action='store_false',
+                        help='Only write CSVs; skip loading tables into transformed/evidence.db')
+    parser.add_argument('--profile', type=int, default=0, metavar='N',
+                        help='Re-run the N slowest input files under cProfile/tracemalloc and add the '
+                             'results to the run report (profiles go in transformed/profiles)')
+    return parser.parse_args()
+
+
+def run_tables(tables, out_dir, transform_dir, workers=1, incremental=False, warehouse=True,
+               report=None, profile=0):
+    """
+    Extract the given tables from out_dir and write their CSVs.
+
+    Files are grouped by suffix so that tables reading the same evidence file
+    share a single parse, and processed in sorted filename (subscription)
+    order. With workers > 1 parsing and row extraction run in a process pool
+    and results are merged back in that same order. With incremental set,
+    files whose content hash matches the cache manifest are not re-parsed;
+    their cached row shards are spliced back in instead. With warehouse set,
+    each written table is also loaded into the SQLite evidence warehouse.
+    Per-file and per-table timings go into report (a Common.instrument
+    RunReport) when given; profile > 0 then re-parses that many of the
+    slowest files under the profilers. Returns {table name: TableResult} in input order.
+    """
+    from Common.tables import get_tables
+    tables = get_tables(tables)
+    results = {t.name: TableResult(t) for t in tables}
+    files_by_suffix = discover(out_dir, tables)
+
+    groups = {}
+    for table in tables:
+        groups.setdefault(table.suffix, []).append(table)
+
+    jobs = [(path, logical_name(path.name)[:-len(suffix)], group)
+            for suffix, group in groups.items() for path in files_by_suffix[suffix]]
+    caches = None
+    if incremental:
+        from Common.transform_cache import TransformCache
+        cache_dir = transform_dir / '.cache'
+        caches = {suffix: TransformCache(cache_dir, suffix, group) for suffix, group in groups.items()}
+    file_results = iter_file_results(jobs, resolve_workers(workers), caches)
+
+    first = True
+    for suffix, group in groups.items():
+        if not first:
+            print()
+        first = False
+        print(f"Processing {' & '.join(t.label for t in group)}...")
+        files = files_by_suffix[suffix]
+        print(f"  Found {len(files)} *{suffix} files")
+
+        for path in files:
+            file_result = next(file_results)
+            for table in group:
+                results[table.name].files += 1
+            if report is not None:
+                _report_file(report, path, group, file_result)
+
+            if file_result.error:
+                for table in group:
+                    results[table.name].failed += 1
+                if file_result.error_kind == 'WARN':
+                    print(f"  [WARN] Could not parse {path.name}: {file_result.error}")
+                else:
+                    print(f"  [ERROR] Failed to process {path.name}: {file_result.error}")
+                continue
+
+            if not file_result.count:
+                for table in group:
+                    results[table.name].skipped += 1
+                print(f"  [SKIP] {path.name} - empty")
+                continue
+
+            for table in group:
+                result = results[table.name]
+                result.parsed += 1
+                result.duplicates += file_result.duplicates
+                rows = file_result.rows.get(table.name, ())
+                add = result.stats.add
+                for row in rows:
+                    add(row)
+                result.rows.extend(rows)
+            note = f" ({file_result.duplicates} duplicate keys resolved)" if file_result.duplicates else ''
+            status = 'CACHED' if file_result.cached else 'OK'
+            print(f"  [{status}] {path.name} - {file_result.count} {group[0].unit}{note}")
+
+        for table in group:
+            result = results[table.name]
+            if result.rows:
+                start = time.perf_counter()
+                write_csv(result, transform_dir)
+                write_stats(result, transform_dir)
+                written = time.perf_counter()
+                table_store.publish(table.name, result.rows)
+                print(f"  ✓ Created {table.csv_name} ({len(result.rows)} {table.unit})")
+                if warehouse:
+                    load_table(transform_dir, table, result.rows, result.csv_path)
+                    print(f"  ✓ Loaded {table.name} into {WAREHOUSE_NAME}")
+                if report is not None:
+                    metrics = report.table(table.name)
+                    metrics['write_seconds'] = round(written - start, 4)
+                    metrics['load_seconds'] = round(time.perf_counter() - written, 4)
+                    report.add_output(result.csv_path, len(result.rows))
+            else:
+                print(f"  ⚠ No {table.label.lower()} found")
+
+        if caches is not None:
+            cache = caches[suffix]
+            cache.save()
+            print(f"  Cache: {cache.hits} unchanged, {cache.misses} parsed")
+
+    if report is not None:
+        for result in results.values():
+            report.table(result.table.name)['rows'] = len(result.rows)
+        if profile:
+            _profile_slowest(report, jobs, profile)
+
+    return results
+
+
+def stream_tables(tables, out_dir, transform_dir, warehouse=True, report=None, observers=None):
+    """
+    Extract tenant-level tables from whole files in out_dir without holding their rows.
+
+    For inputs too large to keep in memory (tenant_service_principals.json
+    can hold hundreds of thousands of objects): each row goes straight to its
+    CSV, its stats accumulators and, with warehouse set, a batched warehouse
+    load as soon as it is extracted, so memory stays at one JSON item plus
+    one insert batch. Each table's suffix names its input file(s); a file
+    read by several tables is parsed once. observers ({table name:
+    callable(row)}) see every row, e.g. to pick out the few worth keeping.
+
+    Returns {table name: TableResult} like run_tables(), with empty .rows.
+    """
+    from Common.tables import get_tables
+    tables = get_tables(tables)
+    observers = observers or {}
+    results = {t.name: TableResult(t) for t in tables}
+    files = {}
+    for table in tables:
+        names = table.suffix if isinstance(table.suffix, tuple) else (table.suffix,)
+        for name in names:
+            files.setdefault(name, []).append(table)
+
+    # All tables load inside one warehouse transaction, committed at the end
+    conn = connect(transform_dir) if warehouse else None
+    if conn is not None:
+        conn.execute("BEGIN")
+    outputs = {}
+    try:
+        for table in tables:
+            csv_path = transform_dir / table.csv_name
+            f = open(csv_path, 'w', newline='', encoding='utf-8-sig')
+            writer = csv.writer(f)
+            writer.writerow(table.headers)
+            loader = TableLoader(transform_dir, table, conn) if conn is not None else None
+            outputs[table.name] = (f, writer, loader)
+            results[table.name].csv_path = csv_path
+
+        first = True
+        for name, group in files.items():
+            if not first:
+                print()
+            first = False
+            print(f"Processing {' & '.join(t.label for t in group)}...")
+            path = find_evidence(out_dir, name)
+            if path is None:
+                print(f"  ⚠ {name} not found")
+                continue
+            for table in group:
+                results[table.name].files += 1
+            sinks = []
+            for table in group:
+                result = results[table.name]
+                _, writer, loader = outputs[table.name]
+                sinks.append((table.extract, table.expand, result.stats.add, writer.writerow,
+                              loader.add if loader else None, observers.get(table.name)))
+            file_result = FileResult(path.name, '')
+            counts = {table.name: results[table.name].stats.rows for table in group}
+            wall, cpu = time.perf_counter(), time.process_time()
+            try:
+                with EvidenceReader(path, yield_object=any(t.single_object for t in group)) as stream:
+                    for item in stream:
+                        for extract, expand, add, write, load, observe in sinks:
+                            rows = (extract(item, ''),) if expand is None else \
+                                [extract(sub_item, '') for sub_item in expand(item)]
+                            for row in rows:
+                                add(row)
+                                write(row)
+                                if load is not None:
+                                    load(row)
+                                if observe is not None:
+                                    observe(row)
+                file_result.count = stream.count
+            except json.JSONDecodeError as e:
+                file_result.error, file_result.error_kind = str(e), 'WARN'
+            except Exception as e:
+                file_result.error, file_result.error_kind = str(e), 'ERROR'
+            file_result.wall = time.perf_counter() - wall
+            file_result.cpu = time.process_time() - cpu
+            if report is not None:
+                rows = {t.name: results[t.name].stats.rows - counts[t.name] for t in group}
+                _report_file(report, path, group, file_result, rows)
+
+            # Rows streamed before a parse error are already written and are kept
+            key = 'failed' if file_result.error else ('parsed' if file_result.count else 'skipped')
+            for table in group:
+                setattr(results[table.name], key, getattr(results[table.name], key) + 1)
+            if file_result.error_kind == 'WARN':
+                print(f"  [WARN] Could not parse {path.name}: {file_result.error}")
+            elif file_result.error:
+                print(f"  [ERROR] Failed to process {path.name}: {file_result.error}")
+            elif not file_result.count:
+                print(f"  [SKIP] {path.name} - empty")
+            else:
+                print(f"  [OK] {path.name} - {file_result.count} {group[0].unit}")
+
+        for f, _, _ in outputs.values():
+            f.close()
+        print()
+        for table in tables:
+            result = results[table.name]
+            _, _, loader = outputs[table.name]
+            count = result.stats.rows
+            if not count:
+                result.csv_path.unlink()
+                result.csv_path = None
+                print(f"  ⚠ No {table.label.lower()} found")
+                continue
+            write_stats(result, transform_dir)
+            print(f"  ✓ Created {table.csv_name} ({count} {table.unit})")
+            start = time.perf_counter()
+            if loader is not None:
+                loader.finish(result.csv_path)
+            if report is not None:
+                metrics = report.table(table.name)
+                metrics['rows'] = count
+                metrics['load_seconds'] = round(time.perf_counter() - start, 4)
+                report.add_output(result.csv_path, count)
+        if conn is not None:
+            conn.commit()
+            loaded = [t.name for t in tables if results[t.name].stats.rows]
+            if loaded:
+                print(f"  ✓ Loaded {', '.join(loaded)} into {WAREHOUSE_NAME}")
+    except BaseException:
+        for f, _, _ in outputs.values():
+            f.close()
+        if conn is not None:
+            conn.rollback()
+        raise
+    finally:
+        if conn is not None:
+            conn.close()
+    return results
+
+
+def _report_file(report, path, group, file_result, rows=None):
+    """Add one input file's outcome to the run report and its tables' totals."""
+    if file_result.error:
+        status = file_result.error_kind.lower()
+    elif not file_result.count:
+        status = 'empty'
+    else:
+        status = 'cached' if file_result.cached else 'ok'
+    size = path.stat().st_size
+    if rows is None:
+        rows = {name: len(r) for name, r in file_result.rows.items()}
+    report.add_file(path.name, status, size, file_result.count, rows, file_result.wall,
+                    file_result.cpu, file_result.duplicates, file_result.error)
+    for table in group:
+        metrics = report.table(table.name)
+        metrics['files'] += 1
+        metrics['bytes_read'] += size
+        # One parse feeds every table in the group, so each sees its full cost
+        metrics['parse_wall_seconds'] = round(metrics['parse_wall_seconds'] + file_result.wall, 4)
+        metrics['parse_cpu_seconds'] = round(metrics['parse_cpu_seconds'] + file_result.cpu, 4)
+        key = {'ok': 'parsed', 'cached': 'cached', 'empty': 'skipped'}.get(status, 'failed')
+        metrics[key] += 1
+
+
+def _profile_slowest(report, jobs, count):
+    """Re-parse the slowest files in this process under cProfile and tracemalloc."""
+    by_name = {path.name: (path, sub_id, group) for path, sub_id, group in jobs}
+    names = [n for n in report.slowest_files(count) if n in by_name]
+    if not names:
+        return
+    print()
+    print(f"Profiling {len(names)} slowest file(s)...")
+    for name in names:
+        path, sub_id, group = by_name[name]
+        prof_path = report.profile(name, lambda: process_file(path, sub_id, group))
+        print(f"  ✓ {name} -> {prof_path.name}")
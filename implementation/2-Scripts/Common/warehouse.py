@@ -0,0 +1,228 @@
+"""
+SQLite Evidence Warehouse
+Every transformed table is also bulk-loaded into transformed/evidence.db so the
+analysis scripts (and analysts) can query indexed tables instead of re-parsing
+CSVs
+
+Tables are named after the catalog key (e.g. security_assessments) and keep the
+CSV column headers as column names, so a quick look is simply:
+
+  sqlite3 transformed/evidence.db
+  SELECT "Role Name", COUNT(*) FROM role_assignments GROUP BY 1 ORDER BY 2 DESC;
+"""
+
+import csv
+import sqlite3
+import time
+
+from Common import table_store
+from Common.records import record_type
+
+WAREHOUSE_NAME = 'evidence.db'
+
+# Columns indexed wherever a table has them
+INDEXED_COLUMNS = ('Subscription ID', 'Resource ID', 'Resource Type', 'Role Name')
+
+# Rows per executemany() call; all batches share one transaction
+BATCH_SIZE = 5000
+
+# Bookkeeping table: which CSV (by mtime) each warehouse table was loaded from
+CATALOG = '_tables'
+
+
+def warehouse_path(transform_dir):
+    return transform_dir / WAREHOUSE_NAME
+
+
+def _quote(identifier):
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def _cell(value):
+    """Store values the way the CSV shows them, keeping numbers numeric."""
+    if value is None:
+        return ''
+    if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+        return str(value)
+    return value
+
+
+def connect(transform_dir):
+    # Generous timeout: transform scripts may load their tables concurrently
+    return sqlite3.connect(str(warehouse_path(transform_dir)), timeout=60)
+
+
+class TableLoader:
+    """
+    Incremental form of load_table() for rows produced one at a time (e.g.
+    streamed straight from a large input file): add() each row, then finish()
+    once the CSV is written, or abort() to leave the warehouse as it was.
+
+    Given conn, the loader works inside the caller's transaction, so several
+    tables can be filled at once and committed together; the table is only
+    replaced once its first row (or finish()) arrives.
+    """
+
+    def __init__(self, transform_dir, table, conn=None):
+        self.table = table
+        self.headers = table.headers
+        self.name = _quote(table.name)
+        self.insert = f"INSERT INTO {self.name} VALUES ({', '.join('?' * len(self.headers))})"
+        self.rows = 0
+        self.batch = []
+        self.owned = conn is None
+        self.conn = connect(transform_dir) if conn is None else conn
+        self.created = False
+
+    def _create(self):
+        if self.owned:
+            self.conn.execute("BEGIN")
+        self.conn.execute(f"DROP TABLE IF EXISTS {self.name}")
+        self.conn.execute(f"CREATE TABLE {self.name} ({', '.join(_quote(h) for h in self.headers)})")
+        self.created = True
+
+    def add(self, row):
+        if not self.created:
+            self._create()
+        self.batch.append([_cell(value) for value in row])
+        self.rows += 1
+        if len(self.batch) >= BATCH_SIZE:
+            self.conn.executemany(self.insert, self.batch)
+            self.batch = []
+
+    def finish(self, csv_path=None):
+        conn = self.conn
+        try:
+            if not self.created:
+                self._create()
+            if self.batch:
+                conn.executemany(self.insert, self.batch)
+                self.batch = []
+            for column in INDEXED_COLUMNS:
+                if column in self.headers:
+                    index = _quote(f"ix_{self.table.name}_{column.lower().replace(' ', '_')}")
+                    conn.execute(f"CREATE INDEX {index} ON {self.name} ({_quote(column)})")
+            conn.execute(f"CREATE TABLE IF NOT EXISTS {CATALOG} (name TEXT PRIMARY KEY, rows INTEGER, csv_mtime_ns INTEGER)")
+            csv_mtime = csv_path.stat().st_mtime_ns if csv_path is not None else None
+            conn.execute(f"INSERT OR REPLACE INTO {CATALOG} VALUES (?, ?, ?)",
+                         (self.table.name, self.rows, csv_mtime))
+            if self.owned:
+                conn.commit()
+        except BaseException:
+            if self.owned:
+                conn.rollback()
+            raise
+        finally:
+            if self.owned:
+                conn.close()
+
+    def abort(self):
+        if self.owned:
+            self.conn.rollback()
+            self.conn.close()
+
+
+def load_table(transform_dir, table, rows, csv_path=None):
+    """
+    Replace one table in the warehouse with the given row dicts.
+
+    The table is dropped, recreated and filled with batched inserts inside a
+    single transaction, then indexed on the INDEXED_COLUMNS it has. csv_path
+    is the CSV written from the same rows; its mtime is recorded so readers
+    can tell when the CSV has since been regenerated without the warehouse.
+    """
+    loader = TableLoader(transform_dir, table)
+    try:
+        for row in rows:
+            loader.add(row)
+    except BaseException:
+        loader.abort()
+        raise
+    loader.finish(csv_path)
+
+
+def has_table(conn, name):
+    row = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)).fetchone()
+    return row is not None
+
+
+def _is_current(conn, name, csv_path):
+    """True if the warehouse has the table and the CSV is the one it was loaded with."""
+    if not has_table(conn, name) or not has_table(conn, CATALOG):
+        return False
+    row = conn.execute(f"SELECT csv_mtime_ns FROM {CATALOG} WHERE name = ?", (name,)).fetchone()
+    if row is None:
+        return False
+    return not csv_path.exists() or row[0] == csv_path.stat().st_mtime_ns
+
+
+def open_warehouse(transform_dir):
+    """Connection to the warehouse, or None if it was never built."""
+    if not warehouse_path(transform_dir).exists():
+        return None
+    return connect(transform_dir)
+
+
+def _records(cursor):
+    """Wrap a cursor's result tuples as compact records keyed by column name."""
+    make = record_type(d[0] for d in cursor.description).make
+    return [make(row) for row in cursor]
+
+
+def query(transform_dir, sql, params=()):
+    """Run an ad-hoc query against the warehouse and return row records."""
+    conn = open_warehouse(transform_dir)
+    if conn is None:
+        return []
+    try:
+        return _records(conn.execute(sql, params))
+    finally:
+        conn.close()
+
+
+def load_rows(transform_dir, name, report=None):
+    """
+    Rows of a transformed table as compact records keyed by CSV header
+    (Common.records; they support row['Header'] and row.get()).
+
+    Tables handed over in memory by run_pipeline.py are used as-is. Otherwise
+    read from the warehouse when it has the table, or (when it does not, or
+    the CSV was rewritten later, e.g. by a --no-warehouse run) from
+    transformed/<name>.csv. Missing tables yield an empty list. With a
+    Common.instrument RunReport, the row count, source and read time are
+    recorded in it.
+    """
+    start = time.perf_counter()
+    source, rows = _read_rows(transform_dir, name)
+    if report is not None:
+        report.add_input(name, len(rows), source, time.perf_counter() - start)
+    return rows
+
+
+def _read_rows(transform_dir, name):
+    """(source, rows) for load_rows; source is memory, warehouse, csv or missing."""
+    rows = table_store.get(name)
+    if rows is not None:
+        return 'memory', rows
+
+    csv_path = transform_dir / f"{name}.csv"
+    conn = open_warehouse(transform_dir)
+    if conn is not None:
+        try:
+            if _is_current(conn, name, csv_path):
+                return 'warehouse', _records(conn.execute(f"SELECT * FROM {_quote(name)}"))
+        finally:
+            conn.close()
+
+    if csv_path.exists():
+        with open(csv_path, 'r', encoding='utf-8-sig', newline='') as f:
+            reader = csv.reader(f)
+            headers = next(reader, None)
+            if headers is None:
+                return 'csv', []
+            make = record_type(headers).make
+            width = len(headers)
+            # Pad short lines the way DictReader does
+            return 'csv', [make(row if len(row) == width else (row + [None] * width)[:width])
+                           for row in reader if row]
+    return 'missing', []
@@ -0,0 +1,310 @@
+"""
+Streaming XLSX Writer
+Writes .xlsx workbooks row by row with the standard library only (zipfile +
+hand-written SpreadsheetML), in constant memory whatever the row count
+
+Each worksheet is streamed into the zip archive as its rows arrive: cells are
+inline strings (no shared-string table to build up) and nothing but the
+current block of rows is held in memory. Only one sheet can be written at a
+time. Sheets can be added ahead of time and filled last (e.g. a summary that
+needs the final row counts) - the tab order is the order sheets were added,
+not the order they were written. Tables longer than Excel's row limit are
+split over several sheets by write_table().
+"""
+
+import re
+import zipfile
+from datetime import datetime, timezone
+
+# Excel limits
+MAX_ROWS = 1048576
+MAX_SHEET_NAME = 31
+MAX_CELL_CHARS = 32767
+
+# Rows serialized per write to the zip stream
+FLUSH_ROWS = 1000
+
+# Style indexes in STYLES_XML
+STYLE_DEFAULT = 0
+STYLE_HEADER = 1
+
+# Strings that are plain numbers without leading zeros, so IDs such as '0012' stay text
+_NUMBER = re.compile(r'-?(?:0|[1-9]\d{0,14})(?:\.\d+)?\Z')
+_ILLEGAL_XML = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]')
+_NEEDS_ESCAPE = re.compile('[&<>"\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]')
+_SHEET_NAME_CHARS = re.compile(r'[\[\]:*?/\\]')
+
+CONTENT_TYPES_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '<Override PartName="/docProps/core.xml" '
+    'ContentType="application/vnd.openxmlformats-package.core-properties+xml"/>'
+    '{sheets}</Types>'
+)
+
+ROOT_RELS_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '<Relationship Id="rId2" '
+    'Type="http://schemas.openxmlformats.org/package/2006/relationships/metadata/core-properties" '
+    'Target="docProps/core.xml"/>'
+    '</Relationships>'
+)
+
+CORE_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<cp:coreProperties xmlns:cp="http://schemas.openxmlformats.org/package/2006/metadata/core-properties" '
+    'xmlns:dc="http://purl.org/dc/elements/1.1/" xmlns:dcterms="http://purl.org/dc/terms/" '
+    'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">'
+    '<dc:title>{title}</dc:title><dc:creator>SecAI</dc:creator>'
+    '<dcterms:created xsi:type="dcterms:W3CDTF">{created}</dcterms:created>'
+    '</cp:coreProperties>'
+)
+
+STYLES_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font>'
+    '<font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="2"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/></cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    '</styleSheet>'
+)
+
+SHEET_HEAD_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+)
+
+
+def column_letter(index):
+    """0 -> A, 25 -> Z, 26 -> AA."""
+    letters = ''
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def escape(text):
+    """XML-escape text and drop characters XML cannot carry; most cells need neither."""
+    if not _NEEDS_ESCAPE.search(text):
+        return text
+    text = text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;').replace('"', '&quot;')
+    return _ILLEGAL_XML.sub('', text)
+
+
+def sheet_name(name, taken):
+    """Valid, unique (case-insensitive) sheet name for name; taken is updated."""
+    base = _SHEET_NAME_CHARS.sub('-', str(name)).strip("' ") or 'Sheet'
+    candidate = base[:MAX_SHEET_NAME]
+    n = 1
+    while candidate.lower() in taken:
+        n += 1
+        suffix = f" ({n})"
+        candidate = base[:MAX_SHEET_NAME - len(suffix)] + suffix
+    taken.add(candidate.lower())
+    return candidate
+
+
+class Worksheet:
+    """One sheet's row stream; obtained from XlsxWriter.open_sheet()."""
+
+    def __init__(self, stream, columns=None, freeze_header=False, widths=None):
+        self.stream = stream
+        self.rows = 0
+        self.width = 0
+        self.freeze_header = freeze_header
+        self._letters = [column_letter(i) for i in range(columns or 0)]
+        self._pending = []
+        parts = [SHEET_HEAD_XML]
+        if freeze_header:
+            parts.append('<sheetViews><sheetView workbookViewId="0"><pane ySplit="1" topLeftCell="A2" '
+                         'activePane="bottomLeft" state="frozen"/></sheetView></sheetViews>')
+        if widths:
+            parts.append('<cols>' + ''.join(
+                f'<col min="{i}" max="{i}" width="{w}" customWidth="1"/>' for i, w in enumerate(widths, 1)) + '</cols>')
+        parts.append('<sheetData>')
+        self.stream.write(''.join(parts).encode('utf-8'))
+
+    def _letters_for(self, width):
+        letters = self._letters
+        while width > len(letters):
+            letters.append(column_letter(len(letters)))
+        return letters
+
+    def write_row(self, values, style=STYLE_DEFAULT, numbers=True):
+        """
+        Append one row. int/float values become numeric cells, as do strings
+        that are plain numbers when numbers is set; everything else is text.
+        """
+        if self.rows >= MAX_ROWS:
+            raise ValueError(f"sheet is full ({MAX_ROWS} rows)")
+        self.rows += 1
+        r = self.rows
+        letters = self._letters_for(len(values))
+        style_attr = f' s="{style}"' if style else ''
+        number = _NUMBER.match if numbers else None
+        cells = []
+        for i, value in enumerate(values):
+            if value is None or value == '':
+                continue
+            kind = type(value)
+            if kind is str:
+                if number is not None and number(value):
+                    cells.append(f'<c r="{letters[i]}{r}"{style_attr}><v>{value}</v></c>')
+                    continue
+                text = value
+            elif kind is int or kind is float:
+                cells.append(f'<c r="{letters[i]}{r}"{style_attr}><v>{value}</v></c>')
+                continue
+            else:
+                text = str(value)
+            if len(text) > MAX_CELL_CHARS:
+                text = text[:MAX_CELL_CHARS]
+            cells.append(f'<c r="{letters[i]}{r}"{style_attr} t="inlineStr"><is><t xml:space="preserve">'
+                         f'{escape(text)}</t></is></c>')
+        if len(values) > self.width:
+            self.width = len(values)
+        self._pending.append(f'<row r="{r}">{"".join(cells)}</row>')
+        if len(self._pending) >= FLUSH_ROWS:
+            self.flush()
+
+    def flush(self):
+        if self._pending:
+            self.stream.write(''.join(self._pending).encode('utf-8'))
+            self._pending = []
+
+    def close(self, autofilter=False):
+        self.flush()
+        tail = '</sheetData>'
+        if autofilter and self.rows > 1 and self.width:
+            tail += f'<autoFilter ref="A1:{self._letters_for(self.width)[self.width - 1]}{self.rows}"/>'
+        self.stream.write((tail + '</worksheet>').encode('utf-8'))
+        self.stream.close()
+
+
+class XlsxWriter:
+    """
+    Streaming workbook.
+
+      book = XlsxWriter(path)
+      summary = book.add_sheet('Summary')        # tab placed now, filled later
+      book.write_table('Resources', headers, rows)
+      with book.open_sheet(summary) as sheet:     # or sheet = book.open_sheet(...); sheet.close()
+          sheet.write_row([...])
+      book.close()
+    """
+
+    def __init__(self, path, title='', compresslevel=6):
+        self.path = path
+        self.title = title
+        self.zip = zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED, compresslevel=compresslevel)
+        self.sheets = []        # sheet names in tab order
+        self.written = set()    # indexes of sheets already streamed
+        self._taken = set()
+        self._open = None
+
+    def add_sheet(self, name):
+        """Add a tab (name made valid and unique) and return its index."""
+        self.sheets.append(sheet_name(name, self._taken))
+        return len(self.sheets) - 1
+
+    def open_sheet(self, index, columns=None, freeze_header=False, widths=None):
+        """Start streaming an added sheet; close the returned Worksheet before opening another."""
+        if self._open is not None and not self._open.stream.closed:
+            raise RuntimeError("another sheet is still being written")
+        if index in self.written:
+            raise ValueError(f"sheet {self.sheets[index]!r} was already written")
+        self.written.add(index)
+        stream = self.zip.open(f"xl/worksheets/sheet{index + 1}.xml", 'w', force_zip64=True)
+        self._open = _ClosingWorksheet(stream, columns, freeze_header, widths)
+        return self._open
+
+    def write_table(self, name, headers, rows, numbers=True):
+        """
+        Stream a table with a bold, frozen, filterable header row, continuing
+        on sheets '<name> (2)', '<name> (3)', ... when it exceeds Excel's row
+        limit. Returns [(sheet name, data rows)].
+        """
+        widths = [min(max(len(str(h)) + 4, 12), 60) for h in headers]
+        written = []
+        sheet = None
+        for row in rows:
+            if sheet is None or sheet.rows >= MAX_ROWS:
+                if sheet is not None:
+                    sheet.close(autofilter=True)
+                    written[-1] = (written[-1][0], sheet.rows - 1)
+                index = self.add_sheet(name)
+                sheet = self.open_sheet(index, columns=len(headers), freeze_header=True, widths=widths)
+                sheet.write_row(headers, style=STYLE_HEADER, numbers=False)
+                written.append((self.sheets[index], 0))
+            sheet.write_row(row, numbers=numbers)
+        if sheet is None:
+            index = self.add_sheet(name)
+            sheet = self.open_sheet(index, columns=len(headers), freeze_header=True, widths=widths)
+            sheet.write_row(headers, style=STYLE_HEADER, numbers=False)
+            written.append((self.sheets[index], 0))
+        sheet.close(autofilter=True)
+        written[-1] = (written[-1][0], sheet.rows - 1)
+        return written
+
+    def close(self):
+        """Write the workbook parts (empty worksheets for tabs never written) and finish the file."""
+        for index in range(len(self.sheets)):
+            if index not in self.written:
+                self.open_sheet(index).close()
+        n = len(self.sheets)
+        self.zip.writestr('[Content_Types].xml', CONTENT_TYPES_XML.format(sheets=''.join(
+            f'<Override PartName="/xl/worksheets/sheet{i}.xml" '
+            f'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+            for i in range(1, n + 1))))
+        self.zip.writestr('_rels/.rels', ROOT_RELS_XML)
+        created = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+        self.zip.writestr('docProps/core.xml', CORE_XML.format(title=escape(self.title), created=created))
+        self.zip.writestr('xl/styles.xml', STYLES_XML)
+        self.zip.writestr('xl/workbook.xml', (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships"><sheets>'
+            + ''.join(f'<sheet name="{escape(name)}" sheetId="{i}" r:id="rId{i}"/>'
+                      for i, name in enumerate(self.sheets, 1))
+            + '</sheets></workbook>'))
+        self.zip.writestr('xl/_rels/workbook.xml.rels', (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            + ''.join(f'<Relationship Id="rId{i}" '
+                      f'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+                      f'Target="worksheets/sheet{i}.xml"/>' for i in range(1, n + 1))
+            + f'<Relationship Id="rId{n + 1}" '
+              f'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+              f'Target="styles.xml"/></Relationships>'))
+        self.zip.close()
+
+
+class _ClosingWorksheet(Worksheet):
+    """Worksheet usable as a context manager (closed on exit)."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        if not self.stream.closed:
+            self.close()
+        return False
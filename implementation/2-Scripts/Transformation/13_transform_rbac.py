@@ -1,173 +1,204 @@
 #!/usr/bin/env python3
 """
 Azure RBAC Data Transformation Script
-Converts role assignment JSON data to CSV format for Excel import
+Converts role assignment, service principal and application JSON data to CSV
+format for Excel import
+
+The tenant-wide service principal and application files are streamed (rows go
+straight to disk) and service principals are joined to the role assignments'
+Principal IDs through a hash index, so privileged non-human identities are
+reported without holding either file in memory.
 """
 
-import json
 import csv
+import sys
 from pathlib import Path
-from collections import Counter
 
-# Determine paths
+# Determine paths (SECAI_OUT_DIR / SECAI_TRANSFORM_DIR override the defaults)
 SCRIPT_DIR = Path(__file__).parent
 ROOT_DIR = SCRIPT_DIR.parent
-OUT_DIR = ROOT_DIR / "out"
-TRANSFORM_DIR = ROOT_DIR / "transformed"
-
-# Create transformed directory if it doesn't exist
-TRANSFORM_DIR.mkdir(exist_ok=True)
-
-print("=" * 60)
-print("Azure RBAC Data Transformation")
-print("=" * 60)
-print(f"Input directory: {OUT_DIR}")
-print(f"Output directory: {TRANSFORM_DIR}")
-print()
-
-# ============================================================================
-# Transform Role Assignments
-# ============================================================================
-print("Processing Role Assignments...")
-
-role_assignments = []
-rbac_files = list(OUT_DIR.glob("*_role_assignments.json"))
-print(f"  Found {len(rbac_files)} role assignment files")
-
-for rbac_file in rbac_files:
-    # Extract subscription ID from filename
-    sub_id = rbac_file.name.replace("_role_assignments.json", "")
-    
-    try:
-        with open(rbac_file, 'r', encoding='utf-8-sig') as f:
-            content = f.read().strip()
-            
-            # Skip empty files
-            if not content or content == "[]":
-                print(f"  [SKIP] {rbac_file.name} - empty")
-                continue
-            
-            data = json.loads(content)
-            
-            # Handle array of role assignments
-            if isinstance(data, list):
-                for assignment in data:
-                    # Extract principal info
-                    principal_id = assignment.get('principalId', '')
-                    principal_name = assignment.get('principalName', '')
-                    principal_type = assignment.get('principalType', '')
-                    
-                    # Extract role info
-                    role_name = assignment.get('roleDefinitionName', '')
-                    role_id = assignment.get('roleDefinitionId', '')
-                    
-                    # Extract scope info
-                    scope = assignment.get('scope', '')
-                    assignment_id = assignment.get('id', '')
-                    
-                    # Determine scope level from scope path
-                    scope_level = 'Unknown'
-                    if '/subscriptions/' in scope:
-                        parts = scope.split('/')
-                        if len(parts) == 3:  # /subscriptions/{id}
-                            scope_level = 'Subscription'
-                        elif '/resourceGroups/' in scope:
-                            if len(parts) == 5:  # /subscriptions/{id}/resourceGroups/{rg}
-                                scope_level = 'Resource Group'
-                            else:  # Resource level
-                                scope_level = 'Resource'
-                    
-                    role_assignments.append({
-                        'Subscription ID': sub_id,
-                        'Principal Name': principal_name,
-                        'Principal ID': principal_id,
-                        'Principal Type': principal_type,
-                        'Role Name': role_name,
-                        'Scope Level': scope_level,
-                        'Scope': scope,
-                        'Role Definition ID': role_id,
-                        'Assignment ID': assignment_id
-                    })
-                
-                print(f"  [OK] {rbac_file.name} - {len(data)} role assignments")
-    
-    except json.JSONDecodeError as e:
-        print(f"  [WARN] Could not parse {rbac_file.name}: {e}")
-    except Exception as e:
-        print(f"  [ERROR] Failed to process {rbac_file.name}: {e}")
-
-# Write role assignments CSV
-if role_assignments:
-    rbac_csv = TRANSFORM_DIR / "role_assignments.csv"
-    with open(rbac_csv, 'w', newline='', encoding='utf-8-sig') as f:
-        writer = csv.DictWriter(f, fieldnames=[
-            'Subscription ID', 'Principal Name', 'Principal ID', 'Principal Type', 
-            'Role Name', 'Scope Level', 'Scope', 'Role Definition ID', 'Assignment ID'
-        ])
-        writer.writeheader()
-        writer.writerows(role_assignments)
-    
-    print(f"  ✓ Created role_assignments.csv ({len(role_assignments)} assignments)")
-else:
-    print("  ⚠ No role assignments found")
-
-# ============================================================================
-# Summary Statistics
-# ============================================================================
-print()
-print("=" * 60)
-print("Transformation Summary")
-print("=" * 60)
-print(f"Role Assignments: {len(role_assignments)}")
-print()
-print(f"Output files created in: {TRANSFORM_DIR}")
-if role_assignments:
-    print(f"  - role_assignments.csv")
-print()
-
-# RBAC Statistics
-if role_assignments:
-    print("RBAC Statistics:")
-    print()
-    
-    # Count by role name
-    roles = Counter(r['Role Name'] for r in role_assignments)
-    print(f"  Top Roles Assigned:")
-    for role, count in roles.most_common(10):
-        print(f"    {role}: {count}")
+
+sys.path.insert(0, str(ROOT_DIR))
+from Common.paths import OUT_DIR, TRANSFORM_DIR
+from Common.transform_engine import run_tables, stream_tables, parse_transform_args
+from Common.instrument import RunReport
+from Common.risk_rules import PRIVILEGED_ROLES
+from Common.tables import EXPIRY_WARNING_DAYS
+
+PRIVILEGED_SP_HEADERS = ['Display Name', 'Object ID', 'App ID', 'Service Principal Type', 'Account Enabled',
+                         'Privileged Roles', 'Other Roles', 'Role Assignments', 'Subscriptions',
+                         'Expired Credentials', 'Next Credential Expiry']
+
+
+def index_principals(role_assignments):
+    """{principal ID (lowercase): {Assignment ID: row}} for the assignments of each principal."""
+    index = {}
+    for row in role_assignments:
+        principal = (row.get('Principal ID') or '').lower()
+        if principal:
+            # Above-subscription assignments recur in every subscription's file
+            assignment = (row.get('Assignment ID') or '').lower() or id(row)
+            index.setdefault(principal, {})[assignment] = row
+    return index
+
+
+def privileged_row(sp, assignments):
+    """Output row for a service principal holding a privileged role, else None."""
+    privileged = {r.lower() for r in PRIVILEGED_ROLES}
+    roles = sorted({a.get('Role Name') or '' for a in assignments})
+    held = [r for r in roles if r.lower() in privileged]
+    if not held:
+        return None
+    return [sp['Display Name'], sp['Object ID'], sp['App ID'], sp['Service Principal Type'],
+            sp['Account Enabled'], ', '.join(held), ', '.join(r for r in roles if r not in held),
+            len(assignments), len({a.get('Subscription ID') for a in assignments}),
+            sp['Expired Credentials'], sp['Next Credential Expiry']]
+
+
+def main():
+    args = parse_transform_args(__doc__)
+    report = RunReport(Path(__file__).stem, TRANSFORM_DIR)
+
+    # Create transformed directory if it doesn't exist
+    TRANSFORM_DIR.mkdir(parents=True, exist_ok=True)
+
+    print("=" * 60)
+    print("Azure RBAC Data Transformation")
+    print("=" * 60)
+    print(f"Input directory: {OUT_DIR}")
+    print(f"Output directory: {TRANSFORM_DIR}")
     print()
-    
-    # Count privileged roles (Owner, Contributor, User Access Administrator)
-    privileged_roles = ['Owner', 'Contributor', 'User Access Administrator']
-    privileged_count = sum(1 for r in role_assignments if r['Role Name'] in privileged_roles)
-    print(f"  Privileged Role Assignments:")
-    print(f"    Owner: {sum(1 for r in role_assignments if r['Role Name'] == 'Owner')}")
-    print(f"    Contributor: {sum(1 for r in role_assignments if r['Role Name'] == 'Contributor')}")
-    print(f"    User Access Administrator: {sum(1 for r in role_assignments if r['Role Name'] == 'User Access Administrator')}")
-    print(f"    Total Privileged: {privileged_count} ({privileged_count/len(role_assignments)*100:.1f}%)")
+
+    # ============================================================================
+    # Transform Role Assignments
+    # ============================================================================
+    results = run_tables(['role_assignments'], OUT_DIR, TRANSFORM_DIR,
+                         workers=args.workers, incremental=args.incremental,
+                         warehouse=args.warehouse,
+                         report=report, profile=args.profile)
+    role_assignments = results['role_assignments'].rows
+
+    # ============================================================================
+    # Transform Service Principals, Applications and Credentials (streamed)
+    # ============================================================================
     print()
-    
-    # Count by principal type
-    principal_types = Counter(r['Principal Type'] for r in role_assignments)
-    print(f"  By Principal Type:")
-    for ptype, count in principal_types.most_common():
-        print(f"    {ptype}: {count}")
+    principals = index_principals(role_assignments)
+    privileged_sps = []
+
+    def join_service_principal(sp):
+        assignments = principals.get((sp['Object ID'] or '').lower())
+        if assignments:
+            row = privileged_row(sp, list(assignments.values()))
+            if row:
+                privileged_sps.append(row)
+
+    identity = stream_tables(['service_principals', 'applications', 'app_credentials'],
+                             OUT_DIR, TRANSFORM_DIR, warehouse=args.warehouse, report=report,
+                             observers={'service_principals': join_service_principal})
+
+    privileged_path = TRANSFORM_DIR / 'privileged_service_principals.csv'
+    if privileged_sps:
+        privileged_sps.sort(key=lambda r: (-r[8], -r[7], r[0] or ''))
+        with open(privileged_path, 'w', newline='', encoding='utf-8-sig') as f:
+            writer = csv.writer(f)
+            writer.writerow(PRIVILEGED_SP_HEADERS)
+            writer.writerows(privileged_sps)
+        report.add_output(privileged_path, len(privileged_sps))
+        print(f"  ✓ Created {privileged_path.name} ({len(privileged_sps)} service principals)")
+    elif privileged_path.exists():
+        privileged_path.unlink()
+
+    # ============================================================================
+    # Summary Statistics
+    # ============================================================================
     print()
-    
-    # Count by scope level
-    scope_levels = Counter(r['Scope Level'] for r in role_assignments)
-    print(f"  By Scope Level:")
-    for level, count in scope_levels.most_common():
-        print(f"    {level}: {count}")
+    print("=" * 60)
+    print("Transformation Summary")
+    print("=" * 60)
+    print(f"Role Assignments: {len(role_assignments)}")
+    for name in ('service_principals', 'applications', 'app_credentials'):
+        print(f"{identity[name].table.label}: {identity[name].stats.rows}")
+    print(f"Privileged Service Principals: {len(privileged_sps)}")
     print()
-    
-    # Count unique principals
-    unique_principals = len(set(r['Principal ID'] for r in role_assignments))
-    print(f"  Unique Principals: {unique_principals}")
-    print(f"  Avg Assignments per Principal: {len(role_assignments)/unique_principals:.1f}")
+    print(f"Output files created in: {TRANSFORM_DIR}")
+    if role_assignments:
+        print(f"  - role_assignments.csv")
+    for result in identity.values():
+        if result.stats.rows:
+            print(f"  - {result.table.csv_name}")
+    if privileged_sps:
+        print(f"  - {privileged_path.name}")
     print()
 
-print("=" * 60)
-print("Transformation complete!")
-print("=" * 60)
+    # RBAC Statistics
+    if role_assignments:
+        stats = results['role_assignments'].stats
+        print("RBAC Statistics:")
+        print()
+
+        # Count by role name
+        roles = stats['Role Name']
+        print(f"  Top Roles Assigned:")
+        for role, count in roles.most_common(10):
+            print(f"    {role}: {count}")
+        print()
+
+        # Count privileged roles (Owner, Contributor, User Access Administrator)
+        privileged_roles = ['Owner', 'Contributor', 'User Access Administrator']
+        privileged_count = sum(roles[role] for role in privileged_roles)
+        print(f"  Privileged Role Assignments:")
+        print(f"    Owner: {roles['Owner']}")
+        print(f"    Contributor: {roles['Contributor']}")
+        print(f"    User Access Administrator: {roles['User Access Administrator']}")
+        print(f"    Total Privileged: {privileged_count} ({privileged_count/len(role_assignments)*100:.1f}%)")
+        print()
+
+        # Count by principal type
+        principal_types = stats['Principal Type']
+        print(f"  By Principal Type:")
+        for ptype, count in principal_types.most_common():
+            print(f"    {ptype}: {count}")
+        print()
+
+        # Count by scope level
+        scope_levels = stats['Scope Level']
+        print(f"  By Scope Level:")
+        for level, count in scope_levels.most_common():
+            print(f"    {level}: {count}")
+        print()
+
+        # Count unique principals
+        unique_principals = len(stats['Principal ID'])
+        print(f"  Unique Principals: {unique_principals}")
+        print(f"  Avg Assignments per Principal: {len(role_assignments)/unique_principals:.1f}")
+        print()
+
+    # Identity Statistics
+    credentials = identity['app_credentials'].stats
+    if credentials.rows:
+        print("Credential Statistics:")
+        print()
+        status = credentials['Status']
+        print(f"  Expired: {status['Expired']}")
+        print(f"  Expiring within {EXPIRY_WARNING_DAYS} days: {status['Expiring']}")
+        print(f"  Valid: {status['Valid']}")
+        print()
+        print(f"  By Credential Type:")
+        for kind, count in credentials['Credential Type'].most_common():
+            print(f"    {kind}: {count}")
+        print()
+
+    if privileged_sps:
+        print("  Most Privileged Service Principals:")
+        for row in privileged_sps[:10]:
+            print(f"    {row[0]}: {row[5]} on {row[8]} subscriptions")
+        print()
+
+    print(f"Run report: {report.write()}")
+    print("=" * 60)
+    print("Transformation complete!")
+    print("=" * 60)
+
 
+if __name__ == '__main__':
+    main()
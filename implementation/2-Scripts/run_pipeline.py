@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+SecAI Pipeline Runner
+Runs the evidence counter, the transformation scripts (11-17) and the analysis
+scripts (18-23) and the workbook export (26) in one Python process, in
+dependency order
+
+Transformed tables are handed to the analysis stages in memory; every stage
+still writes the same CSV (and evidence.db) artifacts as a standalone run.
+"""
+
+import argparse
+import runpy
+import sys
+import time
+import traceback
+from pathlib import Path
+
+# Determine paths
+ROOT_DIR = Path(__file__).resolve().parent
+
+sys.path.insert(0, str(ROOT_DIR))
+from Common import table_store
+
+
+class Stage:
+    """One numbered script and the stages whose outputs it reads."""
+
+    def __init__(self, key, script, needs=(), transform=False):
+        self.key = key
+        self.script = ROOT_DIR / script
+        self.needs = needs
+        self.transform = transform
+
+
+STAGES = [
+    Stage('10', 'Collection/10_evidence_counter.py'),
+    Stage('11', 'Transformation/11_transform_security.py', ('10',), transform=True),
+    Stage('12', 'Transformation/12_transform_inventory.py', ('10',), transform=True),
+    Stage('13', 'Transformation/13_transform_rbac.py', ('10',), transform=True),
+    Stage('14', 'Transformation/14_transform_network.py', ('10',), transform=True),
+    Stage('15', 'Transformation/15_transform_data_protection.py', ('10',), transform=True),
+    Stage('16', 'Transformation/16_transform_logging.py', ('10',), transform=True),
+    Stage('17', 'Transformation/17_transform_policies.py', ('10',), transform=True),
+    Stage('18', 'Analysis/18_analyze_top_risks.py', ('11', '13', '15')),
+    Stage('19', 'Analysis/19_analyze_subscription_comparison.py', ('11', '12', '13', '14', '15')),
+    Stage('20', 'Analysis/20_analyze_resource_risks.py', ('11', '12')),
+    Stage('21', 'Analysis/21_query_effective_access.py', ('13',)),
+    Stage('22', 'Analysis/22_analyze_network_exposure.py', ('14',)),
+    Stage('23', 'Analysis/23_analyze_address_overlaps.py', ('14',)),
+    Stage('26', 'Analysis/26_export_workbook.py', ('11', '12', '13', '14', '15', '16', '17')),
+]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--stages', default='',
+                        help='Comma-separated stage numbers to run (default: all). Stages not '
+                             'selected are assumed to have produced their files already')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Worker processes for the transformation stages (0 = one per CPU core)')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Pass --incremental to the transformation stages')
+    parser.add_argument('--no-warehouse', action='store_true',
+                        help='Pass --no-warehouse to the transformation stages')
+    return parser.parse_args()
+
+
+def stage_argv(stage, args):
+    argv = [str(stage.script)]
+    if stage.transform:
+        argv += ['--workers', str(args.workers)]
+        if args.incremental:
+            argv.append('--incremental')
+        if args.no_warehouse:
+            argv.append('--no-warehouse')
+    return argv
+
+
+def run_stage(stage, args):
+    """Execute a stage script as __main__ in this process. Returns True on success."""
+    saved_argv = sys.argv
+    sys.argv = stage_argv(stage, args)
+    try:
+        runpy.run_path(str(stage.script), run_name='__main__')
+        return True
+    except SystemExit as e:
+        return e.code in (None, 0)
+    except Exception as e:
+        print(f"[ERROR] Stage {stage.key} failed: {e}")
+        traceback.print_exc()
+        return False
+    finally:
+        sys.argv = saved_argv
+
+
+def main():
+    args = parse_args()
+    selected = {s.strip() for s in args.stages.split(',') if s.strip()}
+    unknown = selected - {s.key for s in STAGES}
+    if unknown:
+        print(f"[ERROR] Unknown stage(s): {', '.join(sorted(unknown))}")
+        sys.exit(2)
+
+    table_store.enable()
+    status = {}
+    timings = []
+    started = time.perf_counter()
+
+    # STAGES is listed in dependency order, so a single forward pass suffices
+    for stage in STAGES:
+        if selected and stage.key not in selected:
+            continue
+        failed = [n for n in stage.needs if status.get(n) is False]
+        if failed:
+            print(f"[SKIP] Stage {stage.key} - depends on failed stage(s) {', '.join(failed)}")
+            status[stage.key] = False
+            continue
+
+        print()
+        print("#" * 70)
+        print(f"# Stage {stage.key}: {stage.script.name}")
+        print("#" * 70)
+        stage_start = time.perf_counter()
+        status[stage.key] = run_stage(stage, args)
+        timings.append((stage, status[stage.key], time.perf_counter() - stage_start))
+
+    print()
+    print("=" * 70)
+    print("Pipeline Summary")
+    print("=" * 70)
+    for stage, ok, elapsed in timings:
+        print(f"  [{'OK' if ok else 'FAILED'}] {stage.key} {stage.script.name} ({elapsed:.2f}s)")
+    print(f"Total time: {time.perf_counter() - started:.2f}s")
+    print("=" * 70)
+
+    if not all(status.values()):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()